@@ -2,12 +2,83 @@
 TODO: add me
 """
 import django_filters  # pylint: disable=import-error
+from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.validators import EMPTY_VALUES
+from django_filters.fields import Lookup  # pylint: disable=import-error
+from django_filters.widgets import SuffixedMultiWidget  # pylint: disable=import-error
 from edx_proctoring.models import ProctoredExamStudentAttempt  # pylint: disable=import-error
-from opaque_keys.edx.keys import CourseKey  # pylint: disable=import-error
 
 from eox_core.edxapp_wrapper.certificates import get_generated_certificate
 from eox_core.edxapp_wrapper.users import get_course_enrollment
+from eox_core.models import UserSiteMembership
+from eox_core.utils import course_key_cache
+
+EXACT = "exact"
+PREFIX = "prefix"
+CONTAINS = "contains"
+
+# Case insensitive lookup of each match mode. Only `contains` can't use an index on MySQL.
+MATCH_MODE_LOOKUPS = {
+    EXACT: "iexact",
+    PREFIX: "istartswith",
+    CONTAINS: "icontains",
+}
+
+
+class MatchModeWidget(SuffixedMultiWidget):
+    """
+    Read the value from the `<name>` param and the match mode from the `<name>_match` param.
+    """
+    suffixes = [None, "match"]
+
+    def decompress(self, value):
+        if value is None:
+            return [None, None]
+        return [value.value, value.lookup_expr]
+
+
+class MatchModeField(forms.MultiValueField):
+    """
+    Form field of a text value and its match mode, which defaults to `default_match`.
+    """
+
+    def __init__(self, *args, default_match=PREFIX, **kwargs):
+        self.default_match = default_match
+        fields = (
+            forms.CharField(required=False),
+            forms.ChoiceField(choices=[(mode, mode) for mode in MATCH_MODE_LOOKUPS], required=False),
+        )
+        kwargs["widget"] = MatchModeWidget(widgets=[field.widget for field in fields])
+        super().__init__(fields, *args, require_all_fields=False, **kwargs)
+
+    def compress(self, data_list):
+        if len(data_list) == 2:
+            value, match_mode = data_list
+            if value not in EMPTY_VALUES:
+                return Lookup(value=value, lookup_expr=MATCH_MODE_LOOKUPS[match_mode or self.default_match])
+        return None
+
+
+class MatchModeFilter(django_filters.Filter):
+    """
+    Text filter with a selectable match mode, `exact`, `prefix` or `contains`.
+
+    e.g. `?username=john&username_match=contains`. The match mode defaults to
+    `default_match`, exact or prefix, which the indexes of the field can answer.
+    """
+    field_class = MatchModeField
+
+    def __init__(self, field_name=None, default_match=PREFIX, **kwargs):
+        super().__init__(field_name=field_name, default_match=default_match, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return super().filter(qs, None)
+
+        self.lookup_expr = value.lookup_expr
+        return super().filter(qs, value.value)
 
 
 class BaseDataApiFilter(django_filters.rest_framework.FilterSet):
@@ -16,30 +87,61 @@ class BaseDataApiFilter(django_filters.rest_framework.FilterSet):
     """
     ordering = django_filters.OrderingFilter()
 
+    # Path from the filtered model to its user
+    user_lookup_prefix = "user__"
+
+    @classmethod
+    def get_site_field_name(cls):
+        """
+        Return the path of the field matched by the site filter.
+        """
+        if getattr(settings, "EOX_CORE_USER_SITE_MEMBERSHIP_INDEX", False):
+            return f"{cls.user_lookup_prefix}eox_site_memberships__site_domain"
+        return f"{cls.user_lookup_prefix}usersignupsource__site"
+
+    def filter_site(self, queryset, name, value):
+        """
+        Filter by the signup source site of the user, with the match mode of the value.
+
+        With EOX_CORE_USER_SITE_MEMBERSHIP_INDEX the site is read from the
+        eox-core site membership index instead of the signup sources.
+        """
+        if not value:
+            return queryset
+
+        lookup = f"{self.get_site_field_name()}__{value.lookup_expr}"
+        if getattr(settings, "EOX_CORE_USER_SITE_MEMBERSHIP_INDEX", False):
+            return queryset.filter(**{
+                lookup: value.value.lower(),
+                f"{self.user_lookup_prefix}eox_site_memberships__source": UserSiteMembership.SIGNUP_SOURCE,
+            })
+        return queryset.filter(**{lookup: value.value})
+
 
 class UserFilter(BaseDataApiFilter):
     """
     TODO: add me
     """
     # Filtering by main model fields
-    username = django_filters.CharFilter(lookup_expr='icontains')
-    first_name = django_filters.CharFilter(lookup_expr='icontains')
-    last_name = django_filters.CharFilter(lookup_expr='icontains')
-    email = django_filters.CharFilter(lookup_expr='icontains')
+    username = MatchModeFilter()
+    first_name = MatchModeFilter()
+    last_name = MatchModeFilter()
+    email = MatchModeFilter()
     is_active = django_filters.BooleanFilter()
     date_joined = django_filters.DateTimeFromToRangeFilter()
 
     # Filtering by user profile fields
-    name = django_filters.CharFilter(field_name="profile__name", lookup_expr="icontains")
-    language = django_filters.CharFilter(field_name="profile__language", lookup_expr="iexact")
+    name = MatchModeFilter(field_name="profile__name")
+    language = MatchModeFilter(field_name="profile__language", default_match=EXACT)
     year_of_birth = django_filters.RangeFilter(field_name="profile__year_of_birth")
-    gender = django_filters.CharFilter(field_name="profile__gender", lookup_expr="iexact")
-    mailing_address = django_filters.CharFilter(field_name="profile__mailing_address", lookup_expr="iexact")
-    city = django_filters.CharFilter(field_name="profile__city", lookup_expr="icontains")
-    country = django_filters.CharFilter(field_name="profile__country", lookup_expr="icontains")
+    gender = MatchModeFilter(field_name="profile__gender", default_match=EXACT)
+    mailing_address = MatchModeFilter(field_name="profile__mailing_address", default_match=EXACT)
+    city = MatchModeFilter(field_name="profile__city")
+    country = MatchModeFilter(field_name="profile__country", default_match=EXACT)
 
     # Filtering by user signup source fields
-    site = django_filters.CharFilter(field_name="usersignupsource__site", lookup_expr='iexact')
+    site = MatchModeFilter(method="filter_site", default_match=EXACT)
+    user_lookup_prefix = ""
 
     class Meta:
         """
@@ -72,8 +174,8 @@ class CourseEnrollmentFilter(BaseDataApiFilter):
     course_id = django_filters.CharFilter(method="filter_course_id")
     created = django_filters.DateTimeFromToRangeFilter()
     is_active = django_filters.BooleanFilter()
-    mode = django_filters.CharFilter(lookup_expr='icontains')
-    site = django_filters.CharFilter(field_name="user__usersignupsource__site", lookup_expr='iexact')
+    mode = MatchModeFilter(default_match=EXACT)
+    site = MatchModeFilter(method="filter_site", default_match=EXACT)
 
     def filter_course_id(self, queryset, name, value):
         """
@@ -88,7 +190,7 @@ class CourseEnrollmentFilter(BaseDataApiFilter):
             # CourseKey instance creation will fail if course does not exist
             try:
                 # Instantiating CourseKey of the field with query string
-                instance = CourseKey.from_string(str(value))
+                instance = course_key_cache.parse(str(value))
                 # Passing instance to queryset filter
                 return queryset.filter(course_id=instance)
             except Exception:  # pylint: disable=broad-except
@@ -119,8 +221,8 @@ class GeneratedCerticatesFilter(BaseDataApiFilter):
     DOWNLOADABLE = 'downloadable'
     ALL = 'all'
 
-    site = django_filters.CharFilter(field_name="user__usersignupsource__site", lookup_expr='iexact')
-    username = django_filters.CharFilter(field_name="user__username", lookup_expr='icontains')
+    site = MatchModeFilter(method="filter_site", default_match=EXACT)
+    username = MatchModeFilter(field_name="user__username")
     created_date = django_filters.DateTimeFromToRangeFilter()
     course_id = django_filters.CharFilter(method="filter_course_id")
     status = django_filters.CharFilter(method="filter_status")
@@ -140,7 +242,7 @@ class GeneratedCerticatesFilter(BaseDataApiFilter):
             # CourseKey instance creation will fail if course does not exist
             try:
                 # Instantiating CourseKey of the field with query string
-                instance = CourseKey.from_string(str(value))
+                instance = course_key_cache.parse(str(value))
                 # Passing instance to queryset filter
                 return queryset.filter(course_id=instance)
             except Exception:  # pylint: disable=broad-except
@@ -184,7 +286,7 @@ class ProctoredExamStudentAttemptFilter(BaseDataApiFilter):
     """
     TODO: add me
     """
-    site = django_filters.CharFilter(field_name="user__usersignupsource__site", lookup_expr='iexact')
+    site = MatchModeFilter(method="filter_site", default_match=EXACT)
     course_id = django_filters.CharFilter(field_name="proctored_exam__course_id", lookup_expr='iexact')
     exam_name = django_filters.CharFilter(field_name="proctored_exam__exam_name", lookup_expr='iexact')
 
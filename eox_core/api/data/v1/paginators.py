@@ -1,8 +1,9 @@
 """
-TODO: add me
+Paginators of the data-api.
 """
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class DataApiResultsSetPagination(PageNumberPagination):
@@ -12,3 +13,43 @@ class DataApiResultsSetPagination(PageNumberPagination):
     page_size = settings.DATA_API_DEF_PAGE_SIZE
     page_size_query_param = 'page_size'
     max_page_size = settings.DATA_API_MAX_PAGE_SIZE
+
+
+class DataApiCursorPagination(CursorPagination):
+    """
+    Keyset pagination used with `?pagination=cursor`, over the primary key by default.
+
+    Every page is read with a `WHERE id > last_id ... LIMIT page_size` query and
+    no total count is made, so the last pages cost the same as the first one.
+    The `next` and `previous` links carry an opaque cursor.
+
+    `?ordering=` selects another of the `cursor_ordering_fields` of the viewset,
+    which should be indexed and not null, e.g. `?ordering=-username`. The primary
+    key breaks the ties between rows sharing the same value.
+    """
+    page_size = settings.DATA_API_DEF_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.DATA_API_MAX_PAGE_SIZE
+    ordering = 'id'
+    ordering_query_param = 'ordering'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_query_param)
+        if not ordering:
+            return (self.ordering,)
+
+        field_name = ordering.lstrip('-')
+        allowed = getattr(view, 'cursor_ordering_fields', (self.ordering,))
+        if field_name not in allowed:
+            raise ValidationError({
+                self.ordering_query_param: f"Invalid ordering, the choices are: {', '.join(allowed)}",
+            })
+        if field_name == self.ordering:
+            return (ordering,)
+        return (ordering, ordering[:-len(field_name)] + self.ordering)
+
+    def get_ordering_fields(self, request, view):
+        """
+        Return the names of the fields the pages are ordered by.
+        """
+        return [field.lstrip('-') for field in self.get_ordering(request, None, view)]
@@ -0,0 +1,204 @@
+"""
+Values projection of the data-api serializers.
+
+The serializers of the data-api are read only and flat, so most of their fields
+map straight to a column of the queried model or of a related one. A projection
+turns the declared fields into a single `.values()` query and renders the rows
+from the returned dicts, avoiding the model instances and the per-field
+attribute lookups of the regular serialization.
+"""
+from __future__ import unicode_literals
+
+import six
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+
+PROJECTIONS_MAX_SIZE = 256
+_PROJECTIONS = {}
+
+
+class UnsupportedProjection(Exception):
+    """
+    The serializer declares a field that can't be read with a values() query.
+    """
+
+
+def get_projection(serializer_class, model, fields=None):
+    """
+    Return the ValuesProjection of `serializer_class` over `model`, or None if it can't be projected.
+
+    `fields` narrows the projection to a subset of the serializer fields.
+    """
+    key = (serializer_class, model, fields)
+    try:
+        return _PROJECTIONS[key]
+    except KeyError:
+        try:
+            projection = ValuesProjection(serializer_class, model, fields)
+        except UnsupportedProjection:
+            projection = None
+        if len(_PROJECTIONS) >= PROJECTIONS_MAX_SIZE:
+            _PROJECTIONS.clear()
+        _PROJECTIONS[key] = projection
+        return projection
+
+
+class ValuesProjection:
+    """
+    Read the fields declared by a serializer with a values() query.
+
+    The lookups are derived from the `source` of each field:
+
+    - Columns of the model and of the models reachable through forward or one to
+      one relations, e.g. `profile.name` is read as `profile__name`.
+    - `<field>_display` attributes of fields with choices.
+    - Many related fields with a `field` argument, e.g. the `site` of the
+      `usersignupsource_set`, which are read with one extra query per batch.
+    - SerializerMethodFields whose serializer defines `project_<field_name>` and
+      lists the lookups it needs in `projected_method_fields`.
+
+    The values are rendered with the `to_representation` of each field, so the
+    output matches the one of the serializer.
+    """
+
+    def __init__(self, serializer_class, model, fields=None):
+        self.model = model
+        self.pk_name = model._meta.pk.name
+        self.columns = []
+        self.many_columns = []
+        self.lookups = {self.pk_name}
+
+        serializer = serializer_class() if fields is None else serializer_class(fields=fields)
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.SerializerMethodField):
+                method = getattr(serializer, 'project_' + name, None)
+                sources = getattr(serializer, 'projected_method_fields', {}).get(name)
+                if method is None or sources is None:
+                    raise UnsupportedProjection(name)
+                lookups = [self.resolve(source.split('.'))[0] for source in sources]
+                self.columns.append((name, lookups, method))
+                self.lookups.update(lookups)
+            elif isinstance(field, ManyRelatedField):
+                self.many_columns.append((name, self.resolve_many(field)))
+                self.columns.append((name, [self.pk_name], None))
+            else:
+                lookup, transform = self.resolve(field.source_attrs)
+                self.columns.append((name, [lookup], self.representation(field, transform)))
+                self.lookups.add(lookup)
+
+    def resolve(self, attrs):
+        """
+        Return the values() lookup of a source and the function that transforms its value, if any.
+        """
+        model = self.model
+        path = []
+        for position, attr in enumerate(attrs):
+            last = position == len(attrs) - 1
+            try:
+                field = model._meta.get_field(attr)  # pylint: disable=protected-access
+            except FieldDoesNotExist as error:
+                display_transform = self.resolve_display(model, attr) if last else None
+                if display_transform is None:
+                    raise UnsupportedProjection(".".join(attrs)) from error
+                path.append(attr[:-len('_display')])
+                return '__'.join(path), display_transform
+
+            if not field.is_relation or attr == getattr(field, 'attname', None):
+                if not last:
+                    raise UnsupportedProjection(".".join(attrs))
+                path.append(attr)
+            elif last or field.many_to_many or field.one_to_many:
+                raise UnsupportedProjection(".".join(attrs))
+            else:
+                path.append(attr)
+                model = field.related_model
+
+        return '__'.join(path), None
+
+    @staticmethod
+    def resolve_display(model, attr):
+        """
+        Return the function that maps the value of a `<field>_display` attribute to its label.
+        """
+        if not attr.endswith('_display'):
+            return None
+        try:
+            field = model._meta.get_field(attr[:-len('_display')])  # pylint: disable=protected-access
+        except FieldDoesNotExist:
+            return None
+        if not field.choices:
+            return None
+
+        labels = dict(field.flatchoices)
+        return lambda value: labels.get(value, value) if value else None
+
+    def resolve_many(self, field):
+        """
+        Return the related model, the column pointing to the queried model and the column
+        read from the related objects of a many related field.
+        """
+        child = field.child_relation
+        column = getattr(child, 'field', None)
+        if column is None or len(field.source_attrs) != 1:
+            raise UnsupportedProjection(field.source)
+
+        for relation in self.model._meta.related_objects:  # pylint: disable=protected-access
+            if relation.one_to_many and relation.get_accessor_name() == field.source:
+                return relation.related_model, relation.field.attname, column
+        raise UnsupportedProjection(field.source)
+
+    @staticmethod
+    def representation(field, transform):
+        """
+        Return the function that renders a value of `field`.
+        """
+        def render(value):
+            if transform is not None:
+                value = transform(value)
+            if value is None:
+                return None
+            return field.to_representation(value)
+        return render
+
+    def get_queryset(self, queryset, extra_lookups=()):
+        """
+        Return the values() queryset with the columns read by the projection and `extra_lookups`.
+        """
+        return queryset.prefetch_related(None).values(*sorted(self.lookups.union(extra_lookups)))
+
+    def render(self, rows):
+        """
+        Return the list of serialized rows.
+        """
+        rows = list(rows)
+        many_values = {
+            name: self.fetch_many(relation, [row[self.pk_name] for row in rows])
+            for name, relation in self.many_columns
+        }
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookups, render in self.columns:
+                if render is None:
+                    item[name] = many_values[name].get(row[self.pk_name], [])
+                else:
+                    item[name] = render(*[row[lookup] for lookup in lookups])
+            data.append(item)
+        return data
+
+    @staticmethod
+    def fetch_many(relation, pks):
+        """
+        Return the values of a many related field grouped by the pk of the queried objects.
+        """
+        related_model, pk_column, column = relation
+        values = {}
+        if not pks:
+            return values
+
+        related = related_model._default_manager.filter(**{pk_column + '__in': pks}).values_list(pk_column, column)  # pylint: disable=protected-access
+        for object_pk, value in related:
+            values.setdefault(object_pk, []).append(six.text_type(value))
+        return values
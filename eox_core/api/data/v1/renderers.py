@@ -0,0 +1,119 @@
+"""
+Renderers for the streaming export mode of the data-api.
+"""
+from __future__ import unicode_literals
+
+import csv
+import io
+import json
+
+from rest_framework import renderers, serializers
+from rest_framework.utils import encoders
+
+
+class StreamingRenderer(renderers.BaseRenderer):
+    """
+    Base renderer for the formats that can be written as a stream of rows.
+
+    The viewsets feed `stream` with batches of serialized rows, so a whole
+    export is written without holding it in memory. `render` is only used for
+    the regular responses of the API, e.g. the authentication errors.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(self.stream([rows])).encode(self.charset)
+
+    def stream(self, batches, serializer=None):
+        """
+        Yield the text of each batch of rows, produced by `serializer` if it's given.
+        """
+        raise NotImplementedError('StreamingRenderer.stream() must be implemented.')
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """
+    Write one JSON document per row.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def stream(self, batches, serializer=None):
+        for rows in batches:
+            yield ''.join(
+                json.dumps(row, cls=encoders.JSONEncoder, ensure_ascii=False) + '\n'
+                for row in rows
+            )
+
+
+class CSVRenderer(StreamingRenderer):
+    """
+    Write the rows as CSV.
+
+    The header is made of the fields of the serializer, the fields of nested
+    serializers are flattened into dotted columns, e.g. `meta.personal_id`. Other
+    objects are written as JSON and lists are joined with commas. Without a
+    serializer, the header is made of the columns of the first batch and a
+    column only found in a later batch raises a ValueError.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, batches, serializer=None):
+        header = self.get_header(serializer.fields) if serializer is not None else None
+        columns = set(header) if header is not None else None
+        header_written = False
+        for rows in batches:
+            flat_rows = [self.flatten(row, columns) for row in rows]
+            if header is None:
+                header = list(dict.fromkeys(column for flat_row in flat_rows for column in flat_row))
+
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=header, restval='')
+            if not header_written:
+                writer.writeheader()
+                header_written = True
+            writer.writerows(flat_rows)
+            yield buffer.getvalue()
+
+        if not header_written and header:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(header)
+            yield buffer.getvalue()
+
+    def get_header(self, fields, prefix=''):
+        """
+        Return the columns of the serializer `fields`.
+        """
+        header = []
+        for name, field in fields.items():
+            if isinstance(field, serializers.Serializer) and field.fields:
+                header.extend(self.get_header(field.fields, prefix + name + '.'))
+            else:
+                header.append(prefix + name)
+        return header
+
+    def flatten(self, row, columns=None, prefix=''):
+        """
+        Return a single level dict with the values of `row`.
+
+        Objects are flattened unless `columns`, the set of columns of the header,
+        has one for them.
+        """
+        flat_row = {}
+        for key, value in row.items():
+            column = prefix + str(key)
+            known = columns is None or column in columns
+            if isinstance(value, dict) and (columns is None or column not in columns):
+                flat_row.update(self.flatten(value, columns, column + '.'))
+            elif isinstance(value, dict):
+                flat_row[column] = json.dumps(value, cls=encoders.JSONEncoder, ensure_ascii=False)
+            elif isinstance(value, (list, tuple)):
+                flat_row[column] = ','.join(str(item) for item in value)
+            elif value is not None or known:
+                # The columns of an empty nested object are left blank
+                flat_row[column] = value
+        return flat_row
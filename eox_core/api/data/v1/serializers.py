@@ -9,23 +9,36 @@ import logging
 from django.utils.duration import duration_string
 from rest_framework import serializers
 
-from eox_core.edxapp_wrapper.courseware import get_courseware_courses
-from eox_core.edxapp_wrapper.grades import get_course_grade_factory
+from eox_core.utils import CourseGradingCache
 
 from .fields import CustomRelatedField
 
 LOG = logging.getLogger(__name__)
 
 
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that only keeps the fields listed in the `fields` argument.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class MetaSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """Serializer for the blob information in the meta attibute, will return a
     a default dict with empty values if the user does not have the information available
     """
+    # The keys read from the blob, also the columns of the CSV exports
+    personal_id = serializers.CharField(read_only=True)
+
     def to_representation(self, instance):
         # Add all the possible fields
-        _fields = {
-            'personal_id': None,
-        }
+        _fields = {name: None for name in self.fields}
         try:
             _data = json.loads(instance)
             _output = {}
@@ -38,7 +51,7 @@ class MetaSerializer(serializers.Serializer):  # pylint: disable=abstract-method
             return _fields
 
 
-class UserSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+class UserSerializer(SparseFieldsetMixin, serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for the nested set of variables a user may include
     """
@@ -84,7 +97,7 @@ class UserSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     site = CustomRelatedField(source='usersignupsource_set', field='site', many=True)
 
 
-class CourseEnrollmentSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+class CourseEnrollmentSerializer(SparseFieldsetMixin, serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for the Course enrollment model
     """
@@ -106,14 +119,22 @@ class CourseEnrollmentWithGradesSerializer(CourseEnrollmentSerializer):  # pylin
         """
         TODO: add me
         """
-        grade_factory = get_course_grade_factory()
-        course = get_courseware_courses().get_course_by_id(obj.course_id)
-        user = obj.user
-        gradeset = grade_factory().read(user, course).summary
+        gradeset = self.get_grading_cache().read(obj.user, obj.course_id).summary
         return gradeset
 
+    def get_grading_cache(self):
+        """
+        Return the CourseGradingCache shared by every row of the serialization.
+
+        A cache can be passed in the `grading_cache` context key to read its counters afterwards.
+        """
+        grading_cache = self.context.get("grading_cache")
+        if grading_cache is None:
+            grading_cache = self.context["grading_cache"] = CourseGradingCache()
+        return grading_cache
+
 
-class CertificateSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+class CertificateSerializer(SparseFieldsetMixin, serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for Generated Certificates
     """
@@ -136,7 +157,7 @@ class CertificateSerializer(serializers.Serializer):  # pylint: disable=abstract
     key = serializers.CharField(max_length=32, read_only=True)
 
 
-class ProctoredExamStudentAttemptSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+class ProctoredExamStudentAttemptSerializer(SparseFieldsetMixin, serializers.Serializer):  # pylint: disable=abstract-method
     """
     Serializer for proctored exams attempts made by students
     """
@@ -160,12 +181,24 @@ class ProctoredExamStudentAttemptSerializer(serializers.Serializer):  # pylint:
 
     time_taken = serializers.SerializerMethodField()
 
+    # Lookups read by the values projection for each method field, see projections.ValuesProjection
+    projected_method_fields = {
+        'time_taken': ('started_at', 'completed_at'),
+    }
+
     def get_time_taken(self, obj):
         """
         TODO: add me
         """
+        return self.project_time_taken(obj.started_at, obj.completed_at)
+
+    @staticmethod
+    def project_time_taken(started_at, completed_at):
+        """
+        Return the duration of the attempt, or None if it hasn't been completed.
+        """
         try:
-            time_diff = obj.completed_at - obj.started_at
+            time_diff = completed_at - started_at
             result = duration_string(time_diff)
         except TypeError:
             result = None
@@ -1,12 +1,17 @@
 """
 TODO: add me
 """
+import logging
+
 from celery import Task
 
 from eox_core.edxapp_wrapper.users import get_course_enrollment
+from eox_core.utils import CourseGradingCache
 
 from .serializers import CourseEnrollmentWithGradesSerializer
 
+LOG = logging.getLogger(__name__)
+
 
 class EnrollmentsGrades(Task):
     """
@@ -25,3 +30,42 @@ class EnrollmentsGrades(Task):
         serializer = CourseEnrollmentWithGradesSerializer(enrollments_queryset, many=True)
 
         return serializer.data
+
+
+class EnrollmentsGradesChunk(Task):
+    """
+    Grade a chunk of the enrollments of a single course.
+    """
+
+    def run(self, enrollments_ids, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the enrollments with grades data. The course is loaded once for the whole chunk.
+        """
+        enrollments_queryset = get_course_enrollment().objects.filter(
+            id__in=enrollments_ids,
+        ).select_related("user").order_by("id")
+
+        grading_cache = CourseGradingCache()
+        serializer = CourseEnrollmentWithGradesSerializer(
+            enrollments_queryset,
+            many=True,
+            context={"grading_cache": grading_cache},
+        )
+        data = serializer.data
+
+        LOG.info("Graded %s enrollments, course cache %s.", len(data), grading_cache.stats())
+        return data
+
+
+class MergeEnrollmentsGrades(Task):
+    """
+    Merge the results of the EnrollmentsGradesChunk tasks of a job.
+    """
+
+    def run(self, results, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the graded enrollments of every chunk as a single list ordered by id.
+        """
+        data = [enrollment for chunk in results for enrollment in chunk]
+        data.sort(key=lambda enrollment: enrollment["id"])
+        return data
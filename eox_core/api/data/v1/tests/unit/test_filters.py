@@ -0,0 +1,63 @@
+"""
+Test module for the match modes of the data-api filters.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from eox_core.api.data.v1.filters import UserFilter
+from eox_core.models import UserSiteMembership
+
+
+class MatchModeFilterTest(TestCase):
+    """
+    Tests for the MatchModeFilter of the UserFilter.
+    """
+
+    def setUp(self):
+        """ Setup the filtered users """
+        self.john = User.objects.create(username="john", email="john@example.com")
+        self.johnny = User.objects.create(username="Johnny", email="johnny@example.com")
+        self.ajohn = User.objects.create(username="ajohn", email="ajohn@example.com")
+
+    def get_usernames(self, data):
+        """ Return the usernames of the users filtered with the data """
+        user_filter = UserFilter(data, queryset=User.objects.order_by("id"))
+        self.assertTrue(user_filter.is_valid(), user_filter.errors)
+        return list(user_filter.qs.values_list("username", flat=True))
+
+    def test_prefix_match_by_default(self):
+        """
+        The text fields match the start of the value by default, ignoring the case.
+        """
+        self.assertEqual(self.get_usernames({"username": "JOHN"}), ["john", "Johnny"])
+
+    def test_match_modes(self):
+        """
+        The match mode of the filter is selected with the `<name>_match` param.
+        """
+        self.assertEqual(self.get_usernames({"username": "john", "username_match": "exact"}), ["john"])
+        self.assertEqual(
+            self.get_usernames({"username": "john", "username_match": "contains"}),
+            ["john", "Johnny", "ajohn"],
+        )
+        self.assertEqual(len(self.get_usernames({"username_match": "exact"})), 3)
+
+    def test_invalid_match_mode(self):
+        """
+        Only the known match modes are accepted.
+        """
+        user_filter = UserFilter({"username": "john", "username_match": "regex"}, queryset=User.objects.all())
+
+        self.assertFalse(user_filter.is_valid())
+
+    @override_settings(EOX_CORE_USER_SITE_MEMBERSHIP_INDEX=True)
+    def test_site_filter_with_index(self):
+        """
+        The site is matched exactly by default in the site membership index.
+        """
+        UserSiteMembership.sync_user(self.john.id, UserSiteMembership.SIGNUP_SOURCE, ["site.example.com"])
+        UserSiteMembership.sync_user(self.johnny.id, UserSiteMembership.SIGNUP_SOURCE, ["site.example.com.co"])
+        UserSiteMembership.sync_user(self.ajohn.id, UserSiteMembership.CREATED_ON_SITE, ["site.example.com"])
+
+        self.assertEqual(self.get_usernames({"site": "Site.example.com"}), ["john"])
+        self.assertEqual(self.get_usernames({"site": "site.example", "site_match": "prefix"}), ["john", "Johnny"])
@@ -0,0 +1,58 @@
+"""
+Test module for the asynchronous grades of the data-api.
+"""
+from django.test import TestCase, override_settings
+from mock import MagicMock, patch
+
+from eox_core.api.data.v1.serializers import CourseEnrollmentWithGradesSerializer
+from eox_core.api.data.v1.tasks import MergeEnrollmentsGrades
+from eox_core.api.data.v1.viewsets import CourseEnrollmentWithGradesViewset
+
+
+class EnrollmentsGradesTest(TestCase):
+    """ Tests for the chunked grades job. """
+
+    @override_settings(DATA_API_GRADES_CHUNK_SIZE=2)
+    def test_chunks_are_grouped_by_course(self):
+        """
+        Test every chunk holds enrollments of a single course, up to DATA_API_GRADES_CHUNK_SIZE.
+        """
+        queryset = MagicMock()
+        queryset.order_by.return_value.values_list.return_value = [
+            (1, "course-v1:org+a+run"),
+            (4, "course-v1:org+a+run"),
+            (7, "course-v1:org+a+run"),
+            (2, "course-v1:org+b+run"),
+        ]
+
+        chunks = list(CourseEnrollmentWithGradesViewset.get_course_chunks(queryset))
+
+        queryset.order_by.assert_called_once_with("course_id", "id")
+        self.assertEqual(chunks, [[1, 4], [7], [2]])
+
+    def test_merge_results(self):
+        """
+        Test the results of the chunks are merged in a single list ordered by id.
+        """
+        results = [[{"id": 3}, {"id": 5}], [], [{"id": 1}]]
+
+        data = MergeEnrollmentsGrades().run(results)
+
+        self.assertEqual(data, [{"id": 1}, {"id": 3}, {"id": 5}])
+
+    @patch("eox_core.utils.get_course_grade_factory")
+    @patch("eox_core.utils.get_courseware_courses")
+    def test_course_is_loaded_once(self, courses_mock, grade_factory_mock):
+        """
+        Test the course of the enrollments is loaded once per serialization.
+        """
+        grade_factory_mock.return_value.return_value.read.return_value.summary = {"percent": 0.5}
+        enrollments = [
+            MagicMock(id=1, user_id=1, course_id="course-v1:org+a+run", mode="audit"),
+            MagicMock(id=2, user_id=2, course_id="course-v1:org+a+run", mode="audit"),
+        ]
+
+        data = CourseEnrollmentWithGradesSerializer(enrollments, many=True).data
+
+        courses_mock.return_value.get_course_by_id.assert_called_once_with("course-v1:org+a+run")
+        self.assertEqual([item["grades"] for item in data], [{"percent": 0.5}, {"percent": 0.5}])
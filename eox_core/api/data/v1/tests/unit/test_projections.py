@@ -0,0 +1,127 @@
+"""
+Test module for the values projection of the data-api serializers.
+"""
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from edx_proctoring.models import ProctoredExam, ProctoredExamStudentAttempt  # pylint: disable=import-error
+from rest_framework import serializers
+
+from eox_core.api.data.v1.fields import CustomRelatedField
+from eox_core.api.data.v1.projections import get_projection
+from eox_core.api.data.v1.serializers import ProctoredExamStudentAttemptSerializer
+from eox_core.models import Redirection
+
+
+class AttemptSerializer(ProctoredExamStudentAttemptSerializer):  # pylint: disable=abstract-method
+    """ The attempts serializer without the fields of the edxapp user profile. """
+    name = None
+
+
+class ExamSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with a many related field. """
+    exam_name = serializers.CharField(read_only=True)
+    attempts = CustomRelatedField(source='proctoredexamstudentattempt_set', field='status', many=True)
+
+
+class RedirectionSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with a display field. """
+    domain = serializers.CharField(read_only=True)
+    status_display = serializers.CharField(read_only=True)
+
+
+class RedirectionTargetSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with a method field without projection. """
+    target = serializers.SerializerMethodField()
+
+    def get_target(self, obj):
+        """ Return the target of the redirection. """
+        return obj.target
+
+
+class ValuesProjectionTest(TestCase):
+    """ Tests for the ValuesProjection class. """
+
+    def setUp(self):
+        """ setup """
+        self.user = User.objects.create(username="projection", email="projection@example.com")
+        self.exam = ProctoredExam.objects.create(  # pylint: disable=no-member
+            course_id="course-v1:org+course+run",
+            content_id="content",
+            external_id="external",
+            exam_name="Final exam",
+            time_limit_mins=60,
+        )
+        started_at = datetime(2023, 1, 1)
+        ProctoredExamStudentAttempt.objects.create(
+            user=self.user,
+            proctored_exam=self.exam,
+            status="submitted",
+            started_at=started_at,
+            completed_at=started_at + timedelta(minutes=42),
+        )
+        ProctoredExamStudentAttempt.objects.create(
+            user=User.objects.create(username="unfinished"),
+            proctored_exam=self.exam,
+            status="started",
+            started_at=started_at,
+        )
+
+    def test_projection_matches_serializer(self):
+        """
+        Test the projected rows are equal to the serialized instances, including the method fields.
+        """
+        queryset = ProctoredExamStudentAttempt.objects.order_by("id")
+        projection = get_projection(AttemptSerializer, ProctoredExamStudentAttempt)
+
+        with self.assertNumQueries(1):
+            data = projection.render(projection.get_queryset(queryset))
+
+        self.assertEqual(data, AttemptSerializer(queryset, many=True).data)
+        self.assertEqual(data[0]["time_taken"], "00:42:00")
+        self.assertIsNone(data[1]["time_taken"])
+
+    def test_many_related_field(self):
+        """
+        Test the many related fields are read with one extra query.
+        """
+        queryset = ProctoredExam.objects.all()  # pylint: disable=no-member
+        projection = get_projection(ExamSerializer, ProctoredExam)
+
+        with self.assertNumQueries(2):
+            data = projection.render(projection.get_queryset(queryset))
+
+        self.assertEqual(data, [{"exam_name": "Final exam", "attempts": ["submitted", "started"]}])
+
+    def test_display_field(self):
+        """
+        Test the `<field>_display` sources are rendered with the labels of the choices.
+        """
+        Redirection.objects.create(domain="example.com", target="example.org", status=302)  # pylint: disable=no-member
+        projection = get_projection(RedirectionSerializer, Redirection)
+
+        data = projection.render(projection.get_queryset(Redirection.objects.all()))  # pylint: disable=no-member
+
+        self.assertEqual(data, [{"domain": "example.com", "status_display": "Permanent"}])
+
+    def test_unsupported_field(self):
+        """
+        Test the serializers with fields that can't be projected are not projected.
+        """
+        self.assertIsNone(get_projection(RedirectionTargetSerializer, Redirection))
+
+    def test_sparse_fieldset(self):
+        """
+        Test the projection of a subset of the fields only reads their columns.
+        """
+        queryset = ProctoredExamStudentAttempt.objects.order_by("id")
+        projection = get_projection(AttemptSerializer, ProctoredExamStudentAttempt, ("username", "time_taken"))
+
+        data = projection.render(projection.get_queryset(queryset))
+
+        self.assertEqual(projection.lookups, {"id", "user__username", "started_at", "completed_at"})
+        self.assertEqual(data, [
+            {"username": "projection", "time_taken": "00:42:00"},
+            {"username": "unfinished", "time_taken": None},
+        ])
@@ -0,0 +1,172 @@
+"""
+Test module for the streaming renderers of the data-api.
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from edx_proctoring.models import ProctoredExam, ProctoredExamStudentAttempt  # pylint: disable=import-error
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from eox_core.api.data.v1.renderers import CSVRenderer, NDJSONRenderer
+from eox_core.api.data.v1.serializers import MetaSerializer, ProctoredExamStudentAttemptSerializer
+from eox_core.api.data.v1.viewsets import ProctoredExamStudentViewSet
+
+
+class ProfileSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with a nested serializer, an object and a list. """
+    username = serializers.CharField(read_only=True)
+    meta = MetaSerializer(read_only=True)
+    extra = serializers.DictField(read_only=True)
+    sites = serializers.ListField(read_only=True)
+
+
+class AttemptSerializer(ProctoredExamStudentAttemptSerializer):  # pylint: disable=abstract-method
+    """ The attempts serializer without the fields of the edxapp user profile. """
+    name = None
+
+
+class AttemptViewSet(ProctoredExamStudentViewSet):  # pylint: disable=too-many-ancestors
+    """ The attempts viewset without the fields of the edxapp user profile. """
+    serializer_class = AttemptSerializer
+
+
+def read_stream(renderer, batches, serializer=None):
+    """ Return the whole text written by the renderer. """
+    return "".join(renderer.stream(batches, serializer=serializer))
+
+
+class NDJSONRendererTest(TestCase):
+    """ Tests for the NDJSONRenderer. """
+
+    def test_one_document_per_row(self):
+        """ Every row is written as a JSON document in its own line, across batches. """
+        text = read_stream(NDJSONRenderer(), [[{"id": 1, "name": "á"}], [{"id": 2, "name": None}]])
+
+        self.assertEqual(
+            [json.loads(line) for line in text.splitlines()],
+            [{"id": 1, "name": "á"}, {"id": 2, "name": None}],
+        )
+
+    def test_no_rows(self):
+        """ Nothing is written without rows. """
+        self.assertEqual(read_stream(NDJSONRenderer(), []), "")
+
+
+class CSVRendererTest(TestCase):
+    """ Tests for the CSVRenderer. """
+
+    def test_header_from_the_serializer(self):
+        """
+        The nested serializers are flattened, other objects are written as JSON and
+        the columns missing from a row are left blank.
+        """
+        batches = [
+            [{"username": "first", "meta": None, "extra": {}, "sites": []}],
+            [
+                {"username": "second", "meta": {"personal_id": "123"}, "extra": {"a": 1}, "sites": ["a", "b"]},
+                {"username": "third"},
+            ],
+        ]
+
+        text = read_stream(CSVRenderer(), batches, serializer=ProfileSerializer())
+
+        self.assertEqual(text.splitlines(), [
+            "username,meta.personal_id,extra,sites",
+            "first,,{},",
+            'second,123,"{""a"": 1}","a,b"',
+            "third,,,",
+        ])
+
+    def test_no_rows_with_serializer(self):
+        """ An empty export still has the header. """
+        text = read_stream(CSVRenderer(), [], serializer=ProfileSerializer())
+
+        self.assertEqual(text.splitlines(), ["username,meta.personal_id,extra,sites"])
+
+    def test_header_from_the_first_batch(self):
+        """ Without serializer, the columns of the whole first batch are used. """
+        text = read_stream(CSVRenderer(), [[{"id": 1}, {"id": 2, "meta": {"personal_id": "123"}}]])
+
+        self.assertEqual(text.splitlines(), ["id,meta.personal_id", "1,", "2,123"])
+
+    def test_unknown_column_in_later_batch(self):
+        """ Without serializer, a column missing from the header fails instead of being dropped. """
+        with self.assertRaises(ValueError):
+            read_stream(CSVRenderer(), [[{"id": 1}], [{"id": 2, "status": "new"}]])
+
+    def test_render(self):
+        """ The regular responses, like the errors, are rendered as well. """
+        self.assertEqual(CSVRenderer().render({"detail": "Forbidden"}), b"detail\r\nForbidden\r\n")
+        self.assertEqual(CSVRenderer().render(None), b"")
+
+
+@override_settings(EOX_CORE_USER_ENABLE_MULTI_TENANCY=False)
+class StreamedExportTest(TestCase):
+    """ Tests for the streamed exports of the viewsets. """
+
+    def setUp(self):
+        """ Setup an admin user and the view of the attempts """
+        self.admin = User.objects.create(username="admin", is_staff=True)
+        self.view = AttemptViewSet.as_view({"get": "list"})
+
+    def get(self, export_format):
+        """ Return the text of a streamed export. """
+        request = APIRequestFactory().get("/", {"format": export_format})
+        force_authenticate(request, user=self.admin)
+        response = self.view(request)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_empty_queryset(self):
+        """ An export without rows has the header in CSV and nothing in NDJSON. """
+        self.assertEqual(
+            self.get("csv").splitlines(),
+            ["username,email,status,started_at,completed_at,exam_name,course_id,time_taken"],
+        )
+        self.assertEqual(self.get("ndjson"), "")
+
+    def test_export(self):
+        """ Every row of the queryset is exported. """
+        exam = ProctoredExam.objects.create(  # pylint: disable=no-member
+            course_id="course-v1:org+course+run",
+            content_id="content",
+            external_id="external",
+            exam_name="Final exam",
+            time_limit_mins=60,
+        )
+        for username in ("first", "second"):
+            user = User.objects.create(username=username, email=f"{username}@example.com")
+            ProctoredExamStudentAttempt.objects.create(user=user, proctored_exam=exam, status="started")
+
+        self.assertEqual(self.get("csv").splitlines()[1:], [
+            "first,first@example.com,started,,,Final exam,course-v1:org+course+run,",
+            "second,second@example.com,started,,,Final exam,course-v1:org+course+run,",
+        ])
+        self.assertEqual(
+            [json.loads(line)["username"] for line in self.get("ndjson").splitlines()],
+            ["first", "second"],
+        )
+
+    @override_settings(DATA_API_STREAM_CHUNK_SIZE=2)
+    def test_export_in_batches(self):
+        """ The rows are read in batches by primary key, with or without the values projection. """
+        exam = ProctoredExam.objects.create(  # pylint: disable=no-member
+            course_id="course-v1:org+course+run",
+            content_id="content",
+            external_id="external",
+            exam_name="Final exam",
+            time_limit_mins=60,
+        )
+        usernames = ["first", "second", "third"]
+        for username in reversed(usernames):
+            user = User.objects.create(username=username, email=f"{username}@example.com")
+            ProctoredExamStudentAttempt.objects.create(user=user, proctored_exam=exam, status="started")
+
+        for projection in (True, False):
+            with self.settings(DATA_API_ENABLE_VALUES_PROJECTION=projection):
+                self.assertEqual(
+                    [json.loads(line)["username"] for line in self.get("ndjson").splitlines()],
+                    list(reversed(usernames)),
+                )
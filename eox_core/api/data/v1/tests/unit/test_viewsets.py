@@ -0,0 +1,228 @@
+"""
+Test module for the data-api viewsets.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from edx_proctoring.models import ProctoredExam, ProctoredExamStudentAttempt  # pylint: disable=import-error
+from mock import patch
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from eox_core.api.data.v1.serializers import ProctoredExamStudentAttemptSerializer
+from eox_core.api.data.v1.viewsets import ProctoredExamStudentViewSet
+from eox_core.utils import OrgCourseIdsCache
+
+
+class AttemptSerializer(ProctoredExamStudentAttemptSerializer):  # pylint: disable=abstract-method
+    """ The attempts serializer without the fields of the edxapp user profile. """
+    name = None
+
+
+class AttemptViewSet(ProctoredExamStudentViewSet):  # pylint: disable=too-many-ancestors
+    """ The attempts viewset without the fields of the edxapp user profile. """
+    serializer_class = AttemptSerializer
+    cursor_ordering_fields = ("id", "status")
+
+
+class DataApiViewSetTestCase(TestCase):
+    """
+    Base test case that lists the attempts of a few users with the attempts viewset.
+    """
+
+    def setUp(self):
+        """ Setup an admin user and the attempts of five users """
+        self.admin = User.objects.create(username="admin", is_staff=True)
+        self.exam = ProctoredExam.objects.create(  # pylint: disable=no-member
+            course_id="course-v1:org+course+run",
+            content_id="content",
+            external_id="external",
+            exam_name="Final exam",
+            time_limit_mins=60,
+        )
+        for number, status in enumerate(("started", "submitted", "started", "error", "submitted")):
+            user = User.objects.create(username=f"student{number}", email=f"student{number}@example.com")
+            ProctoredExamStudentAttempt.objects.create(user=user, proctored_exam=self.exam, status=status)
+
+    def get(self, path="/", **params):
+        """ Return the response of the attempts viewset """
+        request = APIRequestFactory().get(path, params)
+        force_authenticate(request, user=self.admin)
+        with override_settings(EOX_CORE_USER_ENABLE_MULTI_TENANCY=False):
+            response = AttemptViewSet.as_view({"get": "list"})(request)
+            response.render()
+        return response
+
+    def get_all_pages(self, **params):
+        """ Return the results of every page of a cursor paginated list """
+        response = self.get(**params)
+        pages = [response.data["results"]]
+        while response.data["next"]:
+            response = self.get(response.data["next"])
+            pages.append(response.data["results"])
+        return pages
+
+
+class CursorPaginationTest(DataApiViewSetTestCase):
+    """
+    Tests for the cursor pagination of the viewsets.
+    """
+
+    def test_page_number_pagination_by_default(self):
+        """
+        The pages are numbered and counted unless the cursor pagination is requested.
+        """
+        response = self.get(page_size=2)
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_cursor_pagination(self):
+        """
+        `?pagination=cursor` pages through every attempt by id, without counting them.
+        """
+        pages = self.get_all_pages(pagination="cursor", page_size=2)
+
+        self.assertEqual(
+            [[attempt["username"] for attempt in page] for page in pages],
+            [["student0", "student1"], ["student2", "student3"], ["student4"]],
+        )
+        self.assertNotIn("count", self.get(pagination="cursor").data)
+
+    def test_cursor_pagination_ordering(self):
+        """
+        `?ordering=` orders the pages by an allowed field, breaking the ties by id.
+        """
+        pages = self.get_all_pages(pagination="cursor", page_size=2, ordering="-status", fields="username")
+
+        self.assertEqual(
+            [[attempt["username"] for attempt in page] for page in pages],
+            [["student4", "student1"], ["student2", "student0"], ["student3"]],
+        )
+
+    def test_cursor_pagination_invalid_ordering(self):
+        """
+        Ordering by a field that isn't allowed is rejected.
+        """
+        response = self.get(pagination="cursor", ordering="email")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ordering", response.data)
+
+
+@override_settings(EOX_CORE_USER_ENABLE_MULTI_TENANCY=True)
+class EnforceMicrositeFilterTest(TestCase):
+    """
+    Tests for the org filter of the viewsets, with the proctored exam attempts.
+    """
+
+    def setUp(self):
+        """ Setup the attempts of the exams of two orgs """
+        OrgCourseIdsCache.CACHE_VERSION.bump()
+        user = User.objects.create(username="student")
+        for course_id in ("course-v1:org_a+course+run", "course-v1:org_b+course+run"):
+            exam = ProctoredExam.objects.create(  # pylint: disable=no-member
+                course_id=course_id,
+                content_id=course_id,
+                external_id=course_id,
+                exam_name="Final exam",
+                time_limit_mins=60,
+            )
+            ProctoredExamStudentAttempt.objects.create(user=user, proctored_exam=exam, status="started")
+
+    def get_course_ids(self, orgs):
+        """ Return the course ids of the attempts seen by a site with the orgs """
+        with override_settings(course_org_filter=orgs):
+            queryset = ProctoredExamStudentViewSet().enforce_microsite_filter_qset(
+                ProctoredExamStudentAttempt.objects.all()
+            )
+            return list(queryset.values_list("proctored_exam__course_id", flat=True))
+
+    @patch.object(OrgCourseIdsCache, "fetch_course_ids")
+    def test_courses_of_the_orgs(self, fetch_mock):
+        """
+        Only the attempts in the courses of the orgs of the site are returned.
+        """
+        fetch_mock.return_value = ["course-v1:org_a+course+run"]
+
+        self.assertEqual(self.get_course_ids("org_a"), ["course-v1:org_a+course+run"])
+        self.assertEqual(self.get_course_ids(["org_a"]), ["course-v1:org_a+course+run"])
+        fetch_mock.assert_called_once_with(["org_a"])
+
+    def test_site_without_orgs(self):
+        """
+        A site without orgs sees no attempts.
+        """
+        self.assertEqual(self.get_course_ids([]), [])
+
+
+class SparseFieldsetTest(DataApiViewSetTestCase):
+    """
+    Tests for the `fields` and `exclude` query params of the viewsets.
+    """
+
+    def get_view(self, **params):
+        """ Return the attempts viewset initialized with a request """
+        view = AttemptViewSet(action="list", action_map={"get": "list"}, format_kwarg=None, args=(), kwargs={})
+        view.request = view.initialize_request(APIRequestFactory().get("/", params))  # pylint: disable=attribute-defined-outside-init
+        view.requested_fields = view.get_requested_fields(view.request)
+        return view
+
+    def test_fields(self):
+        """
+        `?fields=` keeps the listed fields, in the order of the serializer.
+        """
+        response = self.get(fields="status, username")
+
+        self.assertEqual(list(response.data["results"][0]), ["username", "status"])
+
+    def test_exclude(self):
+        """
+        `?exclude=` drops the listed fields, also when combined with `?fields=`.
+        """
+        response = self.get(exclude="email,time_taken,course_id,exam_name,started_at,completed_at")
+        self.assertEqual(list(response.data["results"][0]), ["username", "status"])
+
+        response = self.get(fields="username,status", exclude="status")
+        self.assertEqual(list(response.data["results"][0]), ["username"])
+
+    def test_fields_without_values_projection(self):
+        """
+        The fields are also narrowed when the rows are serialized from the model instances.
+        """
+        with patch.object(AttemptViewSet, "values_projection", False):
+            response = self.get(fields="username,time_taken")
+
+        self.assertEqual(response.data["results"][0], {"username": "student0", "time_taken": None})
+
+    def test_unknown_fields(self):
+        """
+        Unknown fields in `?fields=` or `?exclude=` are rejected.
+        """
+        for params in ({"fields": "username,password"}, {"exclude": "password"}):
+            response = self.get(**params)
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {"fields": "Unknown fields: password"})
+
+    def test_prefetch_fields_of_the_requested_fields(self):
+        """
+        Only the relations used by the requested fields are prefetched.
+        """
+        self.assertEqual(self.get_view().get_prefetch_fields(), AttemptViewSet.prefetch_fields)
+        self.assertEqual(self.get_view(fields="status").get_prefetch_fields(), [])
+        self.assertEqual(
+            self.get_view(fields="status,email").get_prefetch_fields(),
+            [{"name": "user", "type": "select"}],
+        )
+        self.assertEqual(
+            self.get_view(exclude="username,email,time_taken").get_prefetch_fields(),
+            [{"name": "proctored_exam", "type": "select"}],
+        )
+
+    def test_method_fields_keep_every_prefetch_field(self):
+        """
+        A method field can read any relation, so all of them are prefetched.
+        """
+        self.assertEqual(
+            self.get_view(fields="status,time_taken").get_prefetch_fields(),
+            AttemptViewSet.prefetch_fields,
+        )
@@ -6,6 +6,8 @@ from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from eox_core.utils import BulkJobProgress
+
 
 class CeleryTasksStatus(APIView):
     """
@@ -16,8 +18,10 @@ class CeleryTasksStatus(APIView):
     def get(self, request, task_id=None, *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg
         """
         Return the task status and its result, if already calculated.
+
+        The bulk jobs of the API v1 are only served by their authenticated view.
         """
-        if not task_id:
+        if not task_id or task_id.startswith(BulkJobProgress.JOB_ID_PREFIX):
             raise NotFound()
 
         task_res = AsyncResult(task_id)
@@ -5,59 +5,209 @@ import random
 from datetime import datetime
 
 import six
+from celery import chord
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 from django_filters import rest_framework as filters  # pylint: disable=import-error
 from edx_proctoring.models import ProctoredExamStudentAttempt  # pylint: disable=import-error
-from rest_framework import mixins, status, viewsets
+from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from eox_core.edxapp_wrapper.bearer_authentication import BearerAuthentication
 from eox_core.edxapp_wrapper.certificates import get_generated_certificate
 from eox_core.edxapp_wrapper.users import get_course_enrollment
+from eox_core.utils import OrgCourseIdsCache
 
 from .filters import CourseEnrollmentFilter, GeneratedCerticatesFilter, ProctoredExamStudentAttemptFilter, UserFilter
-from .paginators import DataApiResultsSetPagination
+from .paginators import DataApiCursorPagination, DataApiResultsSetPagination
+from .projections import get_projection
+from .renderers import CSVRenderer, NDJSONRenderer, StreamingRenderer
 from .serializers import (
     CertificateSerializer,
     CourseEnrollmentSerializer,
     ProctoredExamStudentAttemptSerializer,
     UserSerializer,
 )
-from .tasks import EnrollmentsGrades
+from .tasks import EnrollmentsGradesChunk, MergeEnrollmentsGrades
 
 
 class DataApiViewSet(mixins.ListModelMixin,
                      viewsets.GenericViewSet):
     """
     A generic viewset for all the instances of the data-api
+
+    The pages are numbered by default, `?pagination=cursor` selects the keyset
+    pagination instead, which can be ordered by one of the `cursor_ordering_fields`
+    with `?ordering=`. `?fields=` and `?exclude=` take comma separated lists of
+    fields to narrow the output, and with it the queried relations and columns.
+    Besides the paginated JSON responses, the list can be exported in a single
+    streamed response with `?format=csv` or `?format=ndjson`.
     """
     authentication_classes = (BearerAuthentication, SessionAuthentication)
     permission_classes = (IsAdminUser,)
+    renderer_classes = tuple(api_settings.DEFAULT_RENDERER_CLASSES) + (CSVRenderer, NDJSONRenderer)
 
     pagination_class = DataApiResultsSetPagination
+    cursor_pagination_class = DataApiCursorPagination
+    # Indexed, not null fields the cursor pagination can be ordered by with `?ordering=`
+    cursor_ordering_fields = ("id",)
     filter_backends = (filters.DjangoFilterBackend,)
     prefetch_fields = False
+    # Read the serializer fields with a values() query when they can be projected
+    values_projection = True
+    # Fields selected with the `fields` and `exclude` query params, None keeps all of them
+    requested_fields = None
     # Microsite enforcement filter settings
     enforce_microsite_filter = False
     enforce_microsite_filter_lookup_field = "test_lookup_field"
     enforce_microsite_filter_term = "org_in_course_id"
+    # Course id field of the model. When set, the org filter is enforced with an IN
+    # lookup on the ids of the courses of the orgs instead of the lookup field
+    enforce_microsite_filter_course_field = None
 
     def get_queryset(self):
         """
         This method returns the queryset to be processed by the viewset
         """
         queryset = self.queryset
-        if self.prefetch_fields:
-            queryset = self.add_prefetch_fields_to_queryset(queryset, self.prefetch_fields)
+        prefetch_fields = self.get_prefetch_fields()
+        if prefetch_fields:
+            queryset = self.add_prefetch_fields_to_queryset(queryset, prefetch_fields)
         if self.enforce_microsite_filter:
             queryset = self.enforce_microsite_filter_qset(queryset)
         return queryset
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.requested_fields = self.get_requested_fields(request)
+
+    def get_requested_fields(self, request):
+        """
+        Return the tuple of serializer fields selected with `?fields=` and `?exclude=`, or None to keep all.
+        """
+        fields_param = request.query_params.get("fields")
+        exclude_param = request.query_params.get("exclude")
+        if not fields_param and not exclude_param:
+            return None
+
+        serializer_class = self.get_serializer_class()
+        available = list(serializer_class().fields)  # pylint: disable=not-callable
+        included = {name.strip() for name in fields_param.split(",")} if fields_param else set(available)
+        excluded = {name.strip() for name in exclude_param.split(",")} if exclude_param else set()
+        unknown = (included | excluded) - set(available)
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return tuple(name for name in available if name in included - excluded)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.requested_fields is not None:
+            kwargs.setdefault("fields", self.requested_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_prefetch_fields(self):
+        """
+        Return the entries of `prefetch_fields` used by the requested fields.
+        """
+        if not self.prefetch_fields or self.requested_fields is None:
+            return self.prefetch_fields
+
+        sources = set()
+        for field in self.get_serializer().fields.values():
+            if isinstance(field, serializers.SerializerMethodField):
+                return self.prefetch_fields
+            sources.add(field.source_attrs[0] if field.source_attrs else "")
+
+        return [
+            val for val in self.prefetch_fields  # pylint: disable=not-an-iterable
+            if val.get("name", "").split("__")[0] in sources
+        ]
+
+    @property
+    def paginator(self):
+        """
+        The paginator instance selected by the `pagination` query param of the request.
+        """
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.pagination_class
+            if self.request.query_params.get('pagination') == 'cursor' or 'cursor' in self.request.query_params:
+                pagination_class = self.cursor_pagination_class
+            self._paginator = pagination_class()  # pylint: disable=attribute-defined-outside-init
+        return self._paginator
+
+    def get_projection(self, queryset):
+        """
+        Return the values projection of the serializer over the queryset model, if it's enabled and supported.
+        """
+        if not self.values_projection or not getattr(settings, "DATA_API_ENABLE_VALUES_PROJECTION", True):
+            return None
+        return get_projection(self.get_serializer_class(), queryset.model, self.requested_fields)
+
+    def list(self, request, *args, **kwargs):
+        if isinstance(request.accepted_renderer, StreamingRenderer):
+            return self.stream_list(request.accepted_renderer)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        projection = self.get_projection(queryset)
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+
+        ordering_fields = ()
+        if isinstance(self.paginator, DataApiCursorPagination):
+            # The cursor of a page is read from the fields it's ordered by
+            ordering_fields = self.paginator.get_ordering_fields(request, self)
+        page = self.paginate_queryset(projection.get_queryset(queryset, ordering_fields))
+        if page is not None:
+            return self.get_paginated_response(projection.render(page))
+        return Response(projection.render(queryset))
+
+    def stream_list(self, renderer):
+        """
+        Return the whole filtered queryset in a streamed response, without pagination.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            renderer.stream(self.serialize_in_batches(queryset), serializer=self.get_serializer()),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        filename = getattr(self, "basename", None) or "data-api"
+        response["Content-Disposition"] = f'attachment; filename="{filename}.{renderer.format}"'
+        return response
+
+    def serialize_in_batches(self, queryset):
+        """
+        Yield the serialized rows of the queryset in batches of DATA_API_STREAM_CHUNK_SIZE.
+
+        The rows are read by primary key, one query per batch after the last key of the
+        previous one, so only one batch is kept in memory. A server side cursor wouldn't
+        do: the MySQL backend of Django loads the whole result of `iterator()` at once.
+        """
+        chunk_size = getattr(settings, "DATA_API_STREAM_CHUNK_SIZE", 2000)
+        projection = self.get_projection(queryset)
+        if projection is not None:
+            queryset = projection.get_queryset(queryset)
+        queryset = queryset.order_by("pk")
+
+        last_pk = None
+        while True:
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(page[:chunk_size])
+            if not batch:
+                return
+            if projection is not None:
+                last_pk = batch[-1][projection.pk_name]
+                yield projection.render(batch)
+            else:
+                last_pk = batch[-1].pk
+                yield self.get_serializer(batch, many=True).data
+            if len(batch) < chunk_size:
+                return
+
     def add_prefetch_fields_to_queryset(self, queryset, fields=None):
         """
         This method adds prefetched fields to the queryset in order to
@@ -100,6 +250,12 @@ class DataApiViewSet(mixins.ListModelMixin,
         if not org_filters:
             return queryset.none()
 
+        if self.enforce_microsite_filter_course_field and self.enforce_microsite_filter_term == "org_in_course_id":
+            orgs = [org_filters] if isinstance(org_filters, six.string_types) else org_filters
+            return queryset.filter(**{
+                f"{self.enforce_microsite_filter_course_field}__in": OrgCourseIdsCache.get_course_ids(orgs),
+            })
+
         term_types = {
             "org_exact": "{}",
             "org_in_course_id": ":{}+"
@@ -135,6 +291,7 @@ class UsersViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
     serializer_class = UserSerializer
     queryset = User.objects.all()
     filter_class = UserFilter
+    cursor_ordering_fields = ("id", "username")
     prefetch_fields = [
         {
             "name": "profile",
@@ -154,10 +311,12 @@ class CourseEnrollmentViewset(DataApiViewSet):  # pylint: disable=too-many-ances
     serializer_class = CourseEnrollmentSerializer
     queryset = get_course_enrollment().objects.all()
     filter_class = CourseEnrollmentFilter
+    cursor_ordering_fields = ("id", "user_id")
     # Microsite enforcement filter settings
     enforce_microsite_filter = True
     enforce_microsite_filter_lookup_field = "course__id__contains"
     enforce_microsite_filter_term = "org_in_course_id"
+    enforce_microsite_filter_course_field = "course_id"
 
 
 class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-many-ancestors
@@ -166,6 +325,10 @@ class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-
     This view will create a celery task to fetch grades data for
     enrollments in the background, and will return the id of the
     celery task
+
+    The enrollments are grouped by course and graded in chunks of
+    DATA_API_GRADES_CHUNK_SIZE by parallel subtasks, whose results are
+    merged by the task returned to the client.
     """
     serializer_class = CourseEnrollmentSerializer
     queryset = get_course_enrollment().objects.all()
@@ -174,24 +337,24 @@ class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-
     enforce_microsite_filter = True
     enforce_microsite_filter_lookup_field = "course__id__contains"
     enforce_microsite_filter_term = "org_in_course_id"
+    enforce_microsite_filter_course_field = "course_id"
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
 
         now_date = datetime.now()
         string_now_date = now_date.strftime("%Y-%m-%d-%H-%M-%S")
         randnum = random.randint(100, 999)
         task_id = "data_api-" + string_now_date + "-" + str(randnum)
 
-        named_args = {
-            "data": serializer.data,
-        }
-
-        task = EnrollmentsGrades().apply_async(
-            kwargs=named_args,
+        routing_key = settings.GRADES_DOWNLOAD_ROUTING_KEY
+        chunks = [
+            EnrollmentsGradesChunk().s(enrollments_ids).set(routing_key=routing_key)
+            for enrollments_ids in self.get_course_chunks(queryset)
+        ]
+        task = chord(chunks, MergeEnrollmentsGrades().s()).apply_async(
             task_id=task_id,
-            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY
+            routing_key=routing_key,
         )
 
         url_task_status = request.build_absolute_uri(
@@ -203,6 +366,23 @@ class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-
         }
         return Response(data_response, status=status.HTTP_202_ACCEPTED)
 
+    @staticmethod
+    def get_course_chunks(queryset):
+        """
+        Yield the ids of the enrollments in chunks that belong to a single course.
+        """
+        chunk_size = getattr(settings, "DATA_API_GRADES_CHUNK_SIZE", 500)
+        course_id = None
+        chunk = []
+        for enrollment_id, enrollment_course_id in queryset.order_by("course_id", "id").values_list("id", "course_id"):
+            if chunk and (enrollment_course_id != course_id or len(chunk) >= chunk_size):
+                yield chunk
+                chunk = []
+            course_id = enrollment_course_id
+            chunk.append(enrollment_id)
+        if chunk:
+            yield chunk
+
 
 class CertificateViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
     """
@@ -220,6 +400,7 @@ class CertificateViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
     enforce_microsite_filter = True
     enforce_microsite_filter_lookup_field = "course_id__contains"
     enforce_microsite_filter_term = "org_in_course_id"
+    enforce_microsite_filter_course_field = "course_id"
 
     def get_queryset(self):
         self.queryset = get_generated_certificate().objects.all()
@@ -248,3 +429,4 @@ class ProctoredExamStudentViewSet(DataApiViewSet):  # pylint: disable=too-many-a
     enforce_microsite_filter = True
     enforce_microsite_filter_lookup_field = "proctored_exam__course_id__contains"
     enforce_microsite_filter_term = "org_in_course_id"
+    enforce_microsite_filter_course_field = "proctored_exam__course_id"
@@ -14,6 +14,7 @@ from rest_framework.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 from rest_framework.views import APIView
 
 from eox_core.edxapp_wrapper.bearer_authentication import BearerAuthentication
+from eox_core.utils import BulkJobProgress
 
 try:
     from eox_audit_model.decorators import audit_drf_api
@@ -47,6 +48,9 @@ class TaskAPI(APIView):
             "result": {"updated_emails": 23},
             "status": "READY
             }
+
+        The bulk jobs of the API v1 also return their `progress`, e.g.
+        {"total": 1000, "done": 420, "failed": 3}.
         """
         params = request.query_params
         task_id = params.get("id")
@@ -58,7 +62,13 @@ class TaskAPI(APIView):
 
         result = async_result.result if async_result.ready() else {}
 
-        return Response({"result": str(result), "status": str(async_result.status)})
+        response = {"result": str(result), "status": str(async_result.status)}
+
+        progress = BulkJobProgress(task_id).get()
+        if progress is not None:
+            response["progress"] = progress
+
+        return Response(response)
 
     @audit_drf_api(action='eox-core Task dispatcher.', method_name='eox_core_api_method')
     def post(self, request):
@@ -297,12 +297,22 @@ class EdxappValidatedCourseIDField(serializers.Field):
     def to_internal_value(self, data):
         """
         Check course_id has the correct format and that it is allowed inside the org
+
+        When the serializer context has a `validated_course_ids` dict, each course_id
+        is only checked the first time it's found.
         """
-        if validate_org(data):  # pylint: disable=no-else-return
-            return str(get_valid_course_key(data))
-        else:
+        validated_course_ids = self.context.get("validated_course_ids")
+        if validated_course_ids is not None and isinstance(data, str) and data in validated_course_ids:
+            return validated_course_ids[data]
+
+        if not validate_org(data):
             raise serializers.ValidationError(f'Invalid course_id {data}')
 
+        course_id = str(get_valid_course_key(data))
+        if validated_course_ids is not None and isinstance(data, str):
+            validated_course_ids[data] = course_id
+        return course_id
+
 
 class EdxappCourseEnrollmentSerializer(serializers.Serializer):
     """Serializes CourseEnrollment
@@ -322,7 +332,12 @@ class EdxappCourseEnrollmentSerializer(serializers.Serializer):
     def validate(self, attrs):
         """
         Check that there are no issues with enrollment
+
+        With `bulk_validation` in the context the check is left to the caller,
+        which validates all the enrollments at once.
         """
+        if self.context.get("bulk_validation"):
+            return attrs
         errors = check_edxapp_enrollment_is_valid(**attrs)
         if errors:
             raise serializers.ValidationError(", ".join(errors))
@@ -356,6 +371,7 @@ class EdxappCourseEnrollmentQuerySerializer(EdxappCourseEnrollmentSerializer):
     force = serializers.BooleanField(default=False)
     course_id = EdxappValidatedCourseIDField(default=None)
     bundle_id = serializers.CharField(max_length=255, default=None)
+    concurrent = serializers.BooleanField(required=False)
 
     class Meta(EdxappCourseEnrollmentSerializer.Meta):
         """
@@ -371,6 +387,63 @@ class EdxappCourseEnrollmentQuerySerializer(EdxappCourseEnrollmentSerializer):
         }
 
 
+class EdxappBulkGradeQuerySerializer(serializers.Serializer):
+    """
+    Handles the serialization of the query of the bulk grades of a course
+
+    Either a list of usernames and emails or, when both are empty, the enrollments
+    of the course, optionally filtered by mode, select the users to grade.
+    """
+    course_id = EdxappValidatedCourseIDField()
+    usernames = serializers.ListField(child=serializers.CharField(max_length=USERNAME_MAX_LENGTH), default=list)
+    emails = serializers.ListField(child=serializers.CharField(max_length=255), default=list)
+    mode = serializers.CharField(max_length=100, default=None)
+    detailed = serializers.BooleanField(default=False)
+    grading_policy = serializers.BooleanField(default=False)
+
+    class Meta:
+        """
+        Add extra details for swagger
+        """
+        swagger_schema_fields = {
+            "example": {
+                "course_id": "course-v1:edX+DemoX+Demo_Course",
+                "usernames": ["johndoe", "janedoe"],
+                "emails": ["jack@example.com"],
+                "detailed": True,
+                "grading_policy": False,
+            }
+        }
+
+
+class EdxappEnrollmentListQuerySerializer(serializers.Serializer):
+    """
+    Handles the query params of the enrollments list of a user or a course
+
+    The username or email of a user, a course_id, or both select the enrollments.
+    """
+    username = serializers.CharField(max_length=USERNAME_MAX_LENGTH, required=False)
+    email = serializers.CharField(max_length=255, required=False)
+    course_id = EdxappValidatedCourseIDField(required=False)
+    attributes = serializers.BooleanField(default=False)
+    page_size = serializers.IntegerField(min_value=1, required=False)
+    cursor = serializers.CharField(required=False)
+
+    def validate_page_size(self, value):
+        """
+        Limit the page size to EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE.
+        """
+        return min(value, getattr(settings, "EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE", 1000))
+
+    def validate(self, attrs):
+        """
+        Check there is a user or a course to list the enrollments of.
+        """
+        if not any(attrs.get(field) for field in ("username", "email", "course_id")):
+            raise serializers.ValidationError("Email, username or course_id needed")
+        return attrs
+
+
 class EdxappCoursePreEnrollmentSerializer(EdxappWithWarningSerializer):
     """Serialize CourseEnrollmentAllowed
 
@@ -0,0 +1,64 @@
+"""
+Celery tasks of the asynchronous bulk jobs of the API v1.
+"""
+import logging
+
+from celery import Task
+from django.contrib.sites.models import Site
+from django.utils.module_loading import import_string
+
+from eox_core.utils import BulkJobProgress, course_key_cache
+
+LOG = logging.getLogger(__name__)
+
+
+class BulkJobChunk(Task):
+    """
+    Process a chunk of the items of a bulk job.
+    """
+
+    def run(self, job_id, view_path, action, data, site_id=None, *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg, too-many-arguments
+        """
+        Process the items with the view that received the job and count them in the job progress.
+
+        Returns the per item results and the number of items processed and failed.
+        """
+        view = import_string(view_path)()
+        if site_id:
+            view.site = Site.objects.get(id=site_id)
+
+        course_key_stats = course_key_cache.stats()
+        results, failed = view.run_bulk_job_chunk(action, data)
+        BulkJobProgress(job_id).add(done=len(data) - failed, failed=failed)
+
+        LOG.info(
+            "Bulk job %s processed %s items, %s failed, course key cache %s.",
+            job_id,
+            len(data),
+            failed,
+            course_key_cache.stats(since=course_key_stats),
+        )
+        return {
+            "done": len(data) - failed,
+            "failed": failed,
+            "results": results,
+        }
+
+
+class MergeBulkJobResults(Task):
+    """
+    Merge the results of the BulkJobChunk tasks of a job.
+    """
+
+    def run(self, chunks, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the counters and the per item results of the whole job, in the order of the request.
+        """
+        done = sum(chunk["done"] for chunk in chunks)
+        failed = sum(chunk["failed"] for chunk in chunks)
+        return {
+            "total": done + failed,
+            "done": done,
+            "failed": failed,
+            "results": [result for chunk in chunks for result in chunk["results"]],
+        }
@@ -0,0 +1,95 @@
+"""
+Test module for the status views of the asynchronous bulk jobs.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from mock import MagicMock, patch
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.test import APIClient
+
+from eox_core.utils import BulkJobProgress
+
+JOB_ID = "bulk_job-7faf4b00-b526-4787-8ef2-f543dadfdb09"
+JOB_RESULT = {"total": 1, "done": 1, "failed": 0, "results": [{"username": "test", "email": "test@example.com"}]}
+
+
+class BulkJobViewTest(TestCase):
+    """ Tests for the bulk job view of the API v1 """
+
+    patch_permissions = patch('eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission', return_value=True)
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User(1, 'test@example.com', 'test'))
+        self.url = f'/api/v1/bulk-job/{JOB_ID}/'
+
+    @patch('eox_core.api.v1.views.EdxappBulkJob.authentication_classes', (SessionAuthentication,))
+    def test_authentication_required(self):
+        """ Test the jobs can't be read without authentication """
+        BulkJobProgress(JOB_ID).start(1)
+
+        response = APIClient().get(self.url)
+
+        self.assertIn(response.status_code, (401, 403))
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_running_job(self, m_async_result, _):
+        """ Test the progress of a job that isn't ready """
+        m_async_result.return_value = MagicMock(state='STARTED', **{'ready.return_value': False})
+        BulkJobProgress(JOB_ID).start(10)
+        BulkJobProgress(JOB_ID).add(done=3, failed=1)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "job_id": JOB_ID,
+            "state": "STARTED",
+            "progress": {"total": 10, "done": 3, "failed": 1},
+            "result": None,
+        })
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_ready_job(self, m_async_result, _):
+        """ Test the result of a ready job, also as a download """
+        m_async_result.return_value = MagicMock(state='SUCCESS', result=JOB_RESULT, **{'ready.return_value': True})
+        BulkJobProgress(JOB_ID).start(1)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["result"], JOB_RESULT)
+
+        response = self.client.get(self.url, {'download': 'true'})
+        self.assertEqual(response.data, JOB_RESULT)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{JOB_ID}.json"')
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_job_of_another_site(self, m_async_result, _):
+        """ Test the jobs started on other sites, or expired, are not found """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+        BulkJobProgress(JOB_ID).start(1, site_id=2)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        m_async_result.assert_not_called()
+
+
+class CeleryTasksStatusTest(TestCase):
+    """ Tests for the unauthenticated task status view of the data-api """
+
+    @patch('eox_core.api.data.v1.views.AsyncResult')
+    def test_bulk_jobs_are_not_served(self, m_async_result):
+        """ Test the results of the bulk jobs can't be read without authentication """
+        BulkJobProgress(JOB_ID).start(1)
+
+        response = APIClient().get(f'/data-api/v1/tasks/{JOB_ID}')
+
+        self.assertEqual(response.status_code, 404)
+        m_async_result.assert_not_called()
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 """ . """
 from django.contrib.auth.models import User
-from django.test import TestCase
-from mock import patch
+from django.core.handlers.base import BaseHandler
+from django.db import connection
+from django.test import TestCase, override_settings
+from mock import MagicMock, patch
+from rest_framework.exceptions import NotFound
 from rest_framework.test import APIClient
 
+from eox_core.api.v1.views import EdxappEnrollment, EdxappPreEnrollment
+
 
 class TestEnrollmentsAPI(TestCase):
     """ Tests for the enrollments endpoints """
@@ -52,6 +57,7 @@ class TestEnrollmentsAPI(TestCase):
         m_get_user.assert_called_once_with(username='testusername')
         m_get_enrollment.assert_called_once_with(
             username='testusername',
+            user=m_get_user.return_value,
             course_id='course-v1:org+course+run',
         )
 
@@ -108,8 +114,8 @@ class TestEnrollmentsAPI(TestCase):
     @patch_permissions
     @patch('eox_core.api.v1.serializers.validate_org')
     @patch('eox_core.api.v1.serializers.get_valid_course_key')
-    @patch('eox_core.api.v1.serializers.check_edxapp_enrollment_is_valid', return_value=[])
-    @patch('eox_core.api.v1.views.get_edxapp_user')
+    @patch('eox_core.api.v1.views.check_edxapp_enrollments_are_valid', return_value=[[], []])
+    @patch('eox_core.api.v1.views.get_edxapp_users', return_value=[MagicMock(), MagicMock()])
     @patch('eox_core.api.v1.views.update_enrollment')
     def test_api_put_works(self, m_update_enrollment, m_get_user, *_):
         """ Test that the PUT method works in normal conditions with a list of enrollments """
@@ -139,6 +145,126 @@ class TestEnrollmentsAPI(TestCase):
         self.assertIn('is_active', response.data[0])
         self.assertEqual(2, len(response.data))
 
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key')
+    @patch('eox_core.api.v1.views.check_edxapp_enrollments_are_valid', return_value=[[], []])
+    @patch('eox_core.api.v1.views.get_edxapp_users')
+    @patch('eox_core.api.v1.views.create_enrollment')
+    def test_api_post_bulk_partial_failure(self, m_create_enrollment, m_get_users, m_check_enrollments, *_):
+        """ Test that a list of enrollments is validated once and reports the errors per item """
+        m_create_enrollment.return_value = ({
+            'mode': 'audit',
+            'user': 'test',
+            'course_id': 'course-v1:org+course+run',
+            'is_active': True,
+        }, [])
+        m_get_users.return_value = [MagicMock(), NotFound('User not found')]
+        params = [{
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'audit',
+            'username': 'missing',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        response = self.client.post('/api/v1/enrollment/', data=params, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(2, len(response.data))
+        self.assertNotIn('error', response.data[0])
+        self.assertIn('error', response.data[1])
+        m_check_enrollments.assert_called_once()
+        m_get_users.assert_called_once()
+        m_create_enrollment.assert_called_once()
+        self.assertTrue(m_create_enrollment.call_args[1]['skip_validation'])
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key')
+    @patch('eox_core.api.v1.views.check_edxapp_enrollments_are_valid', return_value=[[], ['Invalid mode']])
+    @patch('eox_core.api.v1.views.create_enrollment')
+    def test_api_post_bulk_validation(self, m_create_enrollment, *_):
+        """ Test that a list of enrollments is rejected if any of them is invalid """
+        params = [{
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'invalid',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        response = self.client.post('/api/v1/enrollment/', data=params, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual({}, response.data[0])
+        self.assertIn('non_field_errors', response.data[1])
+        m_create_enrollment.assert_not_called()
+
+    @override_settings(EOX_CORE_BULK_JOB_CHUNK_SIZE=1)
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key')
+    @patch('eox_core.api.v1.views.reverse', return_value='/api/v1/bulk-job/bulk_job-job/')
+    @patch('eox_core.api.v1.views.BulkJobProgress', JOB_ID_PREFIX='bulk_job-')
+    @patch('eox_core.api.v1.views.chord')
+    @patch('eox_core.api.v1.views.create_enrollment')
+    def test_api_post_async(self, m_create_enrollment, m_chord, m_progress, *_):
+        """ Test that a list of enrollments sent with ?async=true is enqueued as a job in chunks """
+        params = [{
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'audit',
+            'email': 'test@example.com',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        response = self.client.post('/api/v1/enrollment/?async=true', data=params, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(2, response.data['total'])
+        self.assertIn('job_url', response.data)
+        job_id = response.data['job_id']
+        m_progress.assert_called_once_with(job_id)
+        m_progress.return_value.start.assert_called_once_with(2, site_id=None)
+        chunks = m_chord.call_args[0][0]
+        self.assertEqual(2, len(chunks))
+        self.assertEqual('create', chunks[0].args[2])
+        self.assertEqual('test', chunks[0].args[3][0]['username'])
+        m_chord.return_value.apply_async.assert_called_once_with(task_id=job_id)
+        m_create_enrollment.assert_not_called()
+
+    @patch('eox_core.api.v1.views.check_edxapp_enrollments_are_valid', return_value=[[], ['Invalid mode']])
+    @patch('eox_core.api.v1.views.get_edxapp_users')
+    @patch('eox_core.api.v1.views.update_enrollment')
+    def test_bulk_job_chunk(self, m_update_enrollment, m_get_users, *_):
+        """ Test that a chunk of a bulk job reports the invalid enrollments as failed """
+        m_update_enrollment.return_value = {'mode': 'audit'}
+        m_get_users.return_value = [MagicMock()]
+        data = [{
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'invalid',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        results, failed = EdxappEnrollment().run_bulk_job_chunk('update', data)
+
+        self.assertEqual(1, failed)
+        self.assertEqual({'mode': 'audit'}, results[0])
+        self.assertIn('error', results[1])
+        m_get_users.assert_called_once_with([{'username': 'test'}], site=None)
+        m_update_enrollment.assert_called_once()
+
     @patch_permissions
     @patch('eox_core.api.v1.views.get_edxapp_user')
     @patch('eox_core.api.v1.views.delete_enrollment')
@@ -153,3 +279,88 @@ class TestEnrollmentsAPI(TestCase):
         m_get_user.assert_called_once_with(username='test')
         m_delete_enrollment.assert_called_once_with(course_id='course-v1:org+course+run', user=m_get_user.return_value)
         self.assertEqual(response.status_code, 204)
+
+    def test_enrollment_requests_are_not_atomic(self):
+        """ Test the enrollment requests are not wrapped by ATOMIC_REQUESTS, so the program enrollments can commit """
+        with patch.dict(connection.settings_dict, {'ATOMIC_REQUESTS': True}):
+            enrollment_view = EdxappEnrollment.as_view()
+            pre_enrollment_view = EdxappPreEnrollment.as_view()
+
+            self.assertIs(BaseHandler().make_view_atomic(enrollment_view), enrollment_view)
+            self.assertIsNot(BaseHandler().make_view_atomic(pre_enrollment_view), pre_enrollment_view)
+
+    @patch_permissions
+    def test_api_list_validation(self, *_):
+        """ Test the enrollments list needs a user or a course and a valid cursor """
+        response = self.client.get('/api/v1/enrollments/')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/v1/enrollments/', {'username': 'test', 'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.get_edxapp_user')
+    @patch('eox_core.api.v1.views.get_enrollments')
+    def test_api_list_user_enrollments(self, m_get_enrollments, m_get_user, *_):
+        """ Test the enrollments of a user are listed by pages, without the attributes by default """
+        enrollment = {
+            'user': 'test',
+            'course_id': 'course-v1:org+course+run',
+            'mode': 'audit',
+            'is_active': True,
+            'created': None,
+            'enrollment_attributes': [],
+        }
+        m_get_enrollments.return_value = [dict(enrollment, id=enrollment_id) for enrollment_id in (3, 7, 9)], []
+
+        response = self.client.get('/api/v1/enrollments/', {'username': 'test', 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        m_get_user.assert_called_once_with(username='test')
+        m_get_enrollments.assert_called_once_with(
+            user=m_get_user.return_value,
+            course_id=None,
+            include_attributes=False,
+            after_id=None,
+            limit=3,
+            site=None,
+        )
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertNotIn('enrollment_attributes', response.data['results'][0])
+        self.assertEqual(response.data['results'][0]['username'], 'test')
+
+        m_get_enrollments.reset_mock()
+        m_get_enrollments.return_value = [dict(enrollment, id=9)], []
+        response = self.client.get(response.data['next'])
+
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(m_get_enrollments.call_args[1]['after_id'], 7)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=str)
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.views.get_edxapp_user')
+    @patch('eox_core.api.v1.views.get_enrollments', return_value=([], []))
+    def test_api_list_course_enrollments(self, m_get_enrollments, m_get_user, m_validate_org, *_):
+        """ Test the enrollments of a course of the site are listed with their attributes """
+        response = self.client.get('/api/v1/enrollments/', {
+            'course_id': 'course-v1:org+course+run',
+            'attributes': 'true',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'next': None, 'results': []})
+        m_get_user.assert_not_called()
+        m_validate_org.assert_called_once_with('course-v1:org+course+run')
+        m_get_enrollments.assert_called_once_with(
+            user=None,
+            course_id='course-v1:org+course+run',
+            include_attributes=True,
+            after_id=None,
+            limit=101,
+            site=None,
+        )
+
+        m_validate_org.return_value = False
+        response = self.client.get('/api/v1/enrollments/', {'course_id': 'course-v1:other+course+run'})
+        self.assertEqual(response.status_code, 400)
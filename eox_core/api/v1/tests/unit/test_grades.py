@@ -1,11 +1,14 @@
 """
 Test module for the Grades API
 """
+import json
+
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.urls import reverse
 from mock import MagicMock, patch
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.test import APIClient
 
 from eox_core.api.v1.views import EdxappGrade
@@ -26,9 +29,9 @@ class TestGradesAPI(TestCase):
         self.client.force_authenticate(user=self.api_user)
         self.url = reverse("eox-api:eox-api:edxapp-grade")
 
-    @patch("eox_core.api.v1.views.get_courseware_courses")
+    @patch("eox_core.utils.get_courseware_courses")
     @patch("eox_core.api.v1.views.get_valid_course_key")
-    @patch("eox_core.api.v1.views.get_course_grade_factory")
+    @patch("eox_core.utils.get_course_grade_factory")
     @patch("eox_core.api.v1.views.get_enrollment")
     @patch("eox_core.api.v1.views.get_edxapp_user")
     @patch_permissions
@@ -57,9 +60,9 @@ class TestGradesAPI(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
-    @patch("eox_core.api.v1.views.get_courseware_courses")
+    @patch("eox_core.utils.get_courseware_courses")
     @patch("eox_core.api.v1.views.get_valid_course_key")
-    @patch("eox_core.api.v1.views.get_course_grade_factory")
+    @patch("eox_core.utils.get_course_grade_factory")
     @patch("eox_core.api.v1.views.get_enrollment")
     @patch("eox_core.api.v1.views.get_edxapp_user")
     @patch_permissions
@@ -90,9 +93,9 @@ class TestGradesAPI(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
-    @patch("eox_core.api.v1.views.get_courseware_courses")
+    @patch("eox_core.utils.get_courseware_courses")
     @patch("eox_core.api.v1.views.get_valid_course_key")
-    @patch("eox_core.api.v1.views.get_course_grade_factory")
+    @patch("eox_core.utils.get_course_grade_factory")
     @patch("eox_core.api.v1.views.get_enrollment")
     @patch("eox_core.api.v1.views.get_edxapp_user")
     @patch_permissions
@@ -179,3 +182,134 @@ class TestGradesAPI(TestCase):
         ]
 
         self.assertEqual(section_breakdown, expected_subgrades)
+
+
+class TestBulkGradesAPI(TestCase):
+    """ Tests for the bulk grades endpoint """
+
+    patch_permissions = patch(
+        "eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission",
+        return_value=True,
+    )
+
+    def setUp(self):
+        """ setup """
+        self.api_user = User(1, "test@example.com", "test")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.api_user)
+        self.url = reverse("eox-api:eox-api:edxapp-bulk-grade")
+
+    @patch("eox_core.api.v1.serializers.validate_org", return_value=True)
+    @patch("eox_core.api.v1.serializers.get_valid_course_key", side_effect=lambda course_id: course_id)
+    @patch("eox_core.api.v1.views.get_valid_course_key", side_effect=lambda course_id: course_id)
+    @patch("eox_core.utils.get_courseware_courses")
+    @patch("eox_core.utils.get_course_grade_factory")
+    @patch("eox_core.api.v1.views.get_course_enrollment")
+    @patch("eox_core.api.v1.views.get_edxapp_users")
+    @patch_permissions
+    def test_bulk_grades(self, _, get_edxapp_users, get_course_enrollment, grade_factory, get_courseware_courses, *args):
+        """Test the users are checked with one enrollment query, the course is loaded once and errors are reported"""
+        get_edxapp_users.return_value = [
+            MagicMock(id=1, username="enrolled", email="enrolled@example.com"),
+            MagicMock(id=2, username="not_enrolled", email="not_enrolled@example.com"),
+            NotFound("No user found"),
+        ]
+        enrollments = get_course_enrollment.return_value.objects.filter.return_value
+        enrollments.filter.return_value.values_list.return_value = [1]
+        grade_factory.return_value.return_value.read.return_value.percent = 0.5
+        data = {
+            "course_id": "course-v1:org+course+run",
+            "usernames": ["enrolled", "not_enrolled", "missing"],
+        }
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), {
+            "course_id": "course-v1:org+course+run",
+            "results": [
+                {"username": "enrolled", "email": "enrolled@example.com", "earned_grade": 0.5},
+                {"username": "missing", "error": {"detail": "No user found"}},
+                {"username": "not_enrolled", "error": {"detail": "No enrollment found for user:`not_enrolled`"}},
+            ],
+        })
+        get_edxapp_users.assert_called_once_with(
+            [{"username": "enrolled"}, {"username": "not_enrolled"}, {"username": "missing"}],
+            site=None,
+        )
+        enrollments.filter.assert_called_once_with(user_id__in=[1, 2])
+        get_courseware_courses.return_value.get_course_by_id.assert_called_once_with("course-v1:org+course+run")
+
+    @patch("eox_core.api.v1.serializers.validate_org", return_value=True)
+    @patch("eox_core.api.v1.serializers.get_valid_course_key", side_effect=lambda course_id: course_id)
+    @patch("eox_core.api.v1.views.get_valid_course_key", side_effect=lambda course_id: course_id)
+    @patch("eox_core.utils.get_courseware_courses")
+    @patch("eox_core.utils.get_course_grade_factory")
+    @patch("eox_core.api.v1.views.get_course_enrollment")
+    @patch("eox_core.api.v1.views.get_edxapp_users")
+    @patch_permissions
+    def test_bulk_grades_of_repeated_users(self, _, get_edxapp_users, get_course_enrollment, grade_factory, *args):
+        """Test the users requested more than once, by username or by email, are looked up and graded once"""
+        user = MagicMock(id=1, username="john", email="john@example.com")
+        get_edxapp_users.return_value = [user, user]
+        enrollments = get_course_enrollment.return_value.objects.filter.return_value
+        enrollments.filter.return_value.values_list.return_value = [1]
+        grade_factory.return_value.return_value.read.return_value.percent = 0.5
+        data = {
+            "course_id": "course-v1:org+course+run",
+            "usernames": ["john", "john"],
+            "emails": ["john@example.com", "john@example.com"],
+        }
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(json.loads(b"".join(response.streaming_content))["results"], [
+            {"username": "john", "email": "john@example.com", "earned_grade": 0.5},
+        ])
+        get_edxapp_users.assert_called_once_with([{"username": "john"}, {"email": "john@example.com"}], site=None)
+        enrollments.filter.assert_called_once_with(user_id__in=[1])
+        grade_factory.return_value.return_value.read.assert_called_once()
+
+    @patch("eox_core.api.v1.serializers.validate_org", return_value=True)
+    @patch("eox_core.api.v1.serializers.get_valid_course_key", side_effect=lambda course_id: course_id)
+    @patch("eox_core.api.v1.views.get_valid_course_key", side_effect=lambda course_id: course_id)
+    @patch("eox_core.utils.get_courseware_courses")
+    @patch("eox_core.utils.get_course_grade_factory")
+    @patch("eox_core.api.v1.views.get_course_enrollment")
+    @patch_permissions
+    def test_bulk_grades_of_enrolled_users(self, _, get_course_enrollment, grade_factory, get_courseware_courses, *args):
+        """Test every active enrollment is graded when no users are given, with the grading policy once"""
+        enrollments = get_course_enrollment.return_value.objects.filter.return_value
+        active_enrollments = enrollments.filter.return_value.select_related.return_value.order_by.return_value
+        active_enrollments.filter.return_value = [
+            MagicMock(user=MagicMock(id=1, username="verified", email="verified@example.com")),
+        ]
+        grade_factory.return_value.return_value.read.return_value.percent = 1.0
+        grade_factory.return_value.return_value.read.return_value.subsection_grades = {}
+        get_courseware_courses.return_value.get_course_by_id.return_value.grading_policy = {
+            "GRADE_CUTOFFS": {"Pass": 0.5},
+            "GRADER": [],
+        }
+        data = {
+            "course_id": "course-v1:org+course+run",
+            "mode": "verified",
+            "detailed": True,
+            "grading_policy": True,
+        }
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), {
+            "course_id": "course-v1:org+course+run",
+            "grading_policy": {"grade_cutoffs": {"Pass": 0.5}, "grader": []},
+            "results": [
+                {
+                    "username": "verified",
+                    "email": "verified@example.com",
+                    "earned_grade": 1.0,
+                    "section_breakdown": [],
+                },
+            ],
+        })
+        enrollments.filter.assert_called_once_with(is_active=True)
+        active_enrollments.filter.assert_called_once_with(mode="verified")
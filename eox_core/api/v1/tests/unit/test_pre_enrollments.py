@@ -6,8 +6,11 @@ Test module for PreEnrollments under the open-release/hawthorn.beta1 tag
 from django.contrib.auth.models import User
 from django.test import TestCase
 from mock import patch
+from rest_framework.exceptions import NotFound
 from rest_framework.test import APIClient
 
+from eox_core.api.v1.views import EdxappPreEnrollment
+
 
 class PreEnrollmentsAPITest(TestCase):
     """ Tests for the pre-enrollments endpoint """
@@ -194,3 +197,103 @@ class PreEnrollmentsAPITest(TestCase):
             email='test@example.com',
             course_id='course-v1:org+course+run'
         )
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', return_value='course-v1:org+course+run')
+    @patch('eox_core.api.v1.views.reverse', return_value='/api/v1/bulk-job/bulk_job-job/')
+    @patch('eox_core.api.v1.views.BulkJobProgress', JOB_ID_PREFIX='bulk_job-')
+    @patch('eox_core.api.v1.views.chord')
+    def test_api_put_async(self, m_chord, m_progress, *_):
+        """ Test that a list of pre-enrollments sent with ?async=true is enqueued as a job """
+        params = [{
+            'email': 'test@example.com',
+            'course_id': 'course-v1:org+course+run',
+            'auto_enroll': False,
+        }]
+
+        response = self.client.put(self.url + '?async=true', data=params, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        m_progress.return_value.start.assert_called_once_with(1, site_id=None)
+        chunks = m_chord.call_args[0][0]
+        self.assertEqual(1, len(chunks))
+        self.assertEqual('update', chunks[0].args[2])
+
+    @patch('eox_core.api.v1.views.update_pre_enrollments')
+    def test_bulk_job_chunk(self, m_update_pre_enrollments):
+        """ Test that a chunk of a bulk job reports the errors per pre-enrollment """
+        m_update_pre_enrollments.return_value = [{
+            "course_id": "course-v1:org+course+run",
+            "auto_enroll": False,
+            "email": "test@example.com"
+        }, NotFound('Pre-enrollment not found')]
+        data = [{
+            'email': 'test@example.com',
+            'course_id': 'course-v1:org+course+run',
+            'auto_enroll': False,
+        }, {
+            'email': 'missing@example.com',
+            'course_id': 'course-v1:org+course+run',
+            'auto_enroll': False,
+        }]
+
+        results, failed = EdxappPreEnrollment().run_bulk_job_chunk('update', data)
+
+        self.assertEqual(1, failed)
+        self.assertEqual('test@example.com', results[0]['email'])
+        self.assertIn('error', results[1])
+        m_update_pre_enrollments.assert_called_once_with(data)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    @patch('eox_core.api.v1.views.create_pre_enrollments')
+    def test_api_post_bulk(self, m_create_pre_enrollments, m_get_valid_course_key, *_):
+        """ Test that a list of pre-enrollments is created with a single call and each course is validated once """
+        m_create_pre_enrollments.return_value = [
+            ({
+                "course_id": "course-v1:org+course+run",
+                "auto_enroll": True,
+                "email": "a@example.com",
+            }, ['Course with course_id:course-v1:org+course+run does not exist']),
+            NotFound('Pre-enrollment already exists'),
+        ]
+        params = [{
+            'email': 'a@example.com',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'email': 'b@example.com',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        response = self.client.post(self.url, data=params, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual('a@example.com', response.data[0]['email'])
+        self.assertIn('warning', response.data[0])
+        self.assertIn('error', response.data[1])
+        m_create_pre_enrollments.assert_called_once()
+        m_get_valid_course_key.assert_called_once_with('course-v1:org+course+run')
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    @patch('eox_core.api.v1.views.delete_pre_enrollments')
+    def test_api_delete_bulk(self, m_delete_pre_enrollments, *_):
+        """ Test that a list of pre-enrollments is deleted with a single call """
+        m_delete_pre_enrollments.return_value = [{
+            "course_id": "course-v1:org+course+run",
+            "auto_enroll": True,
+            "email": "a@example.com",
+        }]
+        params = [{
+            'email': 'a@example.com',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        response = self.client.delete(self.url, data=params, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual('a@example.com', response.data[0]['email'])
+        m_delete_pre_enrollments.assert_called_once()
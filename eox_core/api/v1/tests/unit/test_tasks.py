@@ -0,0 +1,60 @@
+"""
+Test module for the bulk job tasks of the API v1.
+"""
+from django.test import TestCase
+from mock import patch
+
+from eox_core.api.v1.tasks import BulkJobChunk, MergeBulkJobResults
+from eox_core.utils import course_key_cache
+
+
+class BulkJobTasksTest(TestCase):
+    """ Tests for the chunks of the bulk jobs. """
+
+    @patch('eox_core.api.v1.tasks.BulkJobProgress')
+    @patch('eox_core.api.v1.views.EdxappPreEnrollment.run_bulk_job_chunk')
+    def test_chunk_updates_progress(self, m_run_bulk_job_chunk, m_progress):
+        """
+        Test the chunk is processed by the view of the job and counted in its progress.
+        """
+        m_run_bulk_job_chunk.return_value = (["a", "b", "c"], 1)
+
+        result = BulkJobChunk().run(
+            "job-1", "eox_core.api.v1.views.EdxappPreEnrollment", "create", [{}, {}, {}],
+        )
+
+        m_run_bulk_job_chunk.assert_called_once_with("create", [{}, {}, {}])
+        m_progress.assert_called_once_with("job-1")
+        m_progress.return_value.add.assert_called_once_with(done=2, failed=1)
+        self.assertEqual(result, {"done": 2, "failed": 1, "results": ["a", "b", "c"]})
+
+    def test_merge_results(self):
+        """
+        Test the results of the chunks are merged in the order of the request.
+        """
+        chunks = [
+            {"done": 2, "failed": 0, "results": ["a", "b"]},
+            {"done": 0, "failed": 1, "results": ["c"]},
+        ]
+
+        result = MergeBulkJobResults().run(chunks)
+
+        self.assertEqual(result, {"total": 3, "done": 2, "failed": 1, "results": ["a", "b", "c"]})
+
+    @patch('eox_core.api.v1.tasks.LOG')
+    @patch('eox_core.api.v1.tasks.BulkJobProgress')
+    @patch('eox_core.api.v1.views.EdxappPreEnrollment.run_bulk_job_chunk')
+    def test_chunk_logs_its_course_key_stats(self, m_run_bulk_job_chunk, _, m_log):
+        """
+        Test the course key stats logged by a chunk only count the course ids parsed by it.
+        """
+        course_key_cache.parse("course-v1:org+logged+run")
+
+        def run_bulk_job_chunk(action, data):  # pylint: disable=unused-argument
+            course_key_cache.parse("course-v1:org+logged+run")
+            return [], 0
+        m_run_bulk_job_chunk.side_effect = run_bulk_job_chunk
+
+        BulkJobChunk().run("job-1", "eox_core.api.v1.views.EdxappPreEnrollment", "create", [{}])
+
+        self.assertEqual(m_log.info.call_args[0][-1], {"hits": 1, "misses": 0, "hit_rate": 1.0})
@@ -10,8 +10,11 @@ app_name = 'eox_core'  # pylint: disable=invalid-name
 urlpatterns = [  # pylint: disable=invalid-name
     re_path(r'^user/$', views.EdxappUser.as_view(), name='edxapp-user'),
     re_path(r'^enrollment/$', views.EdxappEnrollment.as_view(), name='edxapp-enrollment'),
+    re_path(r'^enrollments/$', views.EdxappEnrollmentList.as_view(), name='edxapp-enrollments'),
     re_path(r'^grade/$', views.EdxappGrade.as_view(), name='edxapp-grade'),
+    re_path(r'^grade/bulk/$', views.EdxappBulkGrade.as_view(), name='edxapp-bulk-grade'),
     re_path(r'^pre-enrollment/$', views.EdxappPreEnrollment.as_view(), name='edxapp-pre-enrollment'),
+    re_path(r'^bulk-job/(?P<job_id>bulk_job-[\w-]+)/$', views.EdxappBulkJob.as_view(), name='edxapp-bulk-job'),
     re_path(r'^userinfo/$', views.UserInfo.as_view(), name='edxapp-userinfo'),
 ]
 
@@ -6,42 +6,72 @@ API v1 views.
 from __future__ import absolute_import, unicode_literals
 
 import logging
+from abc import ABC, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from uuid import uuid4
 
 import edx_api_doc_tools as apidocs
 import six
+from celery import chord
+from celery.result import AsyncResult
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
 from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.exceptions import APIException, NotFound, ValidationError
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
+from rest_framework.utils import encoders
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
 from eox_core.api.v1.permissions import EoxCoreAPIPermission
 from eox_core.api.v1.serializers import (
+    EdxappBulkGradeQuerySerializer,
     EdxappCourseEnrollmentQuerySerializer,
     EdxappCourseEnrollmentSerializer,
     EdxappCoursePreEnrollmentSerializer,
+    EdxappEnrollmentListQuerySerializer,
     EdxappGradeSerializer,
+    EdxappGradingPolicySerializer,
     EdxappUserQuerySerializer,
     EdxappUserReadOnlySerializer,
     EdxappUserSerializer,
     WrittableEdxappUserSerializer,
 )
+from eox_core.api.v1.tasks import BulkJobChunk, MergeBulkJobResults
 from eox_core.edxapp_wrapper.bearer_authentication import BearerAuthentication
 from eox_core.edxapp_wrapper.coursekey import get_valid_course_key
-from eox_core.edxapp_wrapper.courseware import get_courseware_courses
-from eox_core.edxapp_wrapper.enrollments import create_enrollment, delete_enrollment, get_enrollment, update_enrollment
-from eox_core.edxapp_wrapper.grades import get_course_grade_factory
+from eox_core.edxapp_wrapper.enrollments import (
+    check_edxapp_enrollments_are_valid,
+    create_enrollment,
+    delete_enrollment,
+    get_enrollment,
+    get_enrollments,
+    update_enrollment,
+)
 from eox_core.edxapp_wrapper.pre_enrollments import (
     create_pre_enrollment,
+    create_pre_enrollments,
     delete_pre_enrollment,
+    delete_pre_enrollments,
     get_pre_enrollment,
     update_pre_enrollment,
+    update_pre_enrollments,
+)
+from eox_core.edxapp_wrapper.users import (
+    create_edxapp_user,
+    get_course_enrollment,
+    get_edxapp_user,
+    get_edxapp_users,
+    get_user_read_only_serializer,
 )
-from eox_core.edxapp_wrapper.users import create_edxapp_user, get_edxapp_user, get_user_read_only_serializer
+from eox_core.utils import BulkJobProgress, CourseGradingCache
 
 try:
     from eox_audit_model.decorators import audit_drf_api
@@ -112,6 +142,62 @@ class UserQueryMixin:
         return user_query
 
 
+class BulkJobMixin(ABC):
+    """
+    Runs the list payloads of a view as asynchronous jobs
+
+    When a list is sent with `?async=true`, the items are split in chunks that are
+    processed by celery workers with `run_bulk_job_chunk`, and the response only
+    holds the id of the job. Its progress and per item results are polled at the
+    EdxappBulkJob view, from the same site. The views define `run_bulk_job_chunk`.
+    """
+
+    def is_async_request(self, request):
+        """
+        Whether the request asks for the asynchronous job mode
+        """
+        return request.query_params.get("async", "").lower() in ("true", "1")
+
+    def start_bulk_job(self, request, action, data):
+        """
+        Enqueue the chunks of a job and return the response with its id
+
+        Args:
+            request: The request that sent the items
+            action: Name of the action applied to the items, handled by `run_bulk_job_chunk`
+            data: List of validated items
+        """
+        job_id = BulkJobProgress.JOB_ID_PREFIX + str(uuid4())
+        chunk_size = getattr(settings, "EOX_CORE_BULK_JOB_CHUNK_SIZE", 100)
+        view_path = f"{type(self).__module__}.{type(self).__name__}"
+        site = getattr(self, "site", None)
+        site_id = site.id if site else None
+
+        BulkJobProgress(job_id).start(len(data), site_id=site_id)
+        chunks = [
+            BulkJobChunk().s(job_id, view_path, action, data[start:start + chunk_size], site_id)
+            for start in range(0, len(data), chunk_size)
+        ]
+        chord(chunks, MergeBulkJobResults().s()).apply_async(task_id=job_id)
+
+        job_url = request.build_absolute_uri(
+            reverse("eox-core:eox-api:eox-api:edxapp-bulk-job", kwargs={"job_id": job_id})
+        )
+        return Response({
+            "job_id": job_id,
+            "job_url": job_url,
+            "total": len(data),
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @abstractmethod
+    def run_bulk_job_chunk(self, action, data):
+        """
+        Process a chunk of the items of a job
+
+        Returns: The list of per item results and the number of items that failed
+        """
+
+
 class EdxappUser(UserQueryMixin, APIView):
     """
     Handles the creation of a User on edxapp
@@ -527,7 +613,10 @@ class EdxappUserUpdater(UserQueryMixin, APIView):
         return Response(serialized_user.data)
 
 
-class EdxappEnrollment(UserQueryMixin, APIView):
+# Not wrapped by ATOMIC_REQUESTS, so the concurrent enrollments of a program can be
+# committed on their own, see run_program_enrollments.
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class EdxappEnrollment(BulkJobMixin, UserQueryMixin, APIView):
     """
     Handles API requests to create users
     """
@@ -608,6 +697,14 @@ class EdxappEnrollment(UserQueryMixin, APIView):
             - name: name of the attribute
             - value: value of the attribute
 
+        - `bundle_id` (string, _body_):
+            The uuid of a program, to enroll the user in a run of each of its courses instead of a single `course_id`.
+
+        - `concurrent` (boolean, _body_):
+            Flag indicating whether the enrollments in the courses of a `bundle_id` are created in parallel.
+            Each enrollment is committed on its own, the requests of this endpoint are not wrapped in a
+            database transaction by ATOMIC_REQUESTS.
+
         In case the case of bulk enrollments, you must provide a list of dictionaries containing
         the parameters specified above; the same restrictions apply.
         For example:
@@ -643,6 +740,10 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         - 400: Bad request, invalid course_id or missing either email or username.
         """
         data = request.data
+        if isinstance(data, list) and self.is_async_request(request):
+            return self.start_bulk_job(request, "create", self.validate_bulk_queries(data))
+        if isinstance(data, list):
+            return self.prepare_bulk_multiresponse(data, self.user_enrollment_create)
         return EdxappEnrollment.prepare_multiresponse(
             data, self.single_enrollment_create
         )
@@ -720,6 +821,10 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         - 400: Bad request, invalid course_id or missing either email or username.
         """
         data = request.data
+        if isinstance(data, list) and self.is_async_request(request):
+            return self.start_bulk_job(request, "update", self.validate_bulk_queries(data))
+        if isinstance(data, list):
+            return self.prepare_bulk_multiresponse(data, self.user_enrollment_update)
         return EdxappEnrollment.prepare_multiresponse(
             data, self.single_enrollment_update
         )
@@ -778,6 +883,7 @@ class EdxappEnrollment(UserQueryMixin, APIView):
 
         enrollment_query = {
             "username": user.username,
+            "user": user,
             "course_id": course_id,
         }
         enrollment, errors = get_enrollment(**enrollment_query)
@@ -843,6 +949,12 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         user_query = self.get_user_query(None, query_params=kwargs)
         user = get_edxapp_user(**user_query)
 
+        return self.user_enrollment_create(user, **kwargs)
+
+    def user_enrollment_create(self, user, **kwargs):
+        """
+        Create the enrollment of a user already retrieved
+        """
         enrollments, msgs = create_enrollment(user, **kwargs)
         # This logic block is needed to convert a single bundle_id enrollment in a list
         # of course_id enrollments which are appended to the response individually
@@ -865,6 +977,13 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         user_query = self.get_user_query(None, query_params=kwargs)
         user = get_edxapp_user(**user_query)
 
+        return self.user_enrollment_update(user, **kwargs)
+
+    def user_enrollment_update(self, user, **kwargs):
+        """
+        Update the enrollment of a user already retrieved
+        """
+        kwargs.pop("skip_validation", None)
         course_id = kwargs.pop("course_id", None)
         if not course_id:
             raise ValidationError(detail="You have to provide a course_id for updates")
@@ -917,6 +1036,104 @@ class EdxappEnrollment(UserQueryMixin, APIView):
             response_status = status.HTTP_202_ACCEPTED
         return Response(response, status=response_status)
 
+    def prepare_bulk_multiresponse(self, request_data, action_method):
+        """
+        Prepare the response of a list of enrollment queries
+
+        The queries are validated together, so each course, mode and user is checked
+        once no matter how many queries share it, and the users are retrieved with
+        a single lookup. Each query is then processed by `action_method`, which
+        receives the user and the query, and its errors are reported in its item.
+
+        Args:
+            request_data: List of queries to be processed
+            action_method: Function to be applied to each user and query (create, update)
+
+        Returns: List of responses, with status 202 if any query failed
+        """
+        data = self.validate_bulk_queries(request_data)
+
+        validation_errors = check_edxapp_enrollments_are_valid(data)
+        if any(validation_errors):
+            raise ValidationError([
+                {"non_field_errors": [", ".join(errors)]} if errors else {}
+                for errors in validation_errors
+            ])
+
+        multiple_responses, failed = self.process_bulk_queries(data, action_method)
+
+        response_status = status.HTTP_200_OK
+        if failed:
+            response_status = status.HTTP_202_ACCEPTED
+        return Response(multiple_responses, status=response_status)
+
+    @staticmethod
+    def validate_bulk_queries(request_data):
+        """
+        Return the validated data of a list of enrollment queries
+        """
+        serializer = EdxappCourseEnrollmentQuerySerializer(
+            data=request_data,
+            many=True,
+            context={"bulk_validation": True, "validated_course_ids": {}},
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def process_bulk_queries(self, data, action_method, validation_errors=None):
+        """
+        Apply `action_method` to each of the validated enrollment queries
+
+        Args:
+            data: List of validated queries
+            action_method: Function to be applied to each user and query (create, update)
+            validation_errors: Errors of each query, the queries with errors are reported as failed
+
+        Returns: The list of responses and the number of queries that failed
+        """
+        if validation_errors is None:
+            validation_errors = [[]] * len(data)
+        user_queries = [
+            self.get_user_query(None, query_params=enrollment_query)
+            for enrollment_query, errors in zip(data, validation_errors) if not errors
+        ]
+        users = iter(get_edxapp_users(user_queries, site=self.site))
+
+        multiple_responses = []
+        failed = 0
+        for enrollment_query, errors in zip(data, validation_errors):
+            try:
+                if errors:
+                    raise ValidationError(detail=", ".join(errors))
+                user = next(users)
+                if isinstance(user, APIException):
+                    raise user
+                # The course enrollments are validated in bulk, bundles are validated per course run
+                result = action_method(user, skip_validation=not enrollment_query.get("bundle_id"), **enrollment_query)
+                if isinstance(result, list):
+                    multiple_responses += result
+                else:
+                    multiple_responses.append(result)
+            except APIException as error:
+                failed += 1
+                enrollment_query["error"] = {
+                    "detail": error.detail,
+                }
+                multiple_responses.append(enrollment_query)
+
+        return multiple_responses, failed
+
+    def run_bulk_job_chunk(self, action, data):
+        """
+        Process a chunk of an asynchronous bulk job, the invalid queries are reported as failed
+        """
+        action_method = {
+            "create": self.user_enrollment_create,
+            "update": self.user_enrollment_update,
+        }[action]
+        validation_errors = check_edxapp_enrollments_are_valid(data)
+        return self.process_bulk_queries(data, action_method, validation_errors)
+
     def handle_exception(self, exc):
         """
         Handle exception: log it
@@ -927,7 +1144,137 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         return super().handle_exception(exc)
 
 
-class EdxappPreEnrollment(APIView):
+class EdxappEnrollmentList(UserQueryMixin, APIView):
+    """
+    Handles API requests to list the enrollments of a user or a course
+    """
+
+    authentication_classes = (BearerAuthentication, SessionAuthentication, JwtAuthentication)
+    permission_classes = (EoxCoreAPIPermission,)
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer)
+
+    @apidocs.schema(
+        parameters=[
+            apidocs.query_parameter(
+                name="username",
+                param_type=str,
+                description="The username of the user to list the enrollments of.",
+            ),
+            apidocs.query_parameter(
+                name="email",
+                param_type=str,
+                description="The email of the user to list the enrollments of.",
+            ),
+            apidocs.query_parameter(
+                name="course_id",
+                param_type=str,
+                description="The course to list the enrollments of.",
+            ),
+            apidocs.query_parameter(
+                name="attributes",
+                param_type=bool,
+                description="Include the enrollment attributes, false by default.",
+            ),
+            apidocs.query_parameter(
+                name="page_size",
+                param_type=int,
+                description="Number of enrollments of each page.",
+            ),
+            apidocs.query_parameter(
+                name="cursor",
+                param_type=str,
+                description="Position of the page, taken from the `next` url of the previous one.",
+            ),
+        ],
+        responses={
+            200: "Page of enrollments and the url of the next one",
+            400: "Bad request, missing user and course_id, invalid course_id or cursor",
+            404: "User not found",
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Lists the enrollments of a user, of a course or of a user in a course
+
+        **Example Requests**
+
+            GET /eox-core/api/v1/enrollments/?username=johndoe
+
+            GET /eox-core/api/v1/enrollments/?course_id=course-v1:edX+DemoX+Demo_Course&attributes=true
+
+        The user and the course must belong to the site of the request. The
+        enrollments of a course only include the users of the site.
+
+        **Response details**
+
+        - `next`: Url of the next page, null in the last one.
+        - `results`: List with the `username`, `course_id`, `mode`, `is_active`
+          and `created` date of each enrollment, and its `enrollment_attributes`
+          with `attributes=true`.
+
+        **Returns**
+
+        - 200: Success.
+        - 400: Bad request, missing user and course_id, invalid course_id or cursor.
+        - 404: User not found.
+        """
+        serializer = EdxappEnrollmentListQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        user = None
+        if query.get("username") or query.get("email"):
+            user = get_edxapp_user(**self.get_user_query(request, query_params=query))
+
+        page_size = query.get("page_size") or getattr(settings, "EOX_CORE_ENROLLMENT_LIST_PAGE_SIZE", 100)
+        enrollments, errors = get_enrollments(
+            user=user,
+            course_id=query.get("course_id"),
+            include_attributes=query["attributes"],
+            after_id=self.decode_cursor(query.get("cursor")),
+            limit=page_size + 1,
+            site=self.site,
+        )
+        if errors:
+            raise NotFound(detail=errors)
+
+        next_url = None
+        if len(enrollments) > page_size:
+            enrollments = enrollments[:page_size]
+            next_url = replace_query_param(
+                request.build_absolute_uri(),
+                "cursor",
+                self.encode_cursor(enrollments[-1]["id"]),
+            )
+
+        results = EdxappCourseEnrollmentSerializer(enrollments, many=True).data
+        if not query["attributes"]:
+            for result in results:
+                result.pop("enrollment_attributes", None)
+
+        return Response({"next": next_url, "results": results})
+
+    @staticmethod
+    def encode_cursor(enrollment_id):
+        """
+        Return the cursor of the page after the enrollment.
+        """
+        return urlsafe_b64encode(str(enrollment_id).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Return the enrollment id of the cursor, or None for the first page.
+        """
+        if not cursor:
+            return None
+        try:
+            return int(urlsafe_b64decode(cursor.encode()).decode())
+        except (ValueError, UnicodeDecodeError) as error:
+            raise ValidationError(detail="Invalid cursor") from error
+
+
+class EdxappPreEnrollment(BulkJobMixin, APIView):
     """
     Handles API requests to manage whitelistings (pre-enrollments)
     """
@@ -940,48 +1287,40 @@ class EdxappPreEnrollment(APIView):
     def post(self, request, *args, **kwargs):
         """
         Create whitelistings on edxapp
+
+        A list of whitelistings is created in bulk, or by an asynchronous job with `?async=true`.
         """
+        if isinstance(request.data, list):
+            return self.prepare_bulk_response(request, "create", request.data)
+
         serializer = EdxappCoursePreEnrollmentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
-        course_id = data.pop("course_id", None)
-        pre_enrollment, warning = create_pre_enrollment(course_id=course_id, **data)
-        response_data = EdxappCoursePreEnrollmentSerializer(
-            pre_enrollment, context=warning
-        ).data
-        return Response(response_data)
+        return Response(self.pre_enrollment_create(**serializer.validated_data))
 
     @audit_drf_api(action='Update pre-enrollments on edxapp.', method_name='eox_core_api_method')
     def put(self, request, *args, **kwargs):
         """
         Update whitelistings on edxapp
+
+        A list of whitelistings is updated in bulk, or by an asynchronous job with `?async=true`.
         """
+        if isinstance(request.data, list):
+            return self.prepare_bulk_response(request, "update", request.data)
+
         serializer = EdxappCoursePreEnrollmentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
-        email = data.get("email")
-        course_id = data.get("course_id")
-        auto_enroll = data.pop("auto_enroll", False)
-
-        pre_enrollment_query = {
-            "email": email,
-            "course_id": course_id,
-        }
-
-        pre_enrollment = get_pre_enrollment(**pre_enrollment_query)
-        update_query = {
-            "pre_enrollment": pre_enrollment,
-            "auto_enroll": auto_enroll,
-        }
-        updated_pre_enrollment = update_pre_enrollment(**update_query)
-        response = EdxappCoursePreEnrollmentSerializer(updated_pre_enrollment).data
-        return Response(response)
+        return Response(self.pre_enrollment_update(**serializer.validated_data))
 
     @audit_drf_api(action='Delete pre-enrollments on edxapp.', method_name='eox_core_api_method')
     def delete(self, request, *args, **kwargs):
         """
         Delete whitelistings on edxapp
+
+        A list of whitelistings is deleted in bulk, or by an asynchronous job with `?async=true`.
         """
+        if isinstance(request.data, list):
+            return self.prepare_bulk_response(request, "delete", request.data)
+
         query_params = request.query_params
         if not query_params:
             query_params = request.data
@@ -1019,6 +1358,105 @@ class EdxappPreEnrollment(APIView):
         response = EdxappCoursePreEnrollmentSerializer(pre_enrollment).data
         return Response(response)
 
+    @staticmethod
+    def pre_enrollment_create(**data):
+        """
+        Create a whitelisting from its validated data
+        """
+        course_id = data.pop("course_id", None)
+        pre_enrollment, warning = create_pre_enrollment(course_id=course_id, **data)
+        return EdxappCoursePreEnrollmentSerializer(
+            pre_enrollment, context=warning
+        ).data
+
+    @staticmethod
+    def pre_enrollment_update(**data):
+        """
+        Update a whitelisting from its validated data
+        """
+        email = data.get("email")
+        course_id = data.get("course_id")
+        auto_enroll = data.pop("auto_enroll", False)
+
+        pre_enrollment_query = {
+            "email": email,
+            "course_id": course_id,
+        }
+
+        pre_enrollment = get_pre_enrollment(**pre_enrollment_query)
+        update_query = {
+            "pre_enrollment": pre_enrollment,
+            "auto_enroll": auto_enroll,
+        }
+        updated_pre_enrollment = update_pre_enrollment(**update_query)
+        return EdxappCoursePreEnrollmentSerializer(updated_pre_enrollment).data
+
+    @staticmethod
+    def validate_bulk_pre_enrollments(request_data):
+        """
+        Return the validated data of a list of whitelistings
+        """
+        serializer = EdxappCoursePreEnrollmentSerializer(
+            data=request_data,
+            many=True,
+            context={"validated_course_ids": {}},
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def prepare_bulk_response(self, request, action, request_data):
+        """
+        Apply `action` to a list of whitelistings, or start a job that applies it if the request is async
+
+        Returns: List of responses, with status 202 if any whitelisting failed
+        """
+        data = self.validate_bulk_pre_enrollments(request_data)
+        if self.is_async_request(request):
+            return self.start_bulk_job(request, action, data)
+
+        results, failed = self.process_bulk_pre_enrollments(action, data)
+
+        response_status = status.HTTP_200_OK
+        if failed:
+            response_status = status.HTTP_202_ACCEPTED
+        return Response(results, status=response_status)
+
+    @staticmethod
+    def process_bulk_pre_enrollments(action, data):
+        """
+        Apply `action` (create, update, delete) to the validated whitelistings with the bulk backend functions
+
+        Returns: The list of responses and the number of whitelistings that failed
+        """
+        bulk_method = {
+            "create": create_pre_enrollments,
+            "update": update_pre_enrollments,
+            "delete": delete_pre_enrollments,
+        }[action]
+
+        results = []
+        failed = 0
+        for pre_enrollment_query, result in zip(data, bulk_method(data)):
+            if isinstance(result, APIException):
+                failed += 1
+                pre_enrollment_query["error"] = {
+                    "detail": result.detail,
+                }
+                results.append(pre_enrollment_query)
+            elif action == "create":
+                pre_enrollment, warning = result
+                results.append(EdxappCoursePreEnrollmentSerializer(pre_enrollment, context=warning).data)
+            else:
+                results.append(EdxappCoursePreEnrollmentSerializer(result).data)
+
+        return results, failed
+
+    def run_bulk_job_chunk(self, action, data):
+        """
+        Process a chunk of an asynchronous bulk job, the errors are reported per whitelisting
+        """
+        return self.process_bulk_pre_enrollments(action, data)
+
     def handle_exception(self, exc):
         """
         Handle exception: log it
@@ -1142,15 +1580,15 @@ class EdxappGrade(UserQueryMixin, APIView):
         if not course_id:
             raise ValidationError(detail="You have to provide a course_id")
 
-        _, errors = get_enrollment(username=user.username, course_id=course_id)
+        _, errors = get_enrollment(username=user.username, user=user, course_id=course_id, include_attributes=False)
 
         if errors:
             raise NotFound(errors)
 
-        grade_factory = get_course_grade_factory()
         course_key = get_valid_course_key(course_id)
-        course = get_courseware_courses().get_course_by_id(course_key)
-        course_grade = grade_factory().read(user, course)
+        grading_cache = CourseGradingCache()
+        course = grading_cache.get_course(course_key)
+        course_grade = grading_cache.read(user, course_key)
         response = {"earned_grade": course_grade.percent}
 
         if detailed in ("True", "true", "on", "1"):
@@ -1198,6 +1636,191 @@ class EdxappGrade(UserQueryMixin, APIView):
         return breakdown
 
 
+class EdxappBulkGrade(EdxappGrade):
+    """
+    Handles API requests to read the grades of many users in a course
+    """
+
+    http_method_names = ["post", "options"]
+
+    @apidocs.schema(
+        body=EdxappBulkGradeQuerySerializer,
+        responses={
+            200: "Grades of each user, users not found or not enrolled are reported with an error",
+            400: "Bad request, invalid course_id",
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        """
+        Retrieves the grades of a list of users, or of the users enrolled, in a course
+
+        **Example Requests**
+
+            POST /eox-core/api/v1/grade/bulk/
+
+            Request data: {
+              "course_id": "course-v1:edX+DemoX+Demo_Course",
+              "usernames": ["johndoe", "janedoe"],
+              "emails": ["jack@example.com"],
+              "detailed": true,
+            }
+
+        When `usernames` and `emails` are empty, every user with an active
+        enrollment in the course is graded, `mode` filters those enrollments.
+
+        **Response details**
+
+        The response is streamed while the grades are read.
+
+        - `course_id`: The course of the grades.
+        - `grading_policy` (**optional**): Course grading policy.
+        - `results`: List with the `username`, `email` and the grade data of
+          each user, the same of the grade endpoint, or an `error`.
+
+        **Returns**
+
+        - 200: Success.
+        - 400: Bad request, invalid course_id.
+        """
+        serializer = EdxappBulkGradeQuerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        course_key = get_valid_course_key(query["course_id"])
+        users, errors = self.get_users(course_key, query)
+
+        grading_cache = CourseGradingCache()
+        course = grading_cache.get_course(course_key)
+
+        header = {"course_id": query["course_id"]}
+        if query["grading_policy"]:
+            header["grading_policy"] = EdxappGradingPolicySerializer(course.grading_policy).data
+
+        return StreamingHttpResponse(
+            self.stream_grades(header, users, errors, grading_cache, course_key, query["detailed"]),
+            content_type="application/json",
+        )
+
+    def get_users(self, course_key, query):
+        """
+        Return the users to grade and the errors of the requested users that can't be graded.
+        """
+        course_enrollments = get_course_enrollment().objects.filter(course_id=course_key)
+
+        if not query["usernames"] and not query["emails"]:
+            enrollments = course_enrollments.filter(is_active=True).select_related("user").order_by("user_id")
+            if query["mode"]:
+                enrollments = enrollments.filter(mode=query["mode"])
+            return [enrollment.user for enrollment in enrollments], []
+
+        users = {}
+        errors = []
+        # The users requested more than once, by username or by email, are graded once
+        user_queries = [{"username": username} for username in dict.fromkeys(query["usernames"])]
+        user_queries += [{"email": email} for email in dict.fromkeys(query["emails"])]
+        for user_query, user in zip(user_queries, get_edxapp_users(user_queries, site=self.site)):
+            if isinstance(user, APIException):
+                errors.append(dict(user_query, error={"detail": user.detail}))
+            else:
+                users.setdefault(user.id, user)
+        users = list(users.values())
+
+        enrolled_ids = set(
+            course_enrollments.filter(user_id__in=[user.id for user in users]).values_list("user_id", flat=True)
+        )
+        enrolled_users = []
+        for user in users:
+            if user.id in enrolled_ids:
+                enrolled_users.append(user)
+            else:
+                errors.append({
+                    "username": user.username,
+                    "error": {"detail": f"No enrollment found for user:`{user.username}`"},
+                })
+
+        return enrolled_users, errors
+
+    def stream_grades(self, header, users, errors, grading_cache, course_key, detailed):  # pylint: disable=too-many-arguments
+        """
+        Yield the JSON response, reading the grade of each user as it's written.
+        """
+        encoder = encoders.JSONEncoder()
+        # The header is written without its closing brace to append the results list
+        yield encoder.encode(header)[:-1] + ', "results": ['
+
+        separator = ""
+        for user in users:
+            result = {"username": user.username, "email": user.email}
+            try:
+                course_grade = grading_cache.read(user, course_key)
+                grade = {"earned_grade": course_grade.percent}
+                if detailed:
+                    grade["section_breakdown"] = self._section_breakdown(course_grade.subsection_grades)
+                result.update(EdxappGradeSerializer(grade).data)
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception("Could not read the grade of %s in %s", user.username, course_key)
+                result["error"] = {"detail": "Could not read the grade."}
+            yield separator + encoder.encode(result)
+            separator = ", "
+
+        for error in errors:
+            yield separator + encoder.encode(error)
+            separator = ", "
+
+        yield "]}"
+
+
+class EdxappBulkJob(APIView):
+    """
+    Handles the status and the results of the asynchronous bulk jobs
+
+    **Example Requests**
+
+        GET /eox-core/api/v1/bulk-job/bulk_job-7faf4b00-b526-4787-8ef2-f543dadfdb09/
+
+        GET /eox-core/api/v1/bulk-job/bulk_job-7faf4b00-b526-4787-8ef2-f543dadfdb09/?download=true
+
+    **Response details**
+
+        - `state`: The celery state of the job.
+        - `progress`: The `total`, `done` and `failed` items of the job.
+        - `result`: The counters and the result of each item, once the job is ready.
+
+    A job can only be read from the site it was started on, for
+    EOX_CORE_BULK_JOB_TIMEOUT seconds. Once it's ready, `?download=true`
+    returns its result as a file.
+    """
+
+    authentication_classes = (BearerAuthentication, SessionAuthentication, JwtAuthentication)
+    permission_classes = (EoxCoreAPIPermission,)
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer)
+
+    def get(self, request, job_id):
+        """
+        Return the state, the progress and the result of a job.
+        """
+        progress = BulkJobProgress(job_id)
+        counters = progress.get()
+        site = getattr(request, "site", None)
+        if counters is None or progress.get_site_id() != (site.id if site else None):
+            raise NotFound(f"No bulk job found with id {job_id}")
+
+        task_result = AsyncResult(job_id)
+        result = task_result.result if task_result.ready() else None
+
+        if result is not None and request.query_params.get("download", "").lower() in ("true", "1"):
+            return Response(result, headers={
+                "Content-Disposition": f'attachment; filename="{job_id}.json"',
+            })
+
+        return Response({
+            "job_id": job_id,
+            "state": task_result.state,
+            "progress": counters,
+            "result": result,
+        })
+
+
 class UserInfo(APIView):
     """
     Auth-only view to check some basic info about the current user
@@ -29,6 +29,20 @@ class EoxCoreConfig(AppConfig):
         },
     }
 
+    def ready(self):
+        """
+        Keep the eox-core indexes and caches in sync with the platform models.
+        """
+        # pylint: disable=import-outside-toplevel
+        from eox_core.signals import (
+            connect_course_overview_signals,
+            connect_site_configuration_signals,
+            connect_site_membership_signals,
+        )
+        connect_site_membership_signals()
+        connect_course_overview_signals()
+        connect_site_configuration_signals()
+
 
 class EoxCoreCMSConfig(EoxCoreConfig):
     """App configuration"""
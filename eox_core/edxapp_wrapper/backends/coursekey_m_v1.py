@@ -8,17 +8,17 @@ from __future__ import absolute_import, unicode_literals
 
 from django.conf import settings
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
-from openedx.core.djangoapps.site_configuration.helpers import get_all_orgs, get_current_site_orgs
 from rest_framework.serializers import ValidationError
 
+from eox_core.utils import course_key_cache, site_orgs_cache
+
 
 def get_valid_course_key(course_id):
     """
     Return the CourseKey if the course_id is valid
     """
     try:
-        return CourseKey.from_string(course_id)
+        return course_key_cache.parse(course_id)
     except InvalidKeyError:
         raise ValidationError(f"Invalid course_id {course_id}") from InvalidKeyError
 
@@ -31,6 +31,9 @@ def validate_org(course_id):
     1 Orgs in the current site
     2 Orgs in other sites
     3 flag EOX_CORE_USER_ENABLE_MULTI_TENANCY
+
+    The orgs of the sites are read from the in-process site_orgs_cache, so the
+    validation doesn't query the site configurations.
     """
 
     if not settings.EOX_CORE_USER_ENABLE_MULTI_TENANCY:
@@ -39,10 +42,10 @@ def validate_org(course_id):
     course_key = get_valid_course_key(course_id)
     course_org_filter = getattr(settings, "course_org_filter", [])
     course_org_filter = course_org_filter if isinstance(course_org_filter, list) else [course_org_filter]
-    current_site_orgs = get_current_site_orgs() or course_org_filter or []
+    current_site_orgs = site_orgs_cache.get_current_site_orgs() or course_org_filter or []
 
     if not current_site_orgs:  # pylint: disable=no-else-return
-        if course_key.org in get_all_orgs():
+        if course_key.org in site_orgs_cache.get_all_orgs():
             return False
         return True
     else:
@@ -5,14 +5,20 @@ Must be deleted some day and replaced with calls to the actual functions
 from django.conf import settings
 # pylint: disable=import-error
 from django.core.cache import cache
+from openedx.core.djangoapps.catalog.cache import SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.djangoapps.catalog.utils import get_catalog_api_client as create_catalog_api_client
 
+from eox_core.utils import StaleWhileRevalidateCache
+
 
 def get_program(program_uuid, ignore_cache=False):
     """
     Retrieves the details for the specified program.
 
+    The cached program is served while it's refreshed in the background for
+    EOX_CORE_PROGRAMS_STALE_TTL seconds after PROGRAMS_CACHE_TTL expires.
+
      Args:
          program_uuid (UUID): Program identifier
          ignore_cache (bool): Indicates if previously-cached data should be ignored.
@@ -20,20 +26,34 @@ def get_program(program_uuid, ignore_cache=False):
      Returns:
          dict
     """
-    program_uuid = str(program_uuid)
-    cache_key = f'programs.api.data.{program_uuid}'
+    return get_programs_cache().get(str(program_uuid), ignore_cache=ignore_cache)
+
 
-    if not ignore_cache:
-        program = cache.get(cache_key)
+def get_programs_cache():
+    """
+    Return the stale-while-revalidate cache of the catalog programs.
+    """
+    return StaleWhileRevalidateCache(
+        'eox_core.programs',
+        fetch_program,
+        fresh_ttl=getattr(settings, 'PROGRAMS_CACHE_TTL', 60),
+        stale_ttl=getattr(settings, 'EOX_CORE_PROGRAMS_STALE_TTL', 3600),
+    )
 
-        if program:
-            return program
 
+def fetch_program(program_uuid):
+    """
+    Retrieves the details for the specified program from the catalog service.
+    """
     catalog_integration = CatalogIntegration.current()
     user = catalog_integration.get_service_user()
     api = create_catalog_api_client(user)
 
-    program = api.programs(program_uuid).get()
-    cache.set(cache_key, program, getattr(settings, 'PROGRAMS_CACHE_TTL', 60))
+    return api.programs(program_uuid).get()
+
 
-    return program
+def get_site_program_uuids(site):
+    """
+    Returns the uuids of the programs of a site, as cached by the platform `cache_programs` command.
+    """
+    return cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), [])
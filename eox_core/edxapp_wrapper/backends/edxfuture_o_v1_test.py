@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Programs test backend, backed by a local stub of the catalog service
+"""
+from django.conf import settings
+
+from eox_core.utils import StaleWhileRevalidateCache
+
+CATALOG_PROGRAMS = {}
+SITE_PROGRAM_UUIDS = {}
+
+
+def get_program(program_uuid, ignore_cache=False):
+    """
+    Retrieves the details for the specified program.
+    """
+    return get_programs_cache().get(str(program_uuid), ignore_cache=ignore_cache)
+
+
+def get_programs_cache():
+    """
+    Return the stale-while-revalidate cache of the stub catalog programs.
+    """
+    return StaleWhileRevalidateCache(
+        'eox_core.programs',
+        fetch_program,
+        fresh_ttl=getattr(settings, 'PROGRAMS_CACHE_TTL', 60),
+        stale_ttl=getattr(settings, 'EOX_CORE_PROGRAMS_STALE_TTL', 3600),
+    )
+
+
+def fetch_program(program_uuid):
+    """
+    Retrieves the details for the specified program from the stub catalog.
+    """
+    return CATALOG_PROGRAMS[program_uuid]
+
+
+def get_site_program_uuids(site):
+    """
+    Returns the uuids of the programs of a site in the stub catalog.
+    """
+    return SITE_PROGRAM_UUIDS.get(site.domain, [])
@@ -0,0 +1,273 @@
+"""
+Helpers shared by the enrollment backends of every release.
+
+They don't import the platform modules, so they can be tested without it. The
+platform models they need are received as arguments, or defined by the backends
+in subclasses.
+"""
+import datetime
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from crum import get_current_request, get_current_user, impersonate, set_current_request
+from django.conf import settings
+from django.db import connections, transaction
+from opaque_keys.edx.keys import CourseKey
+from pytz import utc
+from rest_framework.exceptions import NotFound
+
+from eox_core.edxapp_wrapper.coursekey import validate_org
+from eox_core.edxapp_wrapper.programs import get_program
+from eox_core.edxapp_wrapper.users import check_edxapp_account_conflicts
+from eox_core.utils import cache
+
+LOG = logging.getLogger(__name__)
+
+
+def run_program_enrollments(enroll, course_ids, validation_errors, concurrent=False):
+    """
+    Return the outcome of `enroll(course_id, errors_list)` for each course of a program.
+
+    With `concurrent` the courses are enrolled in up to EOX_CORE_PROGRAM_ENROLLMENT_WORKERS
+    threads. Every thread writes through its own database connection, which commits on
+    its own, so the enrollments are only run concurrently outside of an atomic block:
+    inside one they are run serially to be committed or rolled back with the rest of the
+    transaction. The enrollment view is excluded from ATOMIC_REQUESTS for that reason.
+    The threads see the crum request and user of the caller, as the enrollment signals
+    of the platform read them.
+    """
+    if concurrent and transaction.get_connection().in_atomic_block:
+        LOG.info('Enrolling serially on the program courses to keep them in the current transaction')
+        concurrent = False
+
+    if not concurrent or len(course_ids) <= 1:
+        return [enroll(course_id, errors_list) for course_id, errors_list in zip(course_ids, validation_errors)]
+
+    request = get_current_request()
+    user = get_current_user()
+
+    def enroll_in_thread(course_id, errors_list):
+        set_current_request(request)
+        try:
+            with impersonate(user):
+                return enroll(course_id, errors_list)
+        finally:
+            set_current_request(None)
+            connections.close_all()
+
+    max_workers = min(len(course_ids), getattr(settings, 'EOX_CORE_PROGRAM_ENROLLMENT_WORKERS', 4))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(enroll_in_thread, course_ids, validation_errors))
+
+
+def get_program_course_runs(program_uuid, course_overview_model):
+    """
+    Return the key of the preferred course run of each course of a program.
+
+    The choice is cached for EOX_CORE_PROGRAM_COURSE_RUNS_CACHE_TTL seconds.
+    """
+    cache_key = f'eox_core.program_course_runs.{program_uuid}'
+    course_ids = cache.get(cache_key)
+    if course_ids is not None:
+        return course_ids
+
+    try:
+        data = get_program(program_uuid)
+    except Exception as err:  # pylint: disable=broad-except
+        raise NotFound(repr(err)) from err
+    if not data['courses']:
+        raise NotFound("No courses found for this program")
+    if not all(course['course_runs'] for course in data['courses']):
+        raise NotFound("No course runs available for this course")
+
+    course_overviews = get_course_overviews(
+        [run['key'] for course in data['courses'] for run in course['course_runs']],
+        course_overview_model,
+    )
+    course_ids = [
+        get_preferred_course_run(course, course_overviews)['key']
+        for course in data['courses']
+    ]
+    cache.set(cache_key, course_ids, getattr(settings, 'EOX_CORE_PROGRAM_COURSE_RUNS_CACHE_TTL', 300))
+    return course_ids
+
+
+def get_course_overviews(course_run_keys, course_overview_model):
+    """
+    Return the CourseOverview of each course run, keyed by course run key, with a single query.
+    """
+    course_keys = [CourseKey.from_string(key) for key in course_run_keys]
+    course_overviews = {
+        str(course_overview.id): course_overview
+        for course_overview in course_overview_model.objects.filter(id__in=course_keys)
+    }
+    for course_key in course_keys:
+        if str(course_key) not in course_overviews:
+            # Not cached yet, get_from_id loads it from the modulestore
+            course_overviews[str(course_key)] = course_overview_model.get_from_id(course_key)
+    return course_overviews
+
+
+def get_preferred_course_run(course, course_overviews):
+    """
+    Returns the course run more likely to be the intended one
+    """
+    sorted_course_runs = sorted(course['course_runs'], key=lambda run: run['start'])
+
+    for run in sorted_course_runs:
+        default_enrollment_start_date = datetime.datetime(1900, 1, 1, tzinfo=utc)
+        course_overview = course_overviews[str(CourseKey.from_string(run['key']))]
+        enrollment_end = course_overview.enrollment_end or datetime.datetime.max.replace(tzinfo=utc)
+        enrollment_start = course_overview.enrollment_start or default_enrollment_start_date
+        run['is_enrollment_open'] = enrollment_start <= datetime.datetime.now(utc) < enrollment_end
+
+    open_course_runs = [run for run in sorted_course_runs if run['is_enrollment_open']]
+    course_run = open_course_runs[0] if open_course_runs else sorted_course_runs[-1]
+    return course_run
+
+
+def read_enrollments(enrollments, include_attributes=True, after_id=None, limit=None, site_user_filter=None):
+    """
+    Return the enrollments of the queryset as the dicts of the enrollment API, sorted by id.
+
+    The dicts have the fields read by EdxappCourseEnrollmentSerializer and the `id` of the
+    enrollment, the course details of the enrollment API are not included. `after_id` and
+    `limit` select a page of the enrollments.
+
+    The attributes are read in the same query, joined to the enrollments, and grouped
+    by enrollment. A limit on the joined rows would cut the attributes of the last
+    enrollment, so with a limit the ids of the page are read first.
+
+    `site_user_filter(user_ids)` returns the ids of the users of the site among the given
+    ones, only their enrollments are read, see read_site_enrollment_ids.
+    """
+    if after_id is not None:
+        enrollments = enrollments.filter(id__gt=after_id)
+    if site_user_filter is not None:
+        page_ids = read_site_enrollment_ids(enrollments, site_user_filter, limit)
+        enrollments = enrollments.filter(id__in=page_ids)
+    elif limit is not None:
+        page_ids = list(enrollments.order_by('id').values_list('id', flat=True)[:limit])
+        enrollments = enrollments.filter(id__in=page_ids)
+
+    fields = ['id', 'user__username', 'course_id', 'mode', 'is_active', 'created']
+    if include_attributes:
+        fields += ['attributes__namespace', 'attributes__name', 'attributes__value']
+    return group_enrollment_rows(enrollments.order_by('id').values(*fields), include_attributes)
+
+
+def read_site_enrollment_ids(enrollments, site_user_filter, limit=None):
+    """
+    Return the ids of the enrollments of the users of the site, sorted, up to `limit` of them.
+
+    The enrollments are read by batches of ids and users, and the users of each batch are
+    checked with `site_user_filter` at once. The batches are read until the page is filled,
+    so the enrollments of the users of other sites don't shorten it.
+    """
+    batch_size = limit or getattr(settings, 'EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE', 1000)
+    page_ids = []
+    while limit is None or len(page_ids) < limit:
+        rows = list(enrollments.order_by('id').values_list('id', 'user_id')[:batch_size])
+        if not rows:
+            break
+        site_user_ids = site_user_filter({user_id for _, user_id in rows})
+        page_ids += [enrollment_id for enrollment_id, user_id in rows if user_id in site_user_ids]
+        if len(rows) < batch_size:
+            break
+        enrollments = enrollments.filter(id__gt=rows[-1][0])
+    return page_ids[:limit]
+
+
+def group_enrollment_rows(rows, include_attributes=True):
+    """
+    Return the enrollments of the joined rows of the enrollments and their attributes.
+
+    The rows of an enrollment are consecutive. The enrollments without attributes have
+    a single row with empty attribute columns.
+    """
+    enrollments_by_id = {}
+    for row in rows:
+        enrollment = enrollments_by_id.get(row['id'])
+        if enrollment is None:
+            enrollment = enrollments_by_id[row['id']] = {
+                'id': row['id'],
+                'user': row['user__username'],
+                'course_id': str(row['course_id']),
+                'mode': row['mode'],
+                'is_active': row['is_active'],
+                'created': row['created'],
+                'enrollment_attributes': [],
+            }
+        if include_attributes and row['attributes__name'] is not None:
+            enrollment['enrollment_attributes'].append({
+                'namespace': row['attributes__namespace'],
+                'name': row['attributes__name'],
+                'value': row['attributes__value'],
+            })
+    return list(enrollments_by_id.values())
+
+
+class EnrollmentValidator(ABC):
+    """
+    Checks enrollment queries, reusing the account and course checks already made.
+
+    A validator checks the account of each user and each course and mode once, no matter
+    how many of its queries share them. The backends define the course modes of the
+    platform in ALL_MODES and how a mode is validated in a course in `validate_course_mode`.
+    """
+
+    ALL_MODES = ()
+
+    def __init__(self):
+        self.accounts = {}
+        self.courses = {}
+
+    def check(self, query):
+        """
+        Return the list of errors of an enrollment query
+        """
+        errors = []
+        is_active = query.get("is_active", True)
+        course_id = query.get("course_id")
+        force = query.get('force', False)
+        mode = query.get("mode")
+        program_uuid = query.get('bundle_id')
+        username = query.get("username")
+        email = query.get("email")
+
+        if program_uuid and course_id:
+            return ['You have to provide a course_id or bundle_id but not both']
+        if not program_uuid and not course_id:
+            return ['You have to provide a course_id or bundle_id']
+        if not email and not username:
+            return ['Email or username needed']
+        if (email, username) not in self.accounts:
+            self.accounts[(email, username)] = check_edxapp_account_conflicts(email=email, username=username)
+        if not self.accounts[(email, username)]:
+            return ['User not found']
+        if mode not in self.ALL_MODES:
+            return ['Invalid mode given:' + mode]
+        if course_id:
+            course_key = (course_id, mode, is_active, force)
+            if course_key not in self.courses:
+                self.courses[course_key] = self.check_course_mode(course_id, mode, is_active, force)
+            errors.extend(self.courses[course_key])
+        return errors
+
+    def check_course_mode(self, course_id, mode, is_active, force):
+        """
+        Return the errors of the enrollments in the course and mode
+        """
+        errors = []
+        if not validate_org(course_id):
+            errors.append('Enrollment not allowed for given org')
+        if not force:
+            errors.extend(self.validate_course_mode(course_id, mode, is_active))
+        return errors
+
+    @abstractmethod
+    def validate_course_mode(self, course_id, mode, is_active):
+        """
+        Return the errors of the mode in the course, as checked by the platform
+        """
@@ -4,14 +4,13 @@
 Backend for the create_edxapp_user that works under the open-release/lilac.master tag
 """
 # pylint: disable=import-error, protected-access
-import datetime
 import logging
+from functools import partial
 
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.student.models import CourseEnrollment
 from django.contrib.auth.models import User
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.enrollments import api  # pylint: disable=ungrouped-imports
 from openedx.core.djangoapps.enrollments.errors import (  # pylint: disable=ungrouped-imports
@@ -19,12 +18,17 @@ from openedx.core.djangoapps.enrollments.errors import (  # pylint: disable=ungr
     CourseModeNotFoundError,
 )
 from openedx.core.lib.exceptions import CourseNotFoundError
-from pytz import utc
 from rest_framework.exceptions import APIException, NotFound
 
-from eox_core.edxapp_wrapper.backends.edxfuture_i_v1 import get_program
-from eox_core.edxapp_wrapper.coursekey import get_valid_course_key, validate_org
-from eox_core.edxapp_wrapper.users import check_edxapp_account_conflicts
+from eox_core.edxapp_wrapper.backends.enrollment_common import (
+    EnrollmentValidator,
+    get_program_course_runs,
+    read_enrollments,
+    run_program_enrollments,
+)
+from eox_core.edxapp_wrapper.coursekey import get_valid_course_key
+from eox_core.edxapp_wrapper.users import get_site_user_ids
+from eox_core.utils import course_key_cache
 
 LOG = logging.getLogger(__name__)
 
@@ -48,6 +52,7 @@ def create_enrollment(user, *args, **kwargs):
     course_id = kwargs.pop('course_id', None)
 
     if program_uuid:
+        kwargs.pop('skip_validation', None)
         return _enroll_on_program(user, program_uuid, *args, **kwargs)
     if course_id:
         return _enroll_on_course(user, course_id, *args, **kwargs)
@@ -101,6 +106,10 @@ def get_enrollment(*args, **kwargs):
     """
     Return enrollment of given user in the course provided.
 
+    The enrollment and its attributes are read with a single joined query. The user
+    object can be given instead of the username to skip the join with the users table,
+    and `include_attributes=False` skips the attributes.
+
     Example:
         >>>get_enrollment(
             {
@@ -112,21 +121,62 @@ def get_enrollment(*args, **kwargs):
     errors = []
     course_id = kwargs.pop('course_id', None)
     username = kwargs.get('username', None)
+    user = kwargs.get('user', None)
 
+    LOG.info('Getting enrollment information of student: %s  course: %s', username, course_id)
     try:
-        LOG.info('Getting enrollment information of student: %s  course: %s', username, course_id)
-        enrollment = api.get_enrollment(username, course_id)
-        if not enrollment:
-            errors.append(f'No enrollment found for user:`{username}`')
-            return None, errors
+        course_key = course_key_cache.parse(course_id)
     except InvalidKeyError:
         errors.append(f'No course found for course_id `{course_id}`')
         return None, errors
-    enrollment['enrollment_attributes'] = api.get_enrollment_attributes(username, course_id)
+
+    enrollments = CourseEnrollment.objects.filter(course_id=course_key)
+    if user is not None:
+        enrollments = enrollments.filter(user=user)
+    else:
+        enrollments = enrollments.filter(user__username=username)
+
+    enrollments = read_enrollments(enrollments, kwargs.get('include_attributes', True))
+    if not enrollments:
+        errors.append(f'No enrollment found for user:`{username}`')
+        return None, errors
+
+    enrollment = enrollments[0]
     enrollment['course_id'] = course_id
     return enrollment, errors
 
 
+def get_enrollments(  # pylint:disable=too-many-arguments
+    user=None, course_id=None, include_attributes=True, after_id=None, limit=None, site=None,
+):
+    """
+    Return all the enrollments of an user, of a course, or of an user in a course, with their attributes.
+
+    The enrollments are sorted by id, `after_id` and `limit` select a page of them, see
+    read_enrollments. Without a user, only the enrollments of the users of the `site` are
+    returned.
+
+    Example:
+        >>>get_enrollments(
+            user=user_object,
+            include_attributes=False,
+        )
+    """
+    enrollments = CourseEnrollment.objects.all()
+    if user is not None:
+        enrollments = enrollments.filter(user=user)
+    if course_id:
+        try:
+            enrollments = enrollments.filter(course_id=course_key_cache.parse(course_id))
+        except InvalidKeyError:
+            return [], [f'No course found for course_id `{course_id}`']
+    elif user is None:
+        return [], ['You have to provide a user or a course_id']
+
+    site_user_filter = partial(get_site_user_ids, site=site) if user is None else None
+    return read_enrollments(enrollments, include_attributes, after_id, limit, site_user_filter), []
+
+
 def delete_enrollment(*args, **kwargs):
     """
     Delete enrollment and enrollment attributes of given user in the course provided.
@@ -194,9 +244,11 @@ def _enroll_on_course(user, course_id, *args, **kwargs):
         'mode': mode,
         'username': username,
     }
-    validation_errors = check_edxapp_enrollment_is_valid(**enrollment_valid_query)
-    if validation_errors:
-        return None, [", ".join(validation_errors)]
+    # Bulk enrollments are validated in advance with check_edxapp_enrollments_are_valid
+    if not kwargs.get('skip_validation', False):
+        validation_errors = check_edxapp_enrollment_is_valid(**enrollment_valid_query)
+        if validation_errors:
+            return None, [", ".join(validation_errors)]
 
     try:
         LOG.info('Creating regular enrollment %s, %s, %s', username, course_id, mode)
@@ -226,55 +278,64 @@ def _enroll_on_course(user, course_id, *args, **kwargs):
 def _enroll_on_program(user, program_uuid, *arg, **kwargs):
     """
     enroll user on each of the courses of a program
+
+    The enrollments are validated together, so the account of the user is checked
+    once, and with `concurrent` they are created in parallel threads, up to
+    EOX_CORE_PROGRAM_ENROLLMENT_WORKERS at a time, when they don't run in an atomic
+    block. See run_program_enrollments.
     """
-    results = []
-    errors = []
+    concurrent = kwargs.pop('concurrent', False)
     LOG.info('Enrolling on program: %s', program_uuid)
-    try:
-        data = get_program(program_uuid)
-    except Exception as err:  # pylint: disable=broad-except
-        raise NotFound(repr(err)) from err
-    if not data['courses']:
-        raise NotFound("No courses found for this program")
-    for course in data['courses']:
-        if course['course_runs']:
-            course_run = _get_preferred_course_run(course)
-            LOG.info('Enrolling on course_run: %s', course_run['key'])
-            course_id = course_run['key']
-            try:
-                result, errors_list = _enroll_on_course(user, course_id, *arg, **kwargs)
-            except APIException as error:
-                result = {
-                    'username': user.username,
-                    'mode': None,
-                    'course_id': course_id,
-                }
-                errors_list = [error.detail]
-
-            results.append(result)
-            errors.append(errors_list)
-        else:
-            raise NotFound("No course runs available for this course")
+    course_ids = get_program_course_runs(program_uuid, CourseOverview)
+
+    validation_errors = check_edxapp_enrollments_are_valid([
+        {
+            'course_id': course_id,
+            'force': kwargs.get('force', False),
+            'mode': kwargs.get('mode', 'audit'),
+            'username': user.username,
+        }
+        for course_id in course_ids
+    ])
+
+    def enroll(course_id, errors_list):
+        if errors_list:
+            return None, [", ".join(errors_list)]
+        LOG.info('Enrolling on course_run: %s', course_id)
+        try:
+            return _enroll_on_course(user, course_id, *arg, skip_validation=True, **kwargs)
+        except APIException as error:
+            result = {
+                'username': user.username,
+                'mode': None,
+                'course_id': course_id,
+            }
+            return result, [error.detail]
+
+    outcomes = run_program_enrollments(enroll, course_ids, validation_errors, concurrent)
+    results = [result for result, _ in outcomes]
+    errors = [errors_list for _, errors_list in outcomes]
     return results, errors
 
 
-def _get_preferred_course_run(course):
+class EdxappEnrollmentValidator(EnrollmentValidator):
     """
-    Returns the course run more likely to be the intended one
+    Checks enrollment queries against the course modes of the platform
     """
-    sorted_course_runs = sorted(course['course_runs'], key=lambda run: run['start'])
 
-    for run in sorted_course_runs:
-        default_enrollment_start_date = datetime.datetime(1900, 1, 1, tzinfo=utc)
-        course_run_key = CourseKey.from_string(run['key'])
-        course_overview = CourseOverview.get_from_id(course_run_key)
-        enrollment_end = course_overview.enrollment_end or datetime.datetime.max.replace(tzinfo=utc)
-        enrollment_start = course_overview.enrollment_start or default_enrollment_start_date
-        run['is_enrollment_open'] = enrollment_start <= datetime.datetime.now(utc) < enrollment_end
+    ALL_MODES = CourseMode.ALL_MODES
 
-    open_course_runs = [run for run in sorted_course_runs if run['is_enrollment_open']]
-    course_run = open_course_runs[0] if open_course_runs else sorted_course_runs[-1]
-    return course_run
+    def validate_course_mode(self, course_id, mode, is_active):
+        """
+        Return the errors of the mode in the course
+        """
+        try:
+            api.validate_course_mode(course_id, mode, is_active=is_active)
+        except CourseModeNotFoundError:
+            return ['Mode not found']
+        except CourseNotFoundError:
+            return ['Course not found']
+        return []
 
 
 # pylint: disable=invalid-name
@@ -282,36 +343,19 @@ def check_edxapp_enrollment_is_valid(*args, **kwargs):
     """
     backend function to check if enrollment is valid
     """
-    errors = []
-    is_active = kwargs.get("is_active", True)
-    course_id = kwargs.get("course_id")
-    force = kwargs.get('force', False)
-    mode = kwargs.get("mode")
-    program_uuid = kwargs.get('bundle_id')
-    username = kwargs.get("username")
-    email = kwargs.get("email")
-
-    if program_uuid and course_id:
-        return ['You have to provide a course_id or bundle_id but not both']
-    if not program_uuid and not course_id:
-        return ['You have to provide a course_id or bundle_id']
-    if not email and not username:
-        return ['Email or username needed']
-    if not check_edxapp_account_conflicts(email=email, username=username):
-        return ['User not found']
-    if mode not in CourseMode.ALL_MODES:
-        return ['Invalid mode given:' + mode]
-    if course_id:
-        if not validate_org(course_id):
-            errors.append('Enrollment not allowed for given org')
-    if course_id and not force:
-        try:
-            api.validate_course_mode(course_id, mode, is_active=is_active)
-        except CourseModeNotFoundError:
-            errors.append('Mode not found')
-        except CourseNotFoundError:
-            errors.append('Course not found')
-    return errors
+    return EdxappEnrollmentValidator().check(kwargs)
+
+
+def check_edxapp_enrollments_are_valid(queries):
+    """
+    backend function to check if many enrollments are valid
+
+    Returns the list of errors of each query. The account of each user and the
+    course and mode of the enrollments are checked once, no matter how many
+    queries share them, see EnrollmentValidator.
+    """
+    validator = EdxappEnrollmentValidator()
+    return [validator.check(query) for query in queries]
 
 
 def _create_or_update_enrollment(username, course_id, mode, is_active, try_update):
@@ -113,3 +113,179 @@ def get_pre_enrollment(*args, **kwargs):
     except CourseEnrollmentAllowed.DoesNotExist:
         raise NotFound(f'Pre-enrollment not found for email: {email} course_id: {course_id}') from CourseEnrollmentAllowed.DoesNotExist
     return pre_enrollment
+
+
+def get_pre_enrollments_course_keys(queries):
+    """
+    Return the course key of every course_id in the queries, each course_id is parsed once.
+    """
+    course_keys = {}
+    for query in queries:
+        course_id = query['course_id']
+        if course_id not in course_keys:
+            course_keys[course_id] = get_valid_course_key(course_id)
+    return course_keys
+
+
+def get_existing_pre_enrollments(queries, course_keys):
+    """
+    Return the pre-enrollments of the queries that exist, keyed by email and course_id.
+    """
+    emails = {query['email'] for query in queries}
+    existing = CourseEnrollmentAllowed.objects.filter(
+        course_id__in=set(course_keys.values()),
+        email__in=emails,
+    )
+    return {(pre_enrollment.email, str(pre_enrollment.course_id)): pre_enrollment for pre_enrollment in existing}
+
+
+def create_pre_enrollments(queries):
+    """
+    Create the pre-enrollments of many users and courses with a single insert.
+
+    Each course is checked once, and the pre-enrollments that already exist, or
+    are repeated in the queries, are reported with an error. The insert skips the
+    rows that conflict with another one, e.g. an email that only differs by case
+    under a case insensitive collation, so the rows are read again afterwards and
+    the queries whose exact row wasn't stored are reported with an error too.
+
+    Example:
+        >>>create_pre_enrollments([
+            {
+            "email": "bob@example.com",
+            "course_id": course-v1-edX-DemoX-1T2015",
+            "auto_enroll": "False"
+            },
+        ])
+
+    Returns: A (pre_enrollment, warnings) tuple for each query, or the NotFound error if it already exists.
+    """
+    course_keys = get_pre_enrollments_course_keys(queries)
+    existing = get_existing_pre_enrollments(queries, course_keys)
+
+    course_warnings = {}
+    for course_id, course_key in course_keys.items():
+        try:
+            get_courseware_courses().get_course(course_key)
+            course_warnings[course_id] = []
+        except ValueError:
+            course_warnings[course_id] = [f'Course with course_id:{course_id} does not exist']
+
+    results = []
+    new_positions = []
+    new_pre_enrollments = []
+    for query in queries:
+        email = query['email']
+        course_id = query['course_id']
+        course_key = course_keys[course_id]
+        if (email, str(course_key)) in existing:
+            results.append(NotFound(f'Pre-enrollment already exists for email: {email} course_id: {course_id}'))
+            continue
+
+        pre_enrollment = CourseEnrollmentAllowed(
+            email=email,
+            course_id=course_key,
+            auto_enroll=query.get('auto_enroll', False),
+        )
+        existing[(email, str(course_key))] = pre_enrollment
+        new_positions.append(len(results))
+        new_pre_enrollments.append(pre_enrollment)
+        results.append((pre_enrollment, course_warnings[course_id]))
+
+    CourseEnrollmentAllowed.objects.bulk_create(new_pre_enrollments, ignore_conflicts=True)
+    LOG.info('Creating %s regular pre-enrollments in %s courses', len(new_pre_enrollments), len(course_keys))
+
+    stored = get_existing_pre_enrollments(
+        [{'email': pre_enrollment.email} for pre_enrollment in new_pre_enrollments],
+        course_keys,
+    )
+    for position, pre_enrollment in zip(new_positions, new_pre_enrollments):
+        course_id = queries[position]['course_id']
+        stored_pre_enrollment = stored.get((pre_enrollment.email, str(pre_enrollment.course_id)))
+        if stored_pre_enrollment is None:
+            results[position] = NotFound(
+                f'Pre-enrollment already exists for email: {pre_enrollment.email} course_id: {course_id}'
+            )
+        else:
+            results[position] = (stored_pre_enrollment, course_warnings[course_id])
+    return results
+
+
+def update_pre_enrollments(queries):
+    """
+    Update the auto_enroll flag of the pre-enrollments of many users and courses.
+
+    The flag is updated with one query per course and value.
+
+    Example:
+        >>>update_pre_enrollments([
+            {
+            "email": "bob@example.com",
+            "course_id": course-v1-edX-DemoX-1T2015",
+            "auto_enroll": "False"
+            },
+        ])
+
+    Returns: The updated pre-enrollment of each query, or the NotFound error if it doesn't exist.
+    """
+    course_keys = get_pre_enrollments_course_keys(queries)
+    existing = get_existing_pre_enrollments(queries, course_keys)
+
+    results = []
+    updated = {}
+    for query in queries:
+        email = query['email']
+        course_id = query['course_id']
+        course_key = course_keys[course_id]
+        pre_enrollment = existing.get((email, str(course_key)))
+        if pre_enrollment is None:
+            results.append(NotFound(f'Pre-enrollment not found for email: {email} course_id: {course_id}'))
+            continue
+
+        pre_enrollment.auto_enroll = query.get('auto_enroll', False)
+        updated[pre_enrollment.id] = pre_enrollment
+        results.append(pre_enrollment)
+
+    updates = {}
+    for pre_enrollment in updated.values():
+        updates.setdefault((pre_enrollment.course_id, pre_enrollment.auto_enroll), set()).add(pre_enrollment.email)
+
+    for (course_key, auto_enroll), emails in updates.items():
+        CourseEnrollmentAllowed.objects.filter(course_id=course_key, email__in=emails).update(auto_enroll=auto_enroll)
+        LOG.info('Updating %s regular pre-enrollments in course_id: %s auto_enroll: %s', len(emails), course_key, auto_enroll)
+    return results
+
+
+def delete_pre_enrollments(queries):
+    """
+    Delete the pre-enrollments of many users and courses with a single query.
+
+    Example:
+        >>>delete_pre_enrollments([
+            {
+            "email": "bob@example.com",
+            "course_id": course-v1-edX-DemoX-1T2015"
+            },
+        ])
+
+    Returns: The deleted pre-enrollment of each query, or the NotFound error if it doesn't exist.
+    """
+    course_keys = get_pre_enrollments_course_keys(queries)
+    existing = get_existing_pre_enrollments(queries, course_keys)
+
+    results = []
+    deleted_ids = set()
+    for query in queries:
+        email = query['email']
+        course_id = query['course_id']
+        pre_enrollment = existing.get((email, str(course_keys[course_id])))
+        if pre_enrollment is None or pre_enrollment.id in deleted_ids:
+            results.append(NotFound(f'Pre-enrollment not found for email: {email} course_id: {course_id}'))
+            continue
+
+        deleted_ids.add(pre_enrollment.id)
+        results.append(pre_enrollment)
+
+    CourseEnrollmentAllowed.objects.filter(id__in=deleted_ids).delete()
+    LOG.info('Deleting %s regular pre-enrollments', len(deleted_ids))
+    return results
@@ -0,0 +1,211 @@
+"""
+Helpers shared by the users backends of every release.
+
+They don't import the platform modules, so they can be tested without it.
+"""
+from crum import get_current_request
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import NotFound, ValidationError
+
+from eox_core.edxapp_wrapper.configuration_helpers import get_configuration_helper
+from eox_core.models import UserSiteMembership
+
+
+def match_user_queries(queries, users, site_user_ids, domain):
+    """
+    Return the user of each query by username and/or email, or the error to report for it.
+
+    `users` are the candidates read for all the queries and `site_user_ids` the ids of
+    the ones that belong to the site. The lookups of the database may ignore the case,
+    so the candidates are matched without it, and the ones that match exactly are
+    preferred. A query that still matches several users, like two accounts with the
+    same email, gets a ValidationError instead of an arbitrary one of them.
+    """
+    users_by_username = {}
+    users_by_email = {}
+    for user in users:
+        if user.id in site_user_ids:
+            users_by_username.setdefault(user.username.lower(), []).append(user)
+            users_by_email.setdefault(user.email.lower(), []).append(user)
+
+    results = []
+    for query in queries:
+        params = {key: query.get(key) for key in ['username', 'email'] if query.get(key)}
+        if "username" in params:
+            candidates = users_by_username.get(params["username"].lower(), [])
+        else:
+            candidates = users_by_email.get(params.get("email", "").lower(), [])
+        if "email" in params:
+            candidates = [user for user in candidates if user.email.lower() == params["email"].lower()]
+
+        if len(candidates) > 1:
+            exact_matches = [
+                user for user in candidates
+                if all(getattr(user, key) == value for key, value in params.items())
+            ]
+            if len(exact_matches) == 1:
+                candidates = exact_matches
+
+        if len(candidates) == 1:
+            results.append(candidates[0])
+        elif candidates:
+            results.append(ValidationError(f'Multiple users found by {str(params)} on site {domain}.'))
+        else:
+            results.append(NotFound(f'No user found by {str(params)} on site {domain}.'))
+    return results
+
+
+class UserSiteSources:
+    """
+    Check if users belong to a site according to the sources enabled for it.
+
+    Each source is a `<source>(user, domain)` method of the subclasses of the releases.
+    The sources with a `condition_<source>(domain)` method, which returns a Q on the
+    users, are checked for all the users with a single query.
+
+    The membership checks are memoized for the current request and, with
+    EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL, the domains of the positive ones are
+    kept in the shared cache for that many seconds. The signals of the source models
+    evict the cached domains of an user when its sources change.
+
+    With EOX_CORE_USER_SITE_MEMBERSHIP_INDEX the indexed sources are read from the
+    eox-core UserSiteMembership table instead.
+    """
+    REQUEST_MEMO_ATTRIBUTE = '_eox_core_user_site_sources'
+    INDEXED_SOURCES = {
+        'fetch_from_created_on_site_prop': UserSiteMembership.CREATED_ON_SITE,
+        'fetch_from_user_signup_source': UserSiteMembership.SIGNUP_SOURCE,
+    }
+
+    @classmethod
+    def get_enabled_source_methods(cls):
+        """ Brings the array of methods to check if an user belongs to a site. """
+        return [getattr(cls, source) for source in cls.get_enabled_source_names()]
+
+    @classmethod
+    def user_belongs_to_site(cls, user, domain):
+        """ Check if an user belongs to a site. """
+        return user.id in cls.filter_users_on_site([user], domain)
+
+    @classmethod
+    def filter_users_on_site(cls, users, domain):
+        """
+        Return the ids of the users that belong to the site.
+
+        The users already checked in the current request, or cached, are not checked again.
+        """
+        memo = cls.get_request_memo().setdefault('members', {})
+        site_user_ids = {user.id for user in users if memo.get((user.id, domain))}
+        pending = [user for user in users if (user.id, domain) not in memo]
+
+        cache_ttl = getattr(settings, 'EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL', 0)
+        if pending and cache_ttl:
+            cache_keys = {user.id: cls.get_membership_cache_key(user.id) for user in pending}
+            cached = cache.get_many(list(cache_keys.values()))
+            cached_domains = {user_id: cached.get(key, frozenset()) for user_id, key in cache_keys.items()}
+            cached_user_ids = {user_id for user_id, domains in cached_domains.items() if domain in domains}
+            site_user_ids |= cached_user_ids
+            memo.update({(user_id, domain): True for user_id in cached_user_ids})
+            pending = [user for user in pending if user.id not in cached_user_ids]
+
+        if pending:
+            member_ids = cls.check_users_on_site(pending, domain)
+            site_user_ids |= member_ids
+            memo.update({(user.id, domain): user.id in member_ids for user in pending})
+            if cache_ttl and member_ids:
+                cache.set_many(
+                    {cache_keys[user_id]: cached_domains[user_id] | {domain} for user_id in member_ids},
+                    cache_ttl,
+                )
+
+        return site_user_ids
+
+    @classmethod
+    def check_users_on_site(cls, users, domain):
+        """
+        Return the ids of the users that belong to the site according to the enabled sources.
+
+        The indexed sources are checked together in the membership index, the sources with
+        a condition with one exists() subquery each, and the rest user by user for the users
+        not found by the previous ones.
+        """
+        use_index = getattr(settings, 'EOX_CORE_USER_SITE_MEMBERSHIP_INDEX', False)
+        indexed_sources = []
+        conditions = []
+        other_sources = []
+        for source in cls.get_enabled_source_names():
+            if use_index and source in cls.INDEXED_SOURCES:
+                indexed_sources.append(cls.INDEXED_SOURCES[source])
+                continue
+            condition_method = getattr(cls, 'condition_' + source, None)
+            if condition_method is None:
+                other_sources.append(source)
+                continue
+            condition = condition_method(domain)
+            if condition is True:
+                return {user.id for user in users}
+            if condition is not None:
+                conditions.append(condition)
+
+        site_user_ids = set()
+        if indexed_sources and domain:
+            site_user_ids = UserSiteMembership.get_site_user_ids(
+                domain,
+                [user.id for user in users],
+                sources=indexed_sources,
+            )
+
+        if conditions:
+            combined_condition = conditions[0]
+            for condition in conditions[1:]:
+                combined_condition |= condition
+            site_user_ids |= set(get_user_model().objects.filter(
+                combined_condition,
+                id__in=[user.id for user in users if user.id not in site_user_ids],
+            ).values_list('id', flat=True))
+
+        for source in other_sources:
+            source_method = getattr(cls, source)
+            site_user_ids |= {
+                user.id for user in users
+                if user.id not in site_user_ids and source_method(user, domain)
+            }
+        return site_user_ids
+
+    @classmethod
+    def get_enabled_source_names(cls):
+        """ Brings the names of the methods enabled to check if an user belongs to a site. """
+        memo = cls.get_request_memo()
+        if 'sources' not in memo:
+            memo['sources'] = get_configuration_helper().get_value(
+                'EOX_CORE_USER_ORIGIN_SITE_SOURCES',
+                getattr(settings, 'EOX_CORE_USER_ORIGIN_SITE_SOURCES')
+            )
+        return memo['sources']
+
+    @classmethod
+    def get_request_memo(cls):
+        """ Return the memo of the current request, or a new one outside of a request. """
+        request = get_current_request()
+        if request is None:
+            return {}
+        memo = getattr(request, cls.REQUEST_MEMO_ATTRIBUTE, None)
+        if memo is None:
+            memo = {}
+            setattr(request, cls.REQUEST_MEMO_ATTRIBUTE, memo)
+        return memo
+
+    @staticmethod
+    def get_membership_cache_key(user_id):
+        """ Return the shared cache key of the domains of the sites an user belongs to. """
+        return f'eox_core.user_site_membership.{user_id}'
+
+    @classmethod
+    def evict_user(cls, user_id):
+        """ Forget the memberships of an user checked in the current request and cached. """
+        memo = cls.get_request_memo().get('members', {})
+        for key in [key for key in memo if key[0] == user_id]:
+            del memo[key]
+        cache.delete(cls.get_membership_cache_key(user_id))
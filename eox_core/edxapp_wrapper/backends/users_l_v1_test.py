@@ -14,6 +14,22 @@ def get_edxapp_user(**kwargs):
     return object
 
 
+def get_edxapp_users(queries, site=None):  # pylint: disable=unused-argument
+    """
+    Return a fake user for each query
+    """
+    return [object for _ in queries]
+
+
+def get_site_user_ids(user_ids, site=None):
+    """
+    Return the ids of the users indexed as members of the site
+    """
+    from eox_core.models import UserSiteMembership  # pylint: disable=import-outside-toplevel
+
+    return UserSiteMembership.get_site_user_ids(getattr(site, 'domain', ''), user_ids)
+
+
 def create_edxapp_user(*args, **kwargs):
     """
     Return a fake user and a list of errors
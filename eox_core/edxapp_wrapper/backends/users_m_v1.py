@@ -26,9 +26,9 @@ from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from edx_django_utils.user import generate_password  # pylint: disable=import-error,unused-import
 from openedx.core.djangoapps.lang_pref import LANGUAGE_KEY  # pylint: disable=import-error
-from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers  # pylint: disable=import-error
 from openedx.core.djangoapps.user_api.accounts import USERNAME_MAX_LENGTH  # pylint: disable=import-error,unused-import
 from openedx.core.djangoapps.user_api.accounts.serializers import UserReadOnlySerializer  # pylint: disable=import-error
 from openedx.core.djangoapps.user_api.accounts.views import \
@@ -49,6 +49,8 @@ from rest_framework import status
 from rest_framework.exceptions import NotFound
 from social_django.models import UserSocialAuth  # pylint: disable=import-error
 
+from eox_core.edxapp_wrapper.backends.users_common import UserSiteSources, match_user_queries
+
 LOG = logging.getLogger(__name__)
 User = get_user_model()  # pylint: disable=invalid-name
 
@@ -255,16 +257,59 @@ def get_edxapp_user(**kwargs):
 
     try:
         user = User.objects.get(**params)
-        for source_method in FetchUserSiteSources.get_enabled_source_methods():
-            if source_method(user, domain):
-                break
-        else:
+        if not FetchUserSiteSources.user_belongs_to_site(user, domain):
             raise User.DoesNotExist
     except User.DoesNotExist:
         raise NotFound(f'No user found by {str(params)} on site {domain}.') from User.DoesNotExist
     return user
 
 
+def get_edxapp_users(queries, site=None):
+    """
+    Retrieve the users of a list of queries by username and/or email
+
+    The users are read with one query, and the site membership is checked for
+    all of them at once. The result has one entry per query, either the user or
+    the error to report for it, see match_user_queries.
+
+    Examples:
+        >>> get_edxapp_users(
+            [
+                {"username": "Bob"},
+                {"email": "Alice@mailserver.com"},
+            ],
+            site=request.site,
+        )
+    """
+    try:
+        domain = site.domain
+    except AttributeError:
+        domain = None
+
+    usernames = {query["username"] for query in queries if query.get("username")}
+    emails = {query["email"] for query in queries if query.get("email")}
+    users = list(User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))) if usernames or emails else []
+
+    site_user_ids = FetchUserSiteSources.filter_users_on_site(users, domain)
+    return match_user_queries(queries, users, site_user_ids, domain)
+
+
+def get_site_user_ids(user_ids, site=None):
+    """
+    Return the ids, among the given ones, of the users that belong to the site.
+
+    Examples:
+        >>> get_site_user_ids({1, 2, 3}, site=request.site)
+    """
+    try:
+        domain = site.domain
+    except AttributeError:
+        domain = None
+
+    users = list(User.objects.filter(id__in=user_ids)) if user_ids else []
+    return FetchUserSiteSources.filter_users_on_site(users, domain)
+
+
 def delete_edxapp_user(*args, **kwargs):
     """
     Deletes a user from the platform.
@@ -334,20 +379,13 @@ def get_course_team_user(*args, **kwargs):
     return None
 
 
-class FetchUserSiteSources:
+class FetchUserSiteSources(UserSiteSources):
     """
     Methods to make the comparison to check if an user belongs to a site plus the
     get_enabled_source_methods that just brings an array of functions enabled to do so
-    """
 
-    @classmethod
-    def get_enabled_source_methods(cls):
-        """ Brings the array of methods to check if an user belongs to a site. """
-        sources = configuration_helpers.get_value(
-            'EOX_CORE_USER_ORIGIN_SITE_SOURCES',
-            getattr(settings, 'EOX_CORE_USER_ORIGIN_SITE_SOURCES')
-        )
-        return [getattr(cls, source) for source in sources]
+    The checks of many users at once, their memo and cache are described in UserSiteSources.
+    """
 
     @staticmethod
     def fetch_from_created_on_site_prop(user, domain):
@@ -359,13 +397,34 @@ class FetchUserSiteSources:
     @staticmethod
     def fetch_from_user_signup_source(user, domain):
         """ Read the signup source. """
-        return len(UserSignupSource.objects.filter(user=user, site=domain)) > 0
+        return UserSignupSource.objects.filter(user=user, site=domain).exists()
 
     @staticmethod
     def fetch_from_unfiltered_table(user, site):
         """ Fetch option that does not take into account the multi-tentancy model of the installation. """
         return bool(user)
 
+    @staticmethod
+    def condition_fetch_from_created_on_site_prop(domain):
+        """ Condition on the users of fetch_from_created_on_site_prop. """
+        if not domain:
+            return None
+        return Q(Exists(UserAttribute.objects.filter(
+            user=OuterRef('pk'),
+            name='created_on_site',
+            value=domain,
+        )))
+
+    @staticmethod
+    def condition_fetch_from_user_signup_source(domain):
+        """ Condition on the users of fetch_from_user_signup_source. """
+        return Q(Exists(UserSignupSource.objects.filter(user=OuterRef('pk'), site=domain)))
+
+    @staticmethod
+    def condition_fetch_from_unfiltered_table(domain):
+        """ Condition of fetch_from_unfiltered_table, every user belongs to the site. """
+        return True
+
 
 def get_course_enrollment():
     """ get CourseEnrollment model """
@@ -2,16 +2,13 @@
 Courses definitions.
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_courses_accessible_to_user(*args, **kwargs):
     """ Gets the _courses_accessible_to_user function. """
 
-    backend_function = settings.EOX_CORE_COURSES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSES_BACKEND')
 
     return backend.courses_accessible_to_user(*args, **kwargs)
 
@@ -19,8 +16,7 @@ def get_courses_accessible_to_user(*args, **kwargs):
 def get_process_courses_list(*args, **kwargs):
     """ Gets the _process_courses_list function. """
 
-    backend_function = settings.EOX_CORE_COURSES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSES_BACKEND')
 
     return backend.get_process_courses_list(*args, **kwargs)
 
@@ -28,8 +24,7 @@ def get_process_courses_list(*args, **kwargs):
 def get_course_details_fields():
     """ Gets course details fields. """
 
-    backend_function = settings.EOX_CORE_COURSES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSES_BACKEND')
 
     return backend.get_course_details_fields()
 
@@ -37,8 +32,7 @@ def get_course_details_fields():
 def get_first_course_key():
     """ Gets the first course key string. """
 
-    backend_function = settings.EOX_CORE_COURSES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSES_BACKEND')
 
     return backend.get_first_course_key()
 
@@ -46,7 +40,6 @@ def get_first_course_key():
 def get_course_overview():
     """ Gets the course overview model from edxapp. """
 
-    backend_function = settings.EOX_CORE_COURSES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSES_BACKEND')
 
     return backend.get_course_overview()
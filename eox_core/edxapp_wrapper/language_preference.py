@@ -1,11 +1,8 @@
 """ Backend abstraction. """
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_language_preference_middleware(*args, **kwargs):
     """ Get LanguagePreferenceMiddleware. """
-    backend_function = settings.EOX_CORE_LANG_PREF_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_LANG_PREF_BACKEND')
     return backend.get_language_preference_middleware(*args, **kwargs)
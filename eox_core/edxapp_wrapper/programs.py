@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Programs public function definitions
+"""
+from eox_core.edxapp_wrapper.registry import get_backend
+
+
+def get_program(*args, **kwargs):
+    """
+    Get the details of a catalog program
+    """
+
+    backend = get_backend('EOX_CORE_PROGRAMS_BACKEND')
+
+    return backend.get_program(*args, **kwargs)
+
+
+def get_site_program_uuids(*args, **kwargs):
+    """
+    Get the uuids of the catalog programs of a site
+    """
+
+    backend = get_backend('EOX_CORE_PROGRAMS_BACKEND')
+
+    return backend.get_site_program_uuids(*args, **kwargs)
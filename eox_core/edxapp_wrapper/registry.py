@@ -0,0 +1,44 @@
+"""
+Registry of the edxapp backends used by the public wrapper functions.
+
+Every wrapper used to read its ``EOX_CORE_*_BACKEND`` setting and call
+``import_module`` on each invocation. The registry resolves each backend
+once and keeps the module until the setting that points to it changes.
+"""
+from importlib import import_module
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+_BACKENDS = {}
+
+
+def get_backend(setting_name):
+    """
+    Return the backend module configured in the setting `setting_name`.
+
+    The module is imported the first time it's requested, later calls
+    are served from the registry.
+    """
+    try:
+        return _BACKENDS[setting_name]
+    except KeyError:
+        backend = import_module(getattr(settings, setting_name))
+        _BACKENDS[setting_name] = backend
+        return backend
+
+
+def clear_backends():
+    """
+    Forget every resolved backend, they will be imported again on the next call.
+    """
+    _BACKENDS.clear()
+
+
+@receiver(setting_changed)
+def invalidate_backend(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the resolved backend when the setting pointing to it changes.
+    """
+    _BACKENDS.pop(setting, None)
@@ -0,0 +1,388 @@
+""" Tests for the helpers shared by the enrollment backends. """
+import datetime
+import threading
+from functools import partial
+from types import SimpleNamespace
+
+from crum import get_current_request, get_current_user, set_current_request
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from mock import MagicMock, patch
+from opaque_keys.edx.keys import CourseKey
+from pytz import utc
+from rest_framework.exceptions import NotFound
+
+from eox_core.models import UserSiteMembership
+from eox_core.utils import cache
+
+from ..backends.enrollment_common import (
+    EnrollmentValidator,
+    get_course_overviews,
+    get_preferred_course_run,
+    get_program_course_runs,
+    read_enrollments,
+    run_program_enrollments,
+)
+from ..users import get_site_user_ids
+
+YESTERDAY = datetime.datetime.now(utc) - datetime.timedelta(days=1)
+TOMORROW = datetime.datetime.now(utc) + datetime.timedelta(days=1)
+
+
+def course_overview(key, enrollment_start=None, enrollment_end=None):
+    """ Return a stand-in of the CourseOverview of a course run """
+    return SimpleNamespace(
+        id=CourseKey.from_string(key),
+        enrollment_start=enrollment_start,
+        enrollment_end=enrollment_end,
+    )
+
+
+def course_overview_model(stored, loaded=()):
+    """ Return a stand-in of the CourseOverview model with the `stored` rows and the `loaded` from the modulestore """
+    model = MagicMock()
+    model.objects.filter.return_value = stored
+    model.get_from_id.side_effect = {overview.id: overview for overview in loaded}.get
+    return model
+
+
+class RunProgramEnrollmentsTest(TransactionTestCase):
+    """ Tests for run_program_enrollments, outside of the transaction of TestCase """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        self.calls = []
+        self.request = RequestFactory().get('/')
+        self.user = User(username="staff")
+        self.request.user = self.user
+        set_current_request(self.request)
+        self.addCleanup(set_current_request, None)
+
+    def enroll(self, course_id, errors_list):
+        """ Record the thread and the crum request and user of the call """
+        self.calls.append((course_id, threading.get_ident(), get_current_request(), get_current_user()))
+        return {'course_id': course_id}, errors_list
+
+    def test_serial_enrollments(self):
+        """ The courses are enrolled in order in the calling thread """
+        outcomes = run_program_enrollments(self.enroll, ['course-a', 'course-b'], [[], ['invalid']])
+
+        self.assertEqual(outcomes, [({'course_id': 'course-a'}, []), ({'course_id': 'course-b'}, ['invalid'])])
+        self.assertEqual([call[:2] for call in self.calls], [
+            ('course-a', threading.get_ident()),
+            ('course-b', threading.get_ident()),
+        ])
+
+    def test_concurrent_enrollments_inside_a_transaction_are_serial(self):
+        """ The enrollments stay in the transaction of the caller """
+        with transaction.atomic():
+            run_program_enrollments(self.enroll, ['course-a', 'course-b'], [[], []], concurrent=True)
+
+        self.assertEqual({call[1] for call in self.calls}, {threading.get_ident()})
+
+    @patch('eox_core.edxapp_wrapper.backends.enrollment_common.connections')
+    def test_concurrent_enrollments(self, m_connections):
+        """ Outside of a transaction the courses are enrolled by worker threads with the crum request and user """
+        course_ids = ['course-a', 'course-b', 'course-c']
+
+        with self.settings(EOX_CORE_PROGRAM_ENROLLMENT_WORKERS=2):
+            outcomes = run_program_enrollments(self.enroll, course_ids, [[], [], []], concurrent=True)
+
+        self.assertEqual([result['course_id'] for result, _ in outcomes], course_ids)
+        self.assertNotIn(threading.get_ident(), {call[1] for call in self.calls})
+        for _, _, request, user in self.calls:
+            self.assertIs(request, self.request)
+            self.assertIs(user, self.user)
+        self.assertEqual(m_connections.close_all.call_count, 3)
+        self.assertIs(get_current_request(), self.request)
+
+
+class GetProgramCourseRunsTest(TestCase):
+    """ Tests for get_program_course_runs and the course overviews it reads """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.program = {
+            'courses': [
+                {'course_runs': [
+                    {'key': 'course-v1:org+a+1', 'start': '2020-01-01'},
+                    {'key': 'course-v1:org+a+2', 'start': '2021-01-01'},
+                ]},
+                {'course_runs': [{'key': 'course-v1:org+b+1', 'start': '2020-01-01'}]},
+            ],
+        }
+        self.model = course_overview_model(
+            [
+                course_overview('course-v1:org+a+1', enrollment_end=YESTERDAY),
+                course_overview('course-v1:org+a+2', enrollment_start=YESTERDAY),
+            ],
+            loaded=[course_overview('course-v1:org+b+1')],
+        )
+
+    @patch('eox_core.edxapp_wrapper.backends.enrollment_common.get_program')
+    def test_course_runs_are_cached(self, m_get_program):
+        """ The preferred runs are resolved once and then read from the cache """
+        m_get_program.return_value = self.program
+
+        first = get_program_course_runs('program-uuid', self.model)
+        second = get_program_course_runs('program-uuid', self.model)
+
+        self.assertEqual(first, ['course-v1:org+a+2', 'course-v1:org+b+1'])
+        self.assertEqual(second, first)
+        m_get_program.assert_called_once_with('program-uuid')
+        self.model.objects.filter.assert_called_once()
+
+    @patch('eox_core.edxapp_wrapper.backends.enrollment_common.get_program')
+    def test_programs_without_course_runs(self, m_get_program):
+        """ Programs without courses, or with courses without runs, are not found """
+        for program in ({'courses': []}, {'courses': [{'course_runs': []}]}):
+            m_get_program.return_value = program
+            with self.assertRaises(NotFound):
+                get_program_course_runs('program-uuid', self.model)
+
+        m_get_program.side_effect = KeyError('program-uuid')
+        with self.assertRaises(NotFound):
+            get_program_course_runs('program-uuid', self.model)
+
+    def test_course_overviews_are_read_with_one_query(self):
+        """ The stored overviews are read together and the missing ones are loaded one by one """
+        keys = ['course-v1:org+a+1', 'course-v1:org+a+2', 'course-v1:org+b+1']
+
+        course_overviews = get_course_overviews(keys, self.model)
+
+        self.assertEqual(sorted(course_overviews), keys)
+        self.model.objects.filter.assert_called_once_with(id__in=[CourseKey.from_string(key) for key in keys])
+        self.model.get_from_id.assert_called_once_with(CourseKey.from_string('course-v1:org+b+1'))
+
+    def test_preferred_course_run(self):
+        """ The first run open for enrollment is preferred, otherwise the last one to start """
+        closed = course_overview('course-v1:org+a+1', enrollment_end=YESTERDAY)
+        upcoming = course_overview('course-v1:org+a+2', enrollment_start=TOMORROW)
+        course = {'course_runs': [
+            {'key': 'course-v1:org+a+2', 'start': '2021-01-01'},
+            {'key': 'course-v1:org+a+1', 'start': '2020-01-01'},
+        ]}
+        course_overviews = {str(closed.id): closed, str(upcoming.id): upcoming}
+
+        self.assertEqual(get_preferred_course_run(course, course_overviews)['key'], 'course-v1:org+a+2')
+
+        closed.enrollment_end = None
+        self.assertEqual(get_preferred_course_run(course, course_overviews)['key'], 'course-v1:org+a+1')
+
+
+def enrollment_row(enrollment_id, attribute=None, user_id=1, username='john'):
+    """ Return a row of an enrollment joined to one of its attributes """
+    namespace, name, value = attribute or (None, None, None)
+    return {
+        'id': enrollment_id,
+        'user_id': user_id,
+        'user__username': username,
+        'course_id': CourseKey.from_string(f'course-v1:org+course+{enrollment_id}'),
+        'mode': 'audit',
+        'is_active': True,
+        'created': YESTERDAY,
+        'attributes__namespace': namespace,
+        'attributes__name': name,
+        'attributes__value': value,
+    }
+
+
+class FakeEnrollments:
+    """ Stand-in of a CourseEnrollment queryset, over the rows of the enrollments joined to their attributes """
+
+    def __init__(self, rows, queries):
+        self.rows = rows
+        self.queries = queries
+
+    def filter(self, id__gt=None, id__in=None):
+        """ Filter the rows by the id of the enrollments """
+        return FakeEnrollments([
+            row for row in self.rows
+            if (id__gt is None or row['id'] > id__gt) and (id__in is None or row['id'] in id__in)
+        ], self.queries)
+
+    def order_by(self, field):
+        """ Sort the rows """
+        return FakeEnrollments(sorted(self.rows, key=lambda row: row[field]), self.queries)
+
+    def values_list(self, *fields, flat=False):
+        """ Read columns of the enrollments, without the join with their attributes """
+        self.queries.append(('values_list',) + fields)
+        if flat:
+            return list(dict.fromkeys(row[fields[0]] for row in self.rows))
+        return list(dict.fromkeys(tuple(row[field] for field in fields) for row in self.rows))
+
+    def values(self, *fields):
+        """ Read the joined rows """
+        self.queries.append(('values',) + fields)
+        return [{field: row[field] for field in fields} for row in self.rows]
+
+
+class ReadEnrollmentsTest(TestCase):
+    """ Tests for read_enrollments """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        self.queries = []
+        self.enrollments = FakeEnrollments([
+            enrollment_row(3),
+            enrollment_row(1, ('credit', 'provider_id', 'hogwarts')),
+            enrollment_row(1, ('credit', 'grade', '90')),
+            enrollment_row(2, ('credit', 'provider_id', 'beauxbatons')),
+            enrollment_row(2, ('credit', 'grade', '80')),
+            enrollment_row(2, ('credit', 'year', '2020')),
+        ], self.queries)
+
+    def test_attributes_are_grouped_by_enrollment(self):
+        """ The attributes of several rows are grouped in their enrollment, sorted by id, with one query """
+        enrollments = read_enrollments(self.enrollments)
+
+        self.assertEqual([enrollment['id'] for enrollment in enrollments], [1, 2, 3])
+        self.assertEqual(enrollments[0], {
+            'id': 1,
+            'user': 'john',
+            'course_id': 'course-v1:org+course+1',
+            'mode': 'audit',
+            'is_active': True,
+            'created': YESTERDAY,
+            'enrollment_attributes': [
+                {'namespace': 'credit', 'name': 'provider_id', 'value': 'hogwarts'},
+                {'namespace': 'credit', 'name': 'grade', 'value': '90'},
+            ],
+        })
+        self.assertEqual(len(enrollments[1]['enrollment_attributes']), 3)
+        self.assertEqual(enrollments[2]['enrollment_attributes'], [])
+        self.assertEqual(len(self.queries), 1)
+
+    def test_without_attributes(self):
+        """ The attributes are not read when they're not included """
+        enrollments = read_enrollments(self.enrollments, include_attributes=False)
+
+        self.assertEqual([enrollment['enrollment_attributes'] for enrollment in enrollments], [[], [], []])
+        self.assertNotIn('attributes__name', self.queries[0])
+
+    def test_page_keeps_every_attribute(self):
+        """ A page is cut by enrollments, not by joined rows, so its last enrollment keeps all its attributes """
+        enrollments = read_enrollments(self.enrollments, after_id=1, limit=1)
+
+        self.assertEqual([enrollment['id'] for enrollment in enrollments], [2])
+        self.assertEqual(len(enrollments[0]['enrollment_attributes']), 3)
+        self.assertEqual([query[0] for query in self.queries], ['values_list', 'values'])
+
+
+class ReadSiteEnrollmentsTest(TestCase):
+    """ Tests for read_enrollments restricted to the users of a site """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        self.queries = []
+        self.member = User.objects.create(username="member")
+        self.stranger = User.objects.create(username="stranger")
+        UserSiteMembership.objects.create(  # pylint: disable=no-member
+            user=self.member, site_domain="site.example.com", source=UserSiteMembership.SIGNUP_SOURCE,
+        )
+        UserSiteMembership.objects.create(  # pylint: disable=no-member
+            user=self.stranger, site_domain="other.example.com", source=UserSiteMembership.SIGNUP_SOURCE,
+        )
+        self.enrollments = FakeEnrollments([
+            enrollment_row(1, user_id=self.stranger.id, username="stranger"),
+            enrollment_row(2, user_id=self.member.id, username="member"),
+            enrollment_row(3, user_id=self.stranger.id, username="stranger"),
+            enrollment_row(4, user_id=self.stranger.id, username="stranger"),
+            enrollment_row(5, user_id=self.member.id, username="member"),
+            enrollment_row(6, user_id=self.member.id, username="member"),
+        ], self.queries)
+
+    def read_site_enrollments(self, domain, **kwargs):
+        """ Read the enrollments of the users of the site with the domain """
+        site_user_filter = partial(get_site_user_ids, site=SimpleNamespace(domain=domain))
+        return read_enrollments(self.enrollments, site_user_filter=site_user_filter, **kwargs)
+
+    def test_users_of_other_sites_are_excluded(self):
+        """ The enrollments of a course only include the users of each site """
+        member_enrollments = self.read_site_enrollments("site.example.com")
+        stranger_enrollments = self.read_site_enrollments("other.example.com")
+
+        self.assertEqual([enrollment['id'] for enrollment in member_enrollments], [2, 5, 6])
+        self.assertEqual({enrollment['user'] for enrollment in member_enrollments}, {"member"})
+        self.assertEqual([enrollment['id'] for enrollment in stranger_enrollments], [1, 3, 4])
+
+    def test_pages_are_filled_with_the_users_of_the_site(self):
+        """ The enrollments of other sites are skipped without shortening the page """
+        first_page = self.read_site_enrollments("site.example.com", limit=2)
+        last_page = self.read_site_enrollments("site.example.com", after_id=5, limit=2)
+
+        self.assertEqual([enrollment['id'] for enrollment in first_page], [2, 5])
+        self.assertEqual([enrollment['id'] for enrollment in last_page], [6])
+
+
+class StubEnrollmentValidator(EnrollmentValidator):
+    """ Validator with the modes of a stub platform, which records the courses it validates """
+
+    ALL_MODES = ('audit', 'verified')
+
+    def __init__(self):
+        super().__init__()
+        self.validated = []
+
+    def validate_course_mode(self, course_id, mode, is_active):
+        """ Only the audit mode is available in the courses """
+        self.validated.append((course_id, mode, is_active))
+        return [] if mode == 'audit' else ['Mode not found']
+
+
+@patch('eox_core.edxapp_wrapper.backends.enrollment_common.validate_org', return_value=True)
+@patch('eox_core.edxapp_wrapper.backends.enrollment_common.check_edxapp_account_conflicts', return_value=True)
+class EnrollmentValidatorTest(TestCase):
+    """ Tests for EnrollmentValidator """
+
+    def test_shared_checks_are_made_once(self, m_check_account, m_validate_org):
+        """ The account of a user and a course and mode shared by several queries are checked once """
+        validator = StubEnrollmentValidator()
+        queries = [
+            {'username': 'john', 'course_id': 'course-v1:org+a+1', 'mode': 'audit'},
+            {'username': 'john', 'course_id': 'course-v1:org+a+1', 'mode': 'audit'},
+            {'username': 'john', 'course_id': 'course-v1:org+b+1', 'mode': 'verified'},
+        ]
+
+        errors = [validator.check(query) for query in queries]
+
+        self.assertEqual(errors, [[], [], ['Mode not found']])
+        m_check_account.assert_called_once_with(email=None, username='john')
+        self.assertEqual(m_validate_org.call_count, 2)
+        self.assertEqual(validator.validated, [('course-v1:org+a+1', 'audit', True), ('course-v1:org+b+1', 'verified', True)])
+
+    def test_invalid_queries(self, m_check_account, m_validate_org):
+        """ The queries are rejected before the course is validated """
+        validator = StubEnrollmentValidator()
+
+        self.assertEqual(validator.check({'username': 'john', 'mode': 'audit'}), [
+            'You have to provide a course_id or bundle_id',
+        ])
+        self.assertEqual(validator.check({'course_id': 'course-v1:org+a+1', 'mode': 'audit'}), ['Email or username needed'])
+        self.assertEqual(validator.check({'username': 'john', 'course_id': 'course-v1:org+a+1', 'mode': 'honor'}), [
+            'Invalid mode given:honor',
+        ])
+        m_check_account.return_value = False
+        self.assertEqual(validator.check({'username': 'jane', 'course_id': 'course-v1:org+a+1', 'mode': 'audit'}), [
+            'User not found',
+        ])
+        m_validate_org.assert_not_called()
+        self.assertEqual(validator.validated, [])
+
+    def test_forced_enrollments_only_check_the_org(self, _, m_validate_org):
+        """ The mode of the forced enrollments is not validated, their org is """
+        validator = StubEnrollmentValidator()
+        m_validate_org.return_value = False
+
+        errors = validator.check({'username': 'john', 'course_id': 'course-v1:org+a+1', 'mode': 'verified', 'force': True})
+
+        self.assertEqual(errors, ['Enrollment not allowed for given org'])
+        self.assertEqual(validator.validated, [])
@@ -5,20 +5,27 @@ import mock
 from django.conf import settings
 from django.test import TestCase
 
-from ..enrollments import create_enrollment
+from ..enrollments import create_enrollment, get_enrollments
+from ..registry import clear_backends
 
 
 class CreateEdxappUserTest(TestCase):
     """ Tests for the public API module """
 
-    @mock.patch('eox_core.edxapp_wrapper.enrollments.import_module')
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_import_the_backend(self, m_import):
         """ Test we import the correct backend defined in the settings """
 
         create_enrollment()
         m_import.assert_called_with(settings.EOX_CORE_ENROLLMENT_BACKEND)
 
-    @mock.patch('eox_core.edxapp_wrapper.enrollments.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_call_the_backend(self, m_import):
         """ Test we use the imported backend """
         m_enrollment_backend = mock.MagicMock()
@@ -31,3 +38,15 @@ class CreateEdxappUserTest(TestCase):
 
         create_enrollment(data)
         m_enrollment_backend.create_enrollment.assert_called_with(data)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_get_enrollments(self, m_import):
+        """ Test the bulk enrollments read is sent to the backend """
+        m_enrollment_backend = mock.MagicMock()
+        m_import.return_value = m_enrollment_backend
+
+        get_enrollments(course_id="course-v1:org+course+run", include_attributes=False)
+        m_enrollment_backend.get_enrollments.assert_called_with(
+            course_id="course-v1:org+course+run",
+            include_attributes=False,
+        )
@@ -10,6 +10,7 @@ from django.conf import settings
 from django.test import TestCase
 
 from ..pre_enrollments import create_pre_enrollment, delete_pre_enrollment, get_pre_enrollment, update_pre_enrollment
+from ..registry import clear_backends
 
 
 class PreEnrollmentTest(TestCase):
@@ -18,20 +19,22 @@ class PreEnrollmentTest(TestCase):
     def setUp(self):
         """ setup """
         super().setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
         self.m_params = {
             'email': 'test@example.com',
             'course_id': 'course-v1:org+course+run',
             'auto_enroll': True,
         }
 
-    @mock.patch('eox_core.edxapp_wrapper.pre_enrollments.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_import_the_backend(self, m_import):
         """ Test we import the correct backend defined in the settings """
 
         create_pre_enrollment()
         m_import.assert_called_with(settings.EOX_CORE_PRE_ENROLLMENT_BACKEND)
 
-    @mock.patch('eox_core.edxapp_wrapper.pre_enrollments.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_call_the_backend(self, m_import):
         """ Test we use the imported backend """
         m_pre_enrollment_backend = mock.MagicMock()
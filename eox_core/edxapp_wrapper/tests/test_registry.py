@@ -0,0 +1,48 @@
+""" Tests for the backends registry. """
+import mock
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from ..registry import clear_backends, get_backend
+
+
+class BackendRegistryTest(TestCase):
+    """ Tests the memoization of the backends resolved by the registry """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_backend_is_imported_once(self, m_import):
+        """ Test the backend module is resolved only on the first call """
+        first = get_backend('EOX_CORE_USERS_BACKEND')
+        second = get_backend('EOX_CORE_USERS_BACKEND')
+
+        m_import.assert_called_once_with(settings.EOX_CORE_USERS_BACKEND)
+        self.assertIs(first, second)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_setting_changed_invalidates_backend(self, m_import):
+        """ Test the backend is resolved again when its setting changes """
+        get_backend('EOX_CORE_USERS_BACKEND')
+
+        with override_settings(EOX_CORE_USERS_BACKEND='path.to.other_backend'):
+            get_backend('EOX_CORE_USERS_BACKEND')
+            m_import.assert_called_with('path.to.other_backend')
+
+        get_backend('EOX_CORE_USERS_BACKEND')
+        m_import.assert_called_with(settings.EOX_CORE_USERS_BACKEND)
+        self.assertEqual(m_import.call_count, 3)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_unrelated_setting_keeps_backend(self, m_import):
+        """ Test changing another setting does not drop the resolved backend """
+        get_backend('EOX_CORE_USERS_BACKEND')
+
+        with override_settings(EOX_CORE_ENROLLMENT_BACKEND='path.to.other_backend'):
+            get_backend('EOX_CORE_USERS_BACKEND')
+
+        m_import.assert_called_once_with(settings.EOX_CORE_USERS_BACKEND)
@@ -5,20 +5,27 @@ import mock
 from django.conf import settings
 from django.test import TestCase
 
-from ..users import create_edxapp_user
+from ..registry import clear_backends
+from ..users import create_edxapp_user, get_edxapp_users
 
 
 class CreateEdxappUserTest(TestCase):
     """ Tests for the public API module """
 
-    @mock.patch('eox_core.edxapp_wrapper.users.import_module')
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_import_the_backend(self, m_import):
         """ Test we import the correct backend defined in the settings """
 
         create_edxapp_user()
         m_import.assert_called_with(settings.EOX_CORE_USERS_BACKEND)
 
-    @mock.patch('eox_core.edxapp_wrapper.users.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_call_the_backend(self, m_import):
         """ Test we use the imported backend """
         m_user_backend = mock.MagicMock()
@@ -31,3 +38,15 @@ class CreateEdxappUserTest(TestCase):
 
         create_edxapp_user(data)
         m_user_backend.create_edxapp_user.assert_called_with(data)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_get_users_calls_the_backend(self, m_import):
+        """ Test the batch user lookup is delegated to the backend """
+        m_user_backend = mock.MagicMock()
+        m_import.return_value = m_user_backend
+        queries = [{"username": "something"}, {"email": "something@example.com"}]
+
+        users = get_edxapp_users(queries, site=None)
+
+        m_user_backend.get_edxapp_users.assert_called_with(queries, site=None)
+        self.assertEqual(users, m_user_backend.get_edxapp_users.return_value)
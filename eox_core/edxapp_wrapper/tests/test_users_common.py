@@ -0,0 +1,187 @@
+""" Tests for the helpers shared by the users backends. """
+from types import SimpleNamespace
+
+from crum import set_current_request
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.test import RequestFactory, TestCase, override_settings
+from mock import patch
+from rest_framework.exceptions import NotFound, ValidationError
+
+from eox_core.models import UserSiteMembership
+from eox_core.signals import update_signup_source_membership
+
+from ..backends.users_common import UserSiteSources, match_user_queries
+
+
+class MatchUserQueriesTest(TestCase):
+    """ Tests for match_user_queries """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        self.bob = User(id=1, username="Bob", email="bob@example.com")
+        self.lower_bob = User(id=2, username="bob", email="other.bob@example.com")
+        self.alice = User(id=3, username="alice", email="shared@example.com")
+        self.carol = User(id=4, username="carol", email="Shared@example.com")
+        self.users = [self.bob, self.lower_bob, self.alice, self.carol]
+
+    def match(self, queries, site_user_ids=None):
+        """ Match the queries against the test users, all of them on the site by default """
+        if site_user_ids is None:
+            site_user_ids = {user.id for user in self.users}
+        return match_user_queries(queries, self.users, site_user_ids, "example.com")
+
+    def test_match_by_username_and_email(self):
+        """ The users are found by username, by email or by both, ignoring the case """
+        results = self.match([
+            {"username": "alice"},
+            {"email": "BOB@example.com"},
+            {"username": "alice", "email": "SHARED@example.com"},
+        ])
+
+        self.assertEqual(results, [self.alice, self.bob, self.alice])
+
+    def test_not_found(self):
+        """ Unknown users, users of other sites and mismatched emails are not found """
+        results = self.match(
+            [{"username": "dave"}, {"username": "alice"}, {"username": "carol", "email": "bob@example.com"}],
+            site_user_ids={1, 2, 4},
+        )
+
+        for result in results:
+            self.assertIsInstance(result, NotFound)
+
+    def test_usernames_differing_by_case(self):
+        """ The exact username is preferred, an ambiguous one is reported """
+        results = self.match([{"username": "Bob"}, {"username": "bob"}, {"username": "BOB"}])
+
+        self.assertEqual(results[:2], [self.bob, self.lower_bob])
+        self.assertIsInstance(results[2], ValidationError)
+        self.assertIn("Multiple users found", str(results[2].detail))
+
+    def test_duplicated_emails(self):
+        """ An email shared by several users of the site is reported instead of picking one of them """
+        results = self.match([{"email": "SHARED@example.com"}, {"email": "shared@example.com"}])
+
+        self.assertIsInstance(results[0], ValidationError)
+        self.assertEqual(results[1], self.alice)
+
+    def test_duplicated_emails_on_other_sites(self):
+        """ The users of other sites don't make an email ambiguous """
+        results = self.match([{"email": "SHARED@example.com"}], site_user_ids={4})
+
+        self.assertEqual(results, [self.carol])
+
+
+class IndexSiteSources(UserSiteSources):
+    """ Sources of the tests, read from the membership index and the usernames """
+
+    @staticmethod
+    def condition_fetch_from_signup_index(domain):
+        """ Condition on the users with an indexed signup source """
+        return Q(Exists(UserSiteMembership.objects.filter(  # pylint: disable=no-member
+            user=OuterRef('pk'),
+            site_domain=domain,
+            source=UserSiteMembership.SIGNUP_SOURCE,
+        )))
+
+    @staticmethod
+    def condition_fetch_from_created_index(domain):
+        """ Condition on the users with an indexed created_on_site attribute """
+        return Q(Exists(UserSiteMembership.objects.filter(  # pylint: disable=no-member
+            user=OuterRef('pk'),
+            site_domain=domain,
+            source=UserSiteMembership.CREATED_ON_SITE,
+        )))
+
+    @staticmethod
+    def fetch_from_username(user, domain):
+        """ Source without a condition, checked user by user """
+        return domain.startswith(user.username)
+
+
+@override_settings(EOX_CORE_USER_ORIGIN_SITE_SOURCES=[])
+@patch('eox_core.edxapp_wrapper.backends.users_common.get_configuration_helper')
+class UserSiteSourcesTest(TestCase):
+    """ Tests for UserSiteSources """
+
+    def setUp(self):
+        """ setup """
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.signup = User.objects.create(username="signup", email="signup@example.com")
+        self.created = User.objects.create(username="created", email="created@example.com")
+        self.other = User.objects.create(username="other", email="other@example.com")
+        self.site = User.objects.create(username="site", email="site@example.com")
+        self.users = [self.signup, self.created, self.other, self.site]
+        UserSiteMembership.sync_user(self.signup.id, UserSiteMembership.SIGNUP_SOURCE, ["site.example.com"])
+        UserSiteMembership.sync_user(self.created.id, UserSiteMembership.CREATED_ON_SITE, ["site.example.com"])
+        UserSiteMembership.sync_user(self.other.id, UserSiteMembership.SIGNUP_SOURCE, ["other.example.com"])
+
+    @staticmethod
+    def enable_sources(m_helper, sources):
+        """ Enable the sources in the configuration of the site """
+        m_helper.return_value.get_value.return_value = sources
+
+    def test_conditions_are_combined_in_one_query(self, m_helper):
+        """ The sources with a condition are checked for all the users with a single query """
+        self.enable_sources(m_helper, ['fetch_from_signup_index', 'fetch_from_created_index'])
+
+        with self.assertNumQueries(1):
+            site_user_ids = IndexSiteSources.filter_users_on_site(self.users, "site.example.com")
+
+        self.assertEqual(site_user_ids, {self.signup.id, self.created.id})
+
+    def test_sources_without_condition(self, m_helper):
+        """ The sources without a condition are checked for the users not found by the query """
+        self.enable_sources(m_helper, ['fetch_from_signup_index', 'fetch_from_username'])
+
+        site_user_ids = IndexSiteSources.filter_users_on_site(self.users, "site.example.com")
+
+        self.assertEqual(site_user_ids, {self.signup.id, self.site.id})
+
+    def test_checks_are_memoized_for_the_request(self, m_helper):
+        """ The positive and negative checks are not repeated in the same request """
+        self.enable_sources(m_helper, ['fetch_from_signup_index'])
+        set_current_request(RequestFactory().get('/'))
+        self.addCleanup(set_current_request, None)
+
+        IndexSiteSources.filter_users_on_site(self.users, "site.example.com")
+        with self.assertNumQueries(0):
+            site_user_ids = IndexSiteSources.filter_users_on_site(self.users, "site.example.com")
+
+        self.assertEqual(site_user_ids, {self.signup.id})
+
+    @override_settings(EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL=60)
+    def test_positive_checks_are_cached(self, m_helper):
+        """ The members are read from the shared cache, the rest of the users are checked again """
+        self.enable_sources(m_helper, ['fetch_from_signup_index'])
+        IndexSiteSources.filter_users_on_site(self.users, "site.example.com")
+        IndexSiteSources.filter_users_on_site([self.other], "other.example.com")
+
+        with self.assertNumQueries(0):
+            site_user_ids = IndexSiteSources.filter_users_on_site([self.signup], "site.example.com")
+        with self.assertNumQueries(1):
+            IndexSiteSources.filter_users_on_site([self.signup, self.other], "site.example.com")
+
+        self.assertEqual(site_user_ids, {self.signup.id})
+        self.assertEqual(IndexSiteSources.filter_users_on_site([self.other], "other.example.com"), {self.other.id})
+
+    @override_settings(EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL=60)
+    def test_removed_sources_evict_the_cached_memberships(self, m_helper):
+        """ The change of a source of the user evicts its cached memberships once committed """
+        self.enable_sources(m_helper, ['fetch_from_signup_index'])
+        set_current_request(RequestFactory().get('/'))
+        self.addCleanup(set_current_request, None)
+        self.assertTrue(IndexSiteSources.user_belongs_to_site(self.signup, "site.example.com"))
+
+        # Outside of the platform there are no signup sources, so the index entries are removed
+        with self.captureOnCommitCallbacks(execute=True):
+            update_signup_source_membership(sender=None, instance=SimpleNamespace(user_id=self.signup.id))
+
+        self.assertFalse(IndexSiteSources.user_belongs_to_site(self.signup, "site.example.com"))
+        set_current_request(None)
+        self.assertFalse(IndexSiteSources.user_belongs_to_site(self.signup, "site.example.com"))
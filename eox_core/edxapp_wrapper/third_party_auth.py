@@ -2,13 +2,10 @@
 Third Party Auth Exception Middleware definitions.
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_tpa_exception_middleware():
     """Get the ExceptionMiddleware class."""
-    backend_function = settings.EOX_CORE_THIRD_PARTY_AUTH_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_THIRD_PARTY_AUTH_BACKEND')
     return backend.get_tpa_exception_middleware()
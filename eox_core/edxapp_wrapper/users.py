@@ -4,25 +4,37 @@
 Users public function definitions
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_edxapp_user(*args, **kwargs):
     """ Creates the edxapp user """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_edxapp_user(*args, **kwargs)
 
 
+def get_edxapp_users(*args, **kwargs):
+    """ Gets the edxapp users of a list of queries """
+
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
+
+    return backend.get_edxapp_users(*args, **kwargs)
+
+
+def get_site_user_ids(*args, **kwargs):
+    """ Gets the ids of the users that belong to a site """
+
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
+
+    return backend.get_site_user_ids(*args, **kwargs)
+
+
 def create_edxapp_user(*args, **kwargs):
     """ Creates the edxapp user """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.create_edxapp_user(*args, **kwargs)
 
@@ -30,8 +42,7 @@ def create_edxapp_user(*args, **kwargs):
 def delete_edxapp_user(*args, **kwargs):
     """ Deletes the edxapp user """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.delete_edxapp_user(*args, **kwargs)
 
@@ -39,8 +50,7 @@ def delete_edxapp_user(*args, **kwargs):
 def get_user_read_only_serializer(*args, **kwargs):
     """ Gets the Open edX model UserProfile """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_read_only_serializer(*args, **kwargs)
 
@@ -48,8 +58,7 @@ def get_user_read_only_serializer(*args, **kwargs):
 def check_edxapp_account_conflicts(*args, **kwargs):
     """ Checks the db for accounts with the same email or password """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.check_edxapp_account_conflicts(*args, **kwargs)
 
@@ -57,8 +66,7 @@ def check_edxapp_account_conflicts(*args, **kwargs):
 def get_course_enrollment():
     """ Gets the CourseEnrollment model """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_course_enrollment()
 
@@ -66,8 +74,7 @@ def get_course_enrollment():
 def get_course_team_user(*args, **kwargs):
     """ Gets the course_team_user function """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_course_team_user(*args, **kwargs)
 
@@ -75,8 +82,7 @@ def get_course_team_user(*args, **kwargs):
 def get_user_signup_source():
     """ Gets the UserSignupSource model """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_signup_source()
 
@@ -84,16 +90,14 @@ def get_user_signup_source():
 def get_user_profile():
     """ Gets the UserProfile model """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_profile()
 
 
 def get_username_max_length():
     """ Gets max length allowed for the username"""
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
     return backend.USERNAME_MAX_LENGTH
 
 
@@ -102,14 +106,12 @@ def generate_password(*args, **kwargs):
     Runs the generate_password funcion of edx-platform used to generate
      a random password.
     """
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
     return backend.generate_password(*args, **kwargs)
 
 
 def get_user_attribute():
     """ Gets the UserAttribute model """
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_attribute()
@@ -0,0 +1,76 @@
+"""
+Report the database indexes behind the text filters of the data API.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django_filters.utils import get_model_field  # pylint: disable=import-error
+
+from eox_core.api.data.v1.filters import (
+    CourseEnrollmentFilter,
+    GeneratedCerticatesFilter,
+    MatchModeFilter,
+    ProctoredExamStudentAttemptFilter,
+    UserFilter,
+)
+
+DATA_API_FILTERS = (
+    UserFilter,
+    CourseEnrollmentFilter,
+    GeneratedCerticatesFilter,
+    ProctoredExamStudentAttemptFilter,
+)
+
+
+class Command(BaseCommand):
+    """
+    List the column of every match mode filter of the data API and whether an index of
+    the database starts with it, so the `exact` and `prefix` matches don't scan the table.
+    """
+    help = "Check the database indexes of the columns filtered by the data API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail when a filtered column has no index.",
+        )
+
+    def handle(self, *args, **options):
+        constraints = {}
+        missing = []
+
+        with connection.cursor() as cursor:
+            for filterset in DATA_API_FILTERS:
+                for name, data_filter in filterset.base_filters.items():  # pylint: disable=no-member
+                    if not isinstance(data_filter, MatchModeFilter):
+                        continue
+
+                    label = f"{filterset.__name__}.{name}"
+                    field_name = data_filter.field_name
+                    if data_filter.method == "filter_site":
+                        field_name = filterset.get_site_field_name()
+
+                    field = get_model_field(filterset._meta.model, field_name)  # pylint: disable=no-member,protected-access
+                    if field is None or not hasattr(field, "column"):
+                        self.stdout.write(f"{label}: {field_name} is not available")
+                        continue
+
+                    table = field.model._meta.db_table  # pylint: disable=protected-access
+                    if table not in constraints:
+                        constraints[table] = connection.introspection.get_constraints(cursor, table)
+
+                    indexed = any(
+                        constraint["columns"] and constraint["columns"][0] == field.column
+                        for constraint in constraints[table].values()
+                        if constraint["index"] or constraint["unique"] or constraint["primary_key"]
+                    )
+                    if not indexed:
+                        missing.append(label)
+                    self.stdout.write(
+                        f"{label}: {table}.{field.column} {'indexed' if indexed else 'NOT INDEXED'}, "
+                        f"{data_filter.extra['default_match']} match by default"
+                    )
+
+        self.stdout.write(f"{len(missing)} filtered columns without an index.")
+        if missing and options["strict"]:
+            raise CommandError(f"Filters without an index: {', '.join(missing)}")
@@ -0,0 +1,62 @@
+"""
+Rebuild the eox-core site membership index from the platform models.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from eox_core.models import UserSiteMembership
+from eox_core.signals import get_source_memberships
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Compare the memberships of every source with the index, by ranges of user ids,
+    adding the missing ones and removing the stale ones.
+
+    The signals keep the index up to date afterwards, but the platform writes that skip
+    them, like bulk updates or raw queries, are only picked up by running this again.
+    """
+    help = "Rebuild the eox-core site membership index from the UserAttribute and UserSignupSource models."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of user ids compared on each step.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_user_id = User.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+
+        added = removed = 0
+        for source, _ in UserSiteMembership.SOURCES:
+            for first_id in range(0, last_user_id + 1, batch_size):
+                last_id = first_id + batch_size - 1
+                expected = get_source_memberships(source, first_id, last_id)
+                indexed = {
+                    (user_id, domain): membership_id
+                    for membership_id, user_id, domain in UserSiteMembership.objects.filter(  # pylint: disable=no-member
+                        source=source,
+                        user_id__gte=first_id,
+                        user_id__lte=last_id,
+                    ).values_list("id", "user_id", "site_domain")
+                }
+
+                stale_ids = [membership_id for key, membership_id in indexed.items() if key not in expected]
+                if stale_ids:
+                    removed += UserSiteMembership.objects.filter(id__in=stale_ids).delete()[0]  # pylint: disable=no-member
+
+                missing = expected - set(indexed)
+                UserSiteMembership.objects.bulk_create(  # pylint: disable=no-member
+                    [UserSiteMembership(user_id=user_id, site_domain=domain, source=source)
+                     for user_id, domain in missing],
+                    ignore_conflicts=True,
+                )
+                added += len(missing)
+
+        self.stdout.write(f"Added {added} site memberships, removed {removed}.")
@@ -0,0 +1,54 @@
+"""
+Preload the catalog programs of the sites into the eox-core programs cache.
+"""
+import logging
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+
+from eox_core.edxapp_wrapper.programs import get_program, get_site_program_uuids
+
+LOG = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Fetch every program of a site from the catalog service and store it in the programs cache,
+    so the bundle enrollments don't wait for the catalog service.
+
+    The programs of a site are the ones listed by the platform `cache_programs` command.
+    """
+    help = "Preload the catalog programs of a site, or of every site, into the eox-core programs cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--domain",
+            dest="domains",
+            action="append",
+            default=[],
+            help="Domain of a site to warm up, can be repeated. All the sites are warmed up by default.",
+        )
+
+    def handle(self, *args, **options):
+        sites = Site.objects.all()
+        if options["domains"]:
+            sites = sites.filter(domain__in=options["domains"])
+            missing = set(options["domains"]) - set(sites.values_list("domain", flat=True))
+            if missing:
+                raise CommandError(f"Sites not found: {', '.join(sorted(missing))}")
+
+        loaded = set()
+        failed = 0
+        for site in sites:
+            for program_uuid in get_site_program_uuids(site):
+                if program_uuid in loaded:
+                    continue
+                try:
+                    get_program(program_uuid, ignore_cache=True)
+                except Exception:  # pylint: disable=broad-except
+                    failed += 1
+                    LOG.exception("Error loading the program %s of the site %s", program_uuid, site.domain)
+                    continue
+                loaded.add(program_uuid)
+
+        self.stdout.write(f"Loaded {len(loaded)} programs, {failed} failed.")
@@ -14,8 +14,8 @@ import six
 from django.conf import settings
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.contrib.auth.views import redirect_to_login
-from django.db import IntegrityError
-from django.db.models.signals import post_save
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.http import Http404, HttpResponseRedirect, parse_cookie
 from django.urls import reverse
@@ -27,7 +27,7 @@ from eox_core.edxapp_wrapper.configuration_helpers import get_configuration_help
 from eox_core.edxapp_wrapper.language_preference import get_language_preference_middleware
 from eox_core.edxapp_wrapper.third_party_auth import get_tpa_exception_middleware
 from eox_core.models import Redirection
-from eox_core.utils import cache, fasthash
+from eox_core.utils import CacheVersion, LocalLRUCache, cache, fasthash
 
 LOG = logging.getLogger(__name__)
 
@@ -46,6 +46,240 @@ ExceptionMiddleware = get_tpa_exception_middleware()
 LanguagePreferenceMiddleware = get_language_preference_middleware()
 
 
+REDIRECT_TABLES_MAX_SIZE = 1024
+_redirect_tables = {}
+
+
+class PathRedirectTable:
+    """
+    Compiled form of the EDNX_CUSTOM_PATH_REDIRECTS setting of a site.
+
+    All the regexes are combined in a single alternation so a path is tested
+    in one pass. Since alternatives are tried from left to right, the first
+    configured regex that matches wins, as it did when they were tested one
+    at a time. Paths without regex syntax are also kept in a dict, so a request
+    to one of them skips the regex engine altogether.
+    """
+
+    REGEX_SYNTAX = frozenset('.^$*+?{}[]\\|()')
+    GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+    NUMBERED_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?\([1-9]")
+
+    def __init__(self, redirects):
+        """
+        Compile the redirects, a dict of {regex: action or {action: target}}.
+        """
+        self.routes = []
+        patterns = []
+
+        for index, (regex, values) in enumerate(six.iteritems(redirects)):
+            key = next(iter(values)) if isinstance(values, dict) else values
+            pattern = regex.format(
+                COURSE_ID_PATTERN=settings.COURSE_ID_PATTERN,
+                USERNAME_PATTERN=settings.USERNAME_PATTERN,
+            )
+            self.routes.append((key, values, re.compile(pattern)))
+            patterns.append(self._scope_groups(index, pattern))
+
+        # Patterns that can't be combined are tested one at a time: global inline flags
+        # would apply to every alternative (older Pythons only warn about them) and
+        # numbered group references would point to other groups once wrapped.
+        self.matcher = None
+        if not any(
+            self.GLOBAL_FLAGS.search(pattern) or self.NUMBERED_GROUP_REFERENCE.search(pattern)
+            for pattern in patterns
+        ):
+            self.matcher = re.compile("|".join(patterns))
+
+        self.exact_routes = {}
+        for regex, _ in six.iteritems(redirects):
+            if regex not in self.exact_routes and not self.REGEX_SYNTAX.intersection(regex):
+                self.exact_routes[regex] = self._match(regex)
+
+    @staticmethod
+    def _scope_groups(index, pattern):
+        """
+        Wrap a pattern in a group named after its position and prefix its own
+        named groups, so patterns sharing group names (e.g. COURSE_ID_PATTERN)
+        can be part of the same alternation.
+        """
+        pattern = re.sub(r"\(\?P<(\w+)>", rf"(?P<route{index}_\1>", pattern)
+        pattern = re.sub(r"\(\?P=(\w+)\)", rf"(?P=route{index}_\1)", pattern)
+        return f"(?P<route{index}>{pattern})"
+
+    def _match(self, path):
+        """
+        Return the position of the first route matching the path, or None.
+        """
+        if self.matcher:
+            match = self.matcher.match(path)
+            return int(match.lastgroup[len("route"):]) if match else None
+
+        for index, (_, _, regex) in enumerate(self.routes):
+            if regex.match(path):
+                return index
+        return None
+
+    def resolve(self, path):
+        """
+        Return the (key, values) of the route that handles the path, or None.
+        """
+        try:
+            index = self.exact_routes[path]
+        except KeyError:
+            index = self._match(path)
+
+        if index is None:
+            return None
+        key, values, _ = self.routes[index]
+        return key, values
+
+
+def _get_redirect_table(setting_name, redirects, build):
+    """
+    Return the table built from the redirects of a site, building it only if
+    that configuration hasn't been seen before.
+    """
+    config_hash = fasthash(repr((setting_name, redirects, settings.COURSE_ID_PATTERN, settings.USERNAME_PATTERN)))
+    table = _redirect_tables.get(config_hash)
+
+    if table is None:
+        table = build(redirects)
+        if len(_redirect_tables) >= REDIRECT_TABLES_MAX_SIZE:
+            _redirect_tables.clear()
+        _redirect_tables[config_hash] = table
+    return table
+
+
+def _build_mktg_redirect_table(redirects):
+    """
+    Map every normalized MKTG_REDIRECTS path to its target.
+    """
+    table = {}
+    for key, value in six.iteritems(redirects):
+        # Strip off html extension to have backwards
+        # compatibility to keys defined with template style.
+        path = f"/{key.replace('.html', '')}"
+        # Empty redirect values are ignored
+        if value:
+            table.setdefault(path, value)
+    return table
+
+
+def get_custom_path_redirect_table(redirects):
+    """
+    Return the compiled PathRedirectTable of the EDNX_CUSTOM_PATH_REDIRECTS value.
+    """
+    return _get_redirect_table("EDNX_CUSTOM_PATH_REDIRECTS", redirects, PathRedirectTable)
+
+
+def get_mktg_redirect_table(redirects):
+    """
+    Return the {path: target} dict of the MKTG_REDIRECTS value.
+    """
+    return _get_redirect_table("MKTG_REDIRECTS", redirects, _build_mktg_redirect_table)
+
+
+NO_REDIRECTION = '##none'
+REDIRECTION_CACHE_TIMEOUT = 5 * 60
+redirections_local_cache = LocalLRUCache(  # pylint: disable=invalid-name
+    max_size=getattr(settings, 'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE', 1024),
+    timeout=getattr(settings, 'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT', 30),
+)
+
+
+def get_redirection_cache_key(domain):
+    """
+    Return the key under which the redirection of a domain is cached.
+    """
+    return "redirect_cache.v2." + fasthash(domain.lower())
+
+
+class RedirectionsMap:
+    """
+    In-process copy of the whole Redirection table as a {domain: (target, scheme, status)} dict.
+
+    The copy is tagged with a CacheVersion, which is bumped every time a
+    Redirection is saved or deleted. Each lookup only compares the
+    version and reloads the table when it has changed. The version and the
+    domains are kept in a single tuple, so a lookup never reads the domains
+    of another version than the one it compared.
+    """
+
+    CACHE_VERSION = CacheVersion("redirect_cache.version")
+
+    def __init__(self):
+        self.table = (None, {})
+
+    def load(self, version):
+        """
+        Read the whole Redirection table and return it as a (version, domains) tuple.
+        """
+        domains = {}
+        for domain, target, scheme, status in Redirection.objects.order_by("id").values_list(  # pylint: disable=no-member
+            "domain", "target", "scheme", "status",
+        ):
+            domains.setdefault(domain.lower(), (target, scheme, status))
+        return version, domains
+
+    def get(self, domain):
+        """
+        Return the (target, scheme, status) redirection of a domain, or None if it has none.
+        """
+        version = self.CACHE_VERSION.get()
+        table = self.table
+        if table[0] != version:
+            table = self.load(version)
+            self.table = table
+        return table[1].get(domain.lower())
+
+
+redirections_map = RedirectionsMap()  # pylint: disable=invalid-name
+
+
+def get_redirection_target(domain):
+    """
+    Return the (target, scheme, status) redirection of a domain, or None if it has none.
+
+    When EOX_CORE_REDIRECTIONS_PRELOAD is enabled the whole table is kept in memory,
+    see RedirectionsMap. Otherwise the lookup goes through a short lived in-process
+    cache, then the shared cache and finally the database. Domains without a redirection
+    are cached as well. The in-process entries are tagged with the version of the
+    Redirection table, which each process reads from the shared cache at most once per
+    EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT, so a local hit doesn't reach the network
+    and a change made by another process is applied after that timeout.
+    """
+    if getattr(settings, "EOX_CORE_REDIRECTIONS_PRELOAD", False):
+        return redirections_map.get(domain)
+
+    cache_key = get_redirection_cache_key(domain)
+    version = RedirectionsMap.CACHE_VERSION.get_local(redirections_local_cache.timeout)
+    target = None
+    local_entry = redirections_local_cache.get(cache_key)
+    if local_entry is not None and local_entry[0] == version:
+        target = local_entry[1]
+
+    if target is None:
+        target = cache.get(cache_key)  # pylint: disable=maybe-no-member
+
+        if target is None:
+            try:
+                redirection = Redirection.objects.get(domain__iexact=domain)  # pylint: disable=no-member
+                target = (redirection.target, redirection.scheme, redirection.status)
+            except Redirection.DoesNotExist:  # pylint: disable=no-member
+                target = NO_REDIRECTION
+
+            cache.set(  # pylint: disable=maybe-no-member
+                cache_key, target, REDIRECTION_CACHE_TIMEOUT
+            )
+
+        redirections_local_cache.set(cache_key, (version, target))
+
+    if target == NO_REDIRECTION:
+        return None
+    return tuple(target)
+
+
 class PathRedirectionMiddleware(MiddlewareMixin):
     """
     Middleware to create custom responses based on the request path
@@ -80,33 +314,25 @@ class PathRedirectionMiddleware(MiddlewareMixin):
         Redirect the request according to the configured action to take.
         """
         redirects = configuration_helper.get_value("EDNX_CUSTOM_PATH_REDIRECTS", {})
+        if not redirects:
+            return None
 
         path = request.path_info
+        route = get_custom_path_redirect_table(redirects).resolve(path)
 
-        for regex, values in six.iteritems(redirects):
-
-            if isinstance(values, dict):
-                key = next(iter(values))
-            else:
-                key = values
-
-            regex_path_match = re.compile(regex.format(
-                COURSE_ID_PATTERN=settings.COURSE_ID_PATTERN,
-                USERNAME_PATTERN=settings.USERNAME_PATTERN,
-            ))
-
-            if regex_path_match.match(path):
-                try:
-                    action = getattr(self, key)
-                    return action(request=request, key=key, values=values, path=path)
-                except Http404:  # we expect 404 to be raised
-                    raise
-                except Exception as error:  # pylint: disable=broad-except
-                    LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
-                              request.get_host(),
-                              request.get_full_path())
-                    LOG.error(error)
-                    return None
+        if route:
+            key, values = route
+            try:
+                action = getattr(self, key)
+                return action(request=request, key=key, values=values, path=path)
+            except Http404:  # we expect 404 to be raised
+                raise
+            except Exception as error:  # pylint: disable=broad-except
+                LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
+                          request.get_host(),
+                          request.get_full_path())
+                LOG.error(error)
+                return None
         return None
 
     def process_mktg_redirect(self, request):
@@ -115,23 +341,17 @@ class PathRedirectionMiddleware(MiddlewareMixin):
         present that match the request path.
         """
         redirects = configuration_helper.get_value("MKTG_REDIRECTS", {})
-        path = request.path_info
-
-        for key, value in six.iteritems(redirects):
-
-            # Strip off html extension to have backwards
-            # compatibility to keys defined with template style.
-            key = key.replace('.html', '')
-            key = f'/{key}'
+        if not redirects:
+            return None
 
-            # Just continue if the path does not match or the redirect value is empty
-            # TODO: validate that the key corresponds to a Marketing path
-            if path != key or not value:
-                continue
+        path = request.path_info
+        value = get_mktg_redirect_table(redirects).get(path)
 
+        # TODO: validate that the key corresponds to a Marketing path
+        if value:
             try:
-                values = {key: value}
-                return self.redirect_always(key=key, values=values)
+                values = {path: value}
+                return self.redirect_always(key=path, values=values)
             except Exception as error:  # pylint: disable=broad-except
                 LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
                           request.get_host(),
@@ -210,40 +430,40 @@ class RedirectionsMiddleware(MiddlewareMixin):
         domain = request.META.get('HTTP_HOST', "")
 
         # First handle the event where a domain has a redirect target
-        cache_key = "redirect_cache." + fasthash(domain)
-        target = cache.get(cache_key)  # pylint: disable=maybe-no-member
-
-        if not target:
-            try:
-                target = Redirection.objects.get(domain__iexact=domain)  # pylint: disable=no-member
-            except Redirection.DoesNotExist:  # pylint: disable=no-member
-                target = '##none'
+        target = get_redirection_target(domain)
 
-            cache.set(  # pylint: disable=maybe-no-member
-                cache_key, target, 5 * 60
-            )
-
-        if target != '##none':
+        if target:
+            target_domain, scheme, status = target
             # If we are already at the target, just return
-            if domain == target.target and request.scheme == target.scheme:  # pylint: disable=no-member
+            if domain == target_domain and request.scheme == scheme:
                 return None
 
-            to_url = f'{target.scheme}://{target.target}{request.path}'
+            to_url = f'{scheme}://{target_domain}{request.path}'
 
             return HttpResponseRedirect(
                 to_url,
-                status=target.status,  # pylint: disable=no-member
+                status=status,
             )
         return None
 
     @staticmethod
     @receiver(post_save, sender=Redirection)
+    @receiver(post_delete, sender=Redirection)
     def clear_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
         """
-        Clear the cached template when the model is saved
+        Clear the cached redirection of the domain when the model is saved or deleted.
+
+        The caches are cleared once the transaction is committed, otherwise another
+        process could cache the previous value again under the new version.
         """
-        cache_key = "redirect_cache." + fasthash(instance.domain)
-        cache.delete(cache_key)  # pylint: disable=maybe-no-member
+        cache_key = get_redirection_cache_key(instance.domain)
+
+        def clear():
+            redirections_local_cache.delete(cache_key)
+            cache.delete(cache_key)  # pylint: disable=maybe-no-member
+            RedirectionsMap.CACHE_VERSION.bump()
+
+        transaction.on_commit(clear)
 
 
 class TPAExceptionMiddleware(ExceptionMiddleware):
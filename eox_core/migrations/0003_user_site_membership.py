@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-17 14:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('eox_core', '0002_moving_contenttypes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSiteMembership',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site_domain', models.CharField(help_text='lowercase domain of the site', max_length=253)),
+                ('source', models.CharField(choices=[('created_on_site', 'UserAttribute created_on_site'), ('signup_source', 'UserSignupSource')], max_length=20)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eox_site_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('site_domain', 'user', 'source')},
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 """
 Models used in eox-core.
 """
+from django.conf import settings
 from django.db import models
 
 
@@ -37,3 +38,59 @@ class Redirection(models.Model):
 
     def __unicode__(self):
         return f"Redirection from {self.domain} to {self.target}. Protocol {self.scheme}. Status {self.status}"
+
+
+class UserSiteMembership(models.Model):
+    """
+    Denormalized index of the sites an user belongs to.
+
+    Each row records that the user belongs to the site according to one of the sources
+    of the platform, the `created_on_site` UserAttribute or an UserSignupSource. The rows
+    are kept in sync by the signals of those models and can be rebuilt with the
+    `rebuild_site_memberships` management command.
+    """
+
+    CREATED_ON_SITE = 'created_on_site'
+    SIGNUP_SOURCE = 'signup_source'
+
+    SOURCES = (
+        (CREATED_ON_SITE, 'UserAttribute created_on_site'),
+        (SIGNUP_SOURCE, 'UserSignupSource'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='eox_site_memberships')
+    site_domain = models.CharField(max_length=253, help_text='lowercase domain of the site')
+    source = models.CharField(max_length=20, choices=SOURCES)
+
+    class Meta:
+        """
+        Model meta class.
+        """
+        unique_together = (('site_domain', 'user', 'source'),)
+
+    def __str__(self):
+        return f"User {self.user_id} on {self.site_domain} by {self.source}"  # pylint: disable=no-member
+
+    @classmethod
+    def sync_user(cls, user_id, source, domains):
+        """
+        Make the memberships of the user from the source match the given domains.
+        """
+        domains = {domain.lower() for domain in domains if domain}
+        memberships = cls.objects.filter(user_id=user_id, source=source)  # pylint: disable=no-member
+        memberships.exclude(site_domain__in=domains).delete()
+        existing = set(memberships.values_list('site_domain', flat=True))
+        cls.objects.bulk_create(  # pylint: disable=no-member
+            [cls(user_id=user_id, site_domain=domain, source=source) for domain in domains - existing],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def get_site_user_ids(cls, domain, user_ids, sources=None):
+        """
+        Return the ids of the users, among the given ones, that belong to the site.
+        """
+        memberships = cls.objects.filter(site_domain=domain.lower(), user_id__in=user_ids)  # pylint: disable=no-member
+        if sources is not None:
+            memberships = memberships.filter(source__in=sources)
+        return set(memberships.values_list('user_id', flat=True))
@@ -19,7 +19,7 @@ INSTALLED_APPS = (
 EOX_AUDIT_MODEL_APP = 'eox_audit_model.apps.EoxAuditModelConfig'
 
 
-def plugin_settings(settings):
+def plugin_settings(settings):  # pylint: disable=too-many-statements
     """
     Defines eox-core settings when app is used as a plugin to edx-platform.
     See: https://github.com/openedx/edx-platform/blob/master/openedx/core/djangoapps/plugins/README.rst
@@ -28,6 +28,7 @@ def plugin_settings(settings):
     settings.EOX_CORE_USERS_BACKEND = "eox_core.edxapp_wrapper.backends.users_m_v1"
     settings.EOX_CORE_ENROLLMENT_BACKEND = "eox_core.edxapp_wrapper.backends.enrollment_o_v1"
     settings.EOX_CORE_PRE_ENROLLMENT_BACKEND = "eox_core.edxapp_wrapper.backends.pre_enrollment_l_v1"
+    settings.EOX_CORE_PROGRAMS_BACKEND = "eox_core.edxapp_wrapper.backends.edxfuture_o_v1"
     settings.EOX_CORE_CERTIFICATES_BACKEND = "eox_core.edxapp_wrapper.backends.certificates_m_v1"
     settings.EOX_CORE_CONFIGURATION_HELPER_BACKEND = "eox_core.edxapp_wrapper.backends.configuration_helpers_h_v1"
     settings.EOX_CORE_COURSEWARE_BACKEND = "eox_core.edxapp_wrapper.backends.courseware_h_v1"
@@ -38,6 +39,9 @@ def plugin_settings(settings):
     settings.EOX_CORE_LOAD_PERMISSIONS = True
     settings.DATA_API_DEF_PAGE_SIZE = 1000
     settings.DATA_API_MAX_PAGE_SIZE = 5000
+    settings.DATA_API_STREAM_CHUNK_SIZE = 2000
+    settings.DATA_API_ENABLE_VALUES_PROJECTION = True
+    settings.DATA_API_GRADES_CHUNK_SIZE = 500
     settings.EOX_CORE_COURSES_BACKEND = "eox_core.edxapp_wrapper.backends.courses_h_v1"
     settings.EOX_CORE_COURSEKEY_BACKEND = "eox_core.edxapp_wrapper.backends.coursekey_m_v1"
     settings.EOX_CORE_COURSE_MANAGEMENT_REQUEST_TIMEOUT = 1000
@@ -50,6 +54,21 @@ def plugin_settings(settings):
     settings.EOX_CORE_ASYNC_TASKS = []
     settings.EOX_CORE_THIRD_PARTY_AUTH_BACKEND = 'eox_core.edxapp_wrapper.backends.third_party_auth_l_v1'
     settings.EOX_CORE_LANG_PREF_BACKEND = 'eox_core.edxapp_wrapper.backends.lang_pref_middleware_p_v1'
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE = 1024
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT = 30
+    settings.EOX_CORE_REDIRECTIONS_PRELOAD = False
+    settings.EOX_CORE_BULK_JOB_CHUNK_SIZE = 100
+    settings.EOX_CORE_BULK_JOB_TIMEOUT = 86400
+    settings.EOX_CORE_PROGRAM_COURSE_RUNS_CACHE_TTL = 300
+    settings.EOX_CORE_PROGRAM_ENROLLMENT_WORKERS = 4
+    settings.EOX_CORE_PROGRAMS_STALE_TTL = 3600
+    settings.EOX_CORE_ORG_COURSE_IDS_CACHE_TTL = 3600
+    settings.EOX_CORE_COURSE_KEY_CACHE_SIZE = 1024
+    settings.EOX_CORE_ENROLLMENT_LIST_PAGE_SIZE = 100
+    settings.EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE = 1000
+    settings.EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL = 0
+    # Enable only after running the rebuild_site_memberships command
+    settings.EOX_CORE_USER_SITE_MEMBERSHIP_INDEX = False
 
     if settings.EOX_CORE_USER_ENABLE_MULTI_TENANCY:
         settings.EOX_CORE_USER_ORIGIN_SITE_SOURCES = [
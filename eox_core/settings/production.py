@@ -15,7 +15,7 @@ except ImportError:
     LOG.error("ImportError while importing %s", ImportError)
 
 
-def plugin_settings(settings):  # pylint: disable=function-redefined
+def plugin_settings(settings):  # pylint: disable=function-redefined,too-many-statements
     """
     Set of plugin settings used by the Open Edx platform.
     More info: https://github.com/openedx/edx-platform/blob/master/openedx/core/djangoapps/plugins/README.rst
@@ -40,6 +40,10 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
         'EOX_CORE_PRE_ENROLLMENT_BACKEND',
         settings.EOX_CORE_PRE_ENROLLMENT_BACKEND
     )
+    settings.EOX_CORE_PROGRAMS_BACKEND = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAMS_BACKEND',
+        settings.EOX_CORE_PROGRAMS_BACKEND
+    )
     settings.EOX_CORE_CERTIFICATES_BACKEND = getattr(settings, 'ENV_TOKENS', {}).get(
         'EOX_CORE_CERTIFICATES_BACKEND',
         settings.EOX_CORE_CERTIFICATES_BACKEND
@@ -80,6 +84,18 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
         'DATA_API_MAX_PAGE_SIZE',
         settings.DATA_API_MAX_PAGE_SIZE
     )
+    settings.DATA_API_STREAM_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_STREAM_CHUNK_SIZE',
+        settings.DATA_API_STREAM_CHUNK_SIZE
+    )
+    settings.DATA_API_ENABLE_VALUES_PROJECTION = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_ENABLE_VALUES_PROJECTION',
+        settings.DATA_API_ENABLE_VALUES_PROJECTION
+    )
+    settings.DATA_API_GRADES_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_GRADES_CHUNK_SIZE',
+        settings.DATA_API_GRADES_CHUNK_SIZE
+    )
     settings.EOX_CORE_COURSES_BACKEND = getattr(settings, 'ENV_TOKENS', {}).get(
         'EOX_CORE_COURSES_BACKEND',
         settings.EOX_CORE_COURSES_BACKEND
@@ -110,6 +126,63 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
         'EOX_CORE_USER_ORIGIN_SITE_SOURCES',
         user_origin_sources
     )
+    settings.EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL',
+        settings.EOX_CORE_USER_SITE_MEMBERSHIP_CACHE_TTL
+    )
+    settings.EOX_CORE_USER_SITE_MEMBERSHIP_INDEX = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_USER_SITE_MEMBERSHIP_INDEX',
+        settings.EOX_CORE_USER_SITE_MEMBERSHIP_INDEX
+    )
+
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE',
+        settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE
+    )
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT',
+        settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT
+    )
+    settings.EOX_CORE_REDIRECTIONS_PRELOAD = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_PRELOAD',
+        settings.EOX_CORE_REDIRECTIONS_PRELOAD
+    )
+    settings.EOX_CORE_BULK_JOB_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOB_CHUNK_SIZE',
+        settings.EOX_CORE_BULK_JOB_CHUNK_SIZE
+    )
+    settings.EOX_CORE_BULK_JOB_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOB_TIMEOUT',
+        settings.EOX_CORE_BULK_JOB_TIMEOUT
+    )
+    settings.EOX_CORE_PROGRAM_COURSE_RUNS_CACHE_TTL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAM_COURSE_RUNS_CACHE_TTL',
+        settings.EOX_CORE_PROGRAM_COURSE_RUNS_CACHE_TTL
+    )
+    settings.EOX_CORE_PROGRAM_ENROLLMENT_WORKERS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAM_ENROLLMENT_WORKERS',
+        settings.EOX_CORE_PROGRAM_ENROLLMENT_WORKERS
+    )
+    settings.EOX_CORE_PROGRAMS_STALE_TTL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAMS_STALE_TTL',
+        settings.EOX_CORE_PROGRAMS_STALE_TTL
+    )
+    settings.EOX_CORE_ORG_COURSE_IDS_CACHE_TTL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_ORG_COURSE_IDS_CACHE_TTL',
+        settings.EOX_CORE_ORG_COURSE_IDS_CACHE_TTL
+    )
+    settings.EOX_CORE_COURSE_KEY_CACHE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_COURSE_KEY_CACHE_SIZE',
+        settings.EOX_CORE_COURSE_KEY_CACHE_SIZE
+    )
+    settings.EOX_CORE_ENROLLMENT_LIST_PAGE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_ENROLLMENT_LIST_PAGE_SIZE',
+        settings.EOX_CORE_ENROLLMENT_LIST_PAGE_SIZE
+    )
+    settings.EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE',
+        settings.EOX_CORE_ENROLLMENT_LIST_MAX_PAGE_SIZE
+    )
 
     settings.EOX_CORE_APPEND_LMS_MIDDLEWARE_CLASSES = getattr(settings, 'ENV_TOKENS', {}).get(
         'EOX_CORE_APPEND_LMS_MIDDLEWARE_CLASSES',
@@ -24,6 +24,7 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
     settings.EOX_CORE_USERS_BACKEND = "eox_core.edxapp_wrapper.backends.users_m_v1_test"
     settings.EOX_CORE_ENROLLMENT_BACKEND = "eox_core.edxapp_wrapper.backends.enrollment_l_v1"
     settings.EOX_CORE_PRE_ENROLLMENT_BACKEND = "eox_core.edxapp_wrapper.backends.pre_enrollment_l_v1"
+    settings.EOX_CORE_PROGRAMS_BACKEND = "eox_core.edxapp_wrapper.backends.edxfuture_o_v1_test"
     settings.EOX_CORE_COURSEKEY_BACKEND = "eox_core.edxapp_wrapper.backends.coursekey_m_v1"
     settings.EOX_CORE_CERTIFICATES_BACKEND = "eox_core.edxapp_wrapper.backends.certificates_h_v1_test"
     settings.EOX_CORE_CONFIGURATION_HELPER_BACKEND = "eox_core.edxapp_wrapper.backends.configuration_helpers_h_v1_test"
@@ -34,6 +35,9 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
     settings.EOX_CORE_LOAD_PERMISSIONS = False
     settings.DATA_API_DEF_PAGE_SIZE = 1000
     settings.DATA_API_MAX_PAGE_SIZE = 5000
+    settings.DATA_API_STREAM_CHUNK_SIZE = 2000
+    settings.DATA_API_ENABLE_VALUES_PROJECTION = True
+    settings.DATA_API_GRADES_CHUNK_SIZE = 500
     settings.EOX_CORE_ENABLE_UPDATE_USERS = True
     settings.EOX_CORE_USER_UPDATE_SAFE_FIELDS = ["is_active", "password", "fullname"]
     settings.EOX_CORE_BEARER_AUTHENTICATION = 'eox_core.edxapp_wrapper.backends.bearer_authentication_j_v1_test'
@@ -0,0 +1,131 @@
+"""
+Signal receivers that keep the eox-core indexes and caches in sync with the platform models.
+
+The platform models are looked up in the app registry, so nothing is connected when
+eox-core runs outside of the platform.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from eox_core.edxapp_wrapper.backends.users_common import UserSiteSources
+from eox_core.models import UserSiteMembership
+
+SOURCE_MODELS = {
+    UserSiteMembership.CREATED_ON_SITE: ('student', 'UserAttribute'),
+    UserSiteMembership.SIGNUP_SOURCE: ('student', 'UserSignupSource'),
+}
+
+
+def get_source_model(source):
+    """
+    Return the platform model of a membership source, or None if it is not installed.
+    """
+    try:
+        return apps.get_model(*SOURCE_MODELS[source])
+    except LookupError:
+        return None
+
+
+def get_source_memberships(source, first_user_id, last_user_id):
+    """
+    Return the (user_id, domain) pairs of the source for the users with ids in the range.
+    """
+    model = get_source_model(source)
+    if model is None:
+        return set()
+
+    queryset = model.objects.filter(user_id__gte=first_user_id, user_id__lte=last_user_id)
+    if source == UserSiteMembership.CREATED_ON_SITE:
+        queryset = queryset.filter(name='created_on_site').values_list('user_id', 'value')
+    else:
+        queryset = queryset.values_list('user_id', 'site')
+    return {(user_id, domain.lower()) for user_id, domain in queryset if domain}
+
+
+def sync_user_memberships(user_id, source):
+    """
+    Update the memberships of an user from a source.
+
+    The memberships of the user cached by UserSiteSources are evicted once the change
+    is committed, so a removed source stops granting access to its site.
+    """
+    domains = {domain for _, domain in get_source_memberships(source, user_id, user_id)}
+    UserSiteMembership.sync_user(user_id, source, domains)
+    transaction.on_commit(lambda: UserSiteSources.evict_user(user_id))
+
+
+def update_created_on_site_membership(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update the memberships of the user when its `created_on_site` attribute changes.
+    """
+    if instance.name == 'created_on_site':
+        sync_user_memberships(instance.user_id, UserSiteMembership.CREATED_ON_SITE)
+
+
+def update_signup_source_membership(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update the memberships of the user when one of its signup sources changes.
+    """
+    sync_user_memberships(instance.user_id, UserSiteMembership.SIGNUP_SOURCE)
+
+
+def connect_site_membership_signals():
+    """
+    Connect the receivers of the membership sources available in the platform.
+    """
+    receivers = {
+        UserSiteMembership.CREATED_ON_SITE: update_created_on_site_membership,
+        UserSiteMembership.SIGNUP_SOURCE: update_signup_source_membership,
+    }
+    for source, receiver in receivers.items():
+        model = get_source_model(source)
+        if model is None:
+            continue
+        for signal in (post_save, post_delete):
+            signal.connect(receiver, sender=model, dispatch_uid=f'eox_core.site_membership.{source}')
+
+
+def update_org_course_ids(sender, instance, created=True, **kwargs):  # pylint: disable=unused-argument
+    """
+    Compile the course lists of the orgs again when a course is created or deleted.
+    """
+    # eox_core.utils loads the edxapp backends, which can't be imported while the apps are loading
+    from eox_core.utils import OrgCourseIdsCache  # pylint: disable=import-outside-toplevel
+
+    if created:
+        OrgCourseIdsCache.CACHE_VERSION.bump_on_commit()
+
+
+def connect_course_overview_signals():
+    """
+    Connect the receivers of the CourseOverview model, if it's installed.
+    """
+    try:
+        model = apps.get_model('course_overviews', 'CourseOverview')
+    except LookupError:
+        return
+    for signal in (post_save, post_delete):
+        signal.connect(update_org_course_ids, sender=model, dispatch_uid='eox_core.org_course_ids')
+
+
+def update_site_orgs(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Read the orgs of the sites again when a site configuration changes.
+    """
+    # eox_core.utils loads the edxapp backends, which can't be imported while the apps are loading
+    from eox_core.utils import SiteOrgsCache  # pylint: disable=import-outside-toplevel
+
+    SiteOrgsCache.CACHE_VERSION.bump_on_commit()
+
+
+def connect_site_configuration_signals():
+    """
+    Connect the receivers of the SiteConfiguration model, if it's installed.
+    """
+    try:
+        model = apps.get_model('site_configuration', 'SiteConfiguration')
+    except LookupError:
+        return
+    for signal in (post_save, post_delete):
+        signal.connect(update_site_orgs, sender=model, dispatch_uid='eox_core.site_orgs')
@@ -0,0 +1,133 @@
+"""
+Test module for the eox-core management commands
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from mock import patch
+
+from eox_core.edxapp_wrapper.backends import edxfuture_o_v1_test
+from eox_core.models import UserSiteMembership
+
+CATALOG_PROGRAMS = {"program-a": {"courses": []}, "program-b": {"courses": []}}
+SITE_PROGRAM_UUIDS = {
+    "first.example.com": ["program-a", "program-b"],
+    "second.example.com": ["program-a", "program-c"],
+}
+
+
+@patch.object(edxfuture_o_v1_test, "SITE_PROGRAM_UUIDS", SITE_PROGRAM_UUIDS)
+@patch.object(edxfuture_o_v1_test, "CATALOG_PROGRAMS", dict(CATALOG_PROGRAMS))
+class WarmProgramsCacheTest(TestCase):
+    """
+    Tests for the warm_programs_cache command, with the stub catalog of the test backend.
+    """
+
+    def setUp(self):
+        """ Setup the sites of the stub catalog """
+        Site.objects.create(domain="first.example.com", name="first")
+        Site.objects.create(domain="second.example.com", name="second")
+
+    @patch.object(edxfuture_o_v1_test, "fetch_program", wraps=edxfuture_o_v1_test.fetch_program)
+    def test_programs_are_loaded(self, fetch_mock):
+        """
+        Every program of the sites is fetched once and then served from the cache.
+        """
+        output = StringIO()
+
+        call_command("warm_programs_cache", stdout=output)
+
+        fetched = sorted(call[0][0] for call in fetch_mock.call_args_list)
+        self.assertEqual(fetched, ["program-a", "program-b", "program-c"])
+        self.assertIn("Loaded 2 programs, 1 failed.", output.getvalue())
+
+        edxfuture_o_v1_test.get_program("program-a")
+        self.assertEqual(fetch_mock.call_count, 3)
+
+    def test_unknown_domain(self):
+        """
+        The command fails if a domain doesn't belong to a site.
+        """
+        with self.assertRaises(CommandError):
+            call_command("warm_programs_cache", "--domain", "missing.example.com", stdout=StringIO())
+
+
+class RebuildSiteMembershipsTest(TestCase):
+    """
+    Tests for the rebuild_site_memberships command, with stub membership sources.
+    """
+
+    def setUp(self):
+        """ Setup the users and the memberships of the sources """
+        self.users = [User.objects.create(username=f"user{index}") for index in range(3)]
+        self.source_memberships = {
+            UserSiteMembership.CREATED_ON_SITE: {(self.users[0].id, "first.example.com")},
+            UserSiteMembership.SIGNUP_SOURCE: {
+                (self.users[0].id, "first.example.com"),
+                (self.users[2].id, "second.example.com"),
+            },
+        }
+
+    def get_source_memberships(self, source, first_user_id, last_user_id):
+        """ Return the stub memberships of the source in the range of ids """
+        return {
+            (user_id, domain) for user_id, domain in self.source_memberships[source]
+            if first_user_id <= user_id <= last_user_id
+        }
+
+    def test_memberships_are_rebuilt(self):
+        """
+        The missing memberships are added and the stale ones removed, by batches of users.
+        """
+        UserSiteMembership.sync_user(self.users[1].id, UserSiteMembership.SIGNUP_SOURCE, ["stale.example.com"])
+        UserSiteMembership.sync_user(self.users[0].id, UserSiteMembership.CREATED_ON_SITE, ["first.example.com"])
+        output = StringIO()
+
+        with patch(
+            "eox_core.management.commands.rebuild_site_memberships.get_source_memberships",
+            side_effect=self.get_source_memberships,
+        ):
+            call_command("rebuild_site_memberships", batch_size=2, stdout=output)
+
+        self.assertEqual(
+            set(UserSiteMembership.objects.values_list("user_id", "site_domain", "source")),  # pylint: disable=no-member
+            {
+                (self.users[0].id, "first.example.com", UserSiteMembership.CREATED_ON_SITE),
+                (self.users[0].id, "first.example.com", UserSiteMembership.SIGNUP_SOURCE),
+                (self.users[2].id, "second.example.com", UserSiteMembership.SIGNUP_SOURCE),
+            },
+        )
+        self.assertIn("Added 2 site memberships, removed 1.", output.getvalue())
+
+
+class CheckDataApiIndexesTest(TestCase):
+    """
+    Tests for the check_data_api_indexes command.
+    """
+
+    @override_settings(EOX_CORE_USER_SITE_MEMBERSHIP_INDEX=True)
+    def test_indexes_are_reported(self):
+        """
+        Every filtered column is reported with its index and default match mode.
+        """
+        output = StringIO()
+
+        call_command("check_data_api_indexes", stdout=output)
+
+        self.assertIn("UserFilter.username: auth_user.username indexed, prefix match by default", output.getvalue())
+        self.assertIn("UserFilter.first_name: auth_user.first_name NOT INDEXED", output.getvalue())
+        self.assertIn(
+            "UserFilter.site: eox_core_usersitemembership.site_domain indexed, exact match by default",
+            output.getvalue(),
+        )
+
+    def test_strict(self):
+        """
+        The command fails on the columns without an index with --strict.
+        """
+        with self.assertRaises(CommandError):
+            call_command("check_data_api_indexes", strict=True, stdout=StringIO())
@@ -2,14 +2,28 @@
 """
 Test module for the custom Middlewares
 """
+import time
+
 import mock
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.http import Http404
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 
-from eox_core.middleware import PathRedirectionMiddleware, RedirectionsMiddleware, UserLanguagePreferenceMiddleware
+from eox_core.middleware import (
+    PathRedirectionMiddleware,
+    PathRedirectTable,
+    RedirectionsMap,
+    RedirectionsMiddleware,
+    UserLanguagePreferenceMiddleware,
+    get_custom_path_redirect_table,
+    get_mktg_redirect_table,
+    get_redirection_cache_key,
+    redirections_local_cache,
+    redirections_map,
+)
 from eox_core.models import Redirection
+from eox_core.utils import cache
 
 
 class PathRedirectionMiddlewareTest(TestCase):
@@ -126,6 +140,95 @@ class PathRedirectionMiddlewareTest(TestCase):
         self.assertIn(target_url, result.url)
 
 
+class PathRedirectTableTest(TestCase):
+    """
+    Testing the compiled tables used by the PathRedirectionMiddleware.
+    """
+
+    def test_first_matching_route_wins(self):
+        """
+        Test the routes are resolved in the configured order, as when each
+        regex was tested one at a time.
+        """
+        table = PathRedirectTable({
+            '/courses/{COURSE_ID_PATTERN}/about': 'not_found',
+            '/courses/{COURSE_ID_PATTERN}': {'redirect_always': '/home'},
+            '/u/{USERNAME_PATTERN}': 'login_required',
+        })
+
+        self.assertIsNotNone(table.matcher)
+        self.assertEqual(table.resolve('/courses/course-v1:org+c+r/about'), ('not_found', 'not_found'))
+        self.assertEqual(
+            table.resolve('/courses/course-v1:org+c+r/info'),
+            ('redirect_always', {'redirect_always': '/home'}),
+        )
+        self.assertEqual(table.resolve('/u/john'), ('login_required', 'login_required'))
+        self.assertIsNone(table.resolve('/dashboard'))
+
+    def test_literal_route_respects_order(self):
+        """
+        Test a literal path is looked up in a dict, unless an earlier regex
+        already matches it.
+        """
+        table = PathRedirectTable({
+            '/about/.*': 'not_found',
+            '/about/team': 'login_required',
+            '/contact': 'login_required',
+        })
+
+        self.assertEqual(table.exact_routes, {'/about/team': 0, '/contact': 2})
+        self.assertEqual(table.resolve('/about/team'), ('not_found', 'not_found'))
+        self.assertEqual(table.resolve('/contact'), ('login_required', 'login_required'))
+        self.assertEqual(table.resolve('/contact/us'), ('login_required', 'login_required'))
+
+    def test_patterns_that_cannot_be_combined(self):
+        """
+        Test patterns using global flags are still matched one by one.
+        """
+        table = PathRedirectTable({
+            '(?i)/ABOUT': 'not_found',
+            '/contact': 'login_required',
+        })
+
+        self.assertIsNone(table.matcher)
+        self.assertEqual(table.resolve('/about'), ('not_found', 'not_found'))
+        self.assertEqual(table.resolve('/contact'), ('login_required', 'login_required'))
+
+    def test_global_flags_do_not_leak_to_other_patterns(self):
+        """
+        Test a global flag of a later pattern doesn't apply to the patterns before it.
+        """
+        table = PathRedirectTable({
+            '/contact': 'login_required',
+            '(?i)/ABOUT/TEAM': 'not_found',
+            r'/(\w+)/\1': 'not_found',
+        })
+
+        self.assertIsNone(table.matcher)
+        self.assertIsNone(table.resolve('/CONTACT'))
+        self.assertEqual(table.resolve('/contact'), ('login_required', 'login_required'))
+        self.assertEqual(table.resolve('/x/x'), ('not_found', 'not_found'))
+
+    def test_tables_are_cached_by_configuration(self):
+        """
+        Test the same configuration reuses its table and a new one builds another.
+        """
+        redirects = {'/custom/path/': 'not_found'}
+
+        table = get_custom_path_redirect_table(redirects)
+
+        self.assertIs(table, get_custom_path_redirect_table(dict(redirects)))
+        self.assertIsNot(table, get_custom_path_redirect_table({'/custom/path/': 'login_required'}))
+
+    def test_mktg_table_normalizes_keys(self):
+        """
+        Test the MKTG_REDIRECTS keys are normalized once and empty values are ignored.
+        """
+        table = get_mktg_redirect_table({'tos.html': '/terms', 'honor': '', 'honor.html': '/honor'})
+
+        self.assertEqual(table, {'/tos': '/terms', '/honor': '/honor'})
+
+
 class RedirectionMiddlewareTest(TestCase):
     """
     Testing the middleware RedirectionsMiddleware.
@@ -134,6 +237,9 @@ class RedirectionMiddlewareTest(TestCase):
         """ setup """
         self.request_factory = RequestFactory()
         self.middleware_instance = RedirectionsMiddleware(get_response=lambda req: None)
+        redirections_local_cache.clear()
+        RedirectionsMap.CACHE_VERSION.reset_local()
+        cache.clear()
 
     def test_disabled_feature(self):
         """
@@ -167,6 +273,128 @@ class RedirectionMiddlewareTest(TestCase):
 
         self.assertIsNotNone(result)
 
+    @mock.patch('eox_core.models.Redirection.objects.get')
+    def test_domain_without_redirection_is_cached_locally(self, redirection_get_mock):
+        """
+        Test a domain without redirection only reaches the shared cache and the
+        database once, later requests are answered without a shared cache call.
+        """
+        request = self.request_factory.get('/', HTTP_HOST='no-redirect.example.com')
+        redirection_get_mock.side_effect = Redirection.DoesNotExist  # pylint: disable=no-member
+        cache_key = get_redirection_cache_key('no-redirect.example.com')
+
+        with mock.patch.object(cache, 'get', wraps=cache.get) as cache_get_mock:
+            self.middleware_instance.process_request(request)
+            cache_get_mock.reset_mock()
+            result = self.middleware_instance.process_request(request)
+
+        self.assertIsNone(result)
+        redirection_get_mock.assert_called_once()
+        cache_get_mock.assert_not_called()
+        self.assertEqual(cache.get(cache_key), '##none')
+
+    def test_changes_of_other_processes_invalidate_the_local_cache(self):
+        """
+        Test the local entries are discarded once the version of the table changes,
+        even if the change was made by another process, after the local timeout.
+        """
+        request = self.request_factory.get('/', HTTP_HOST='www.example.com')
+        self.assertIsNone(self.middleware_instance.process_request(request))
+
+        # Another process creates the redirection: the shared cache is cleared and
+        # the version is bumped, but the local cache of this process is not touched.
+        Redirection.objects.bulk_create([  # pylint: disable=no-member
+            Redirection(domain='www.example.com', target='example.com'),
+        ])
+        cache.delete(get_redirection_cache_key('www.example.com'))
+        cache.set(RedirectionsMap.CACHE_VERSION.key, 'other-version', None)
+        self.assertIsNone(self.middleware_instance.process_request(request))
+
+        expired = time.monotonic() + redirections_local_cache.timeout + 1
+        with mock.patch('eox_core.utils.time.monotonic', return_value=expired):
+            self.assertEqual(self.middleware_instance.process_request(request).url, 'http://example.com/')
+
+    def test_redirection_is_cached_in_compact_form(self):
+        """
+        Test the shared cache stores the redirection data instead of the model instance.
+        """
+        Redirection.objects.create(  # pylint: disable=no-member
+            domain='www.example.com', target='example.com', scheme='https', status=302,
+        )
+        request = self.request_factory.get('/path', HTTP_HOST='www.example.com')
+
+        result = self.middleware_instance.process_request(request)
+
+        self.assertEqual(result.status_code, 302)
+        self.assertEqual(result.url, 'https://example.com/path')
+        self.assertEqual(cache.get(get_redirection_cache_key('www.example.com')), ('example.com', 'https', 302))
+
+    def test_redirection_changes_invalidate_both_caches(self):
+        """
+        Test saving or deleting a redirection invalidates the local and shared caches.
+        """
+        request = self.request_factory.get('/', HTTP_HOST='www.example.com')
+        self.assertIsNone(self.middleware_instance.process_request(request))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            redirection = Redirection.objects.create(  # pylint: disable=no-member
+                domain='www.example.com', target='example.com',
+            )
+        self.assertEqual(self.middleware_instance.process_request(request).url, 'http://example.com/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            redirection.delete()
+        self.assertIsNone(self.middleware_instance.process_request(request))
+
+    def test_caches_are_cleared_after_the_commit(self):
+        """
+        Test the caches are only cleared once the change of the redirection is committed.
+        """
+        request = self.request_factory.get('/', HTTP_HOST='www.example.com')
+        self.assertIsNone(self.middleware_instance.process_request(request))
+        version = RedirectionsMap.CACHE_VERSION.get()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Redirection.objects.create(domain='www.example.com', target='example.com')  # pylint: disable=no-member
+            self.assertEqual(RedirectionsMap.CACHE_VERSION.get(), version)
+            self.assertEqual(cache.get(get_redirection_cache_key('www.example.com')), '##none')
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(RedirectionsMap.CACHE_VERSION.get(), version)
+        self.assertIsNone(cache.get(get_redirection_cache_key('www.example.com')))
+
+    def test_version_is_not_reused_after_eviction(self):
+        """
+        Test the version of the table doesn't start again from a known value when it's evicted.
+        """
+        version = RedirectionsMap.CACHE_VERSION.get()
+        cache.delete(RedirectionsMap.CACHE_VERSION.key)
+
+        self.assertNotEqual(RedirectionsMap.CACHE_VERSION.get(), version)
+
+    @override_settings(EOX_CORE_REDIRECTIONS_PRELOAD=True)
+    def test_preloaded_redirections(self):
+        """
+        Test the preloaded map answers without queries and is reloaded when a redirection changes.
+        """
+        Redirection.objects.create(domain='WWW.Example.com', target='example.com')  # pylint: disable=no-member
+        request = self.request_factory.get('/', HTTP_HOST='www.example.com')
+        self.assertEqual(self.middleware_instance.process_request(request).url, 'http://example.com/')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.middleware_instance.process_request(request).url, 'http://example.com/')
+            other_request = self.request_factory.get('/', HTTP_HOST='other.example.com')
+            self.assertIsNone(self.middleware_instance.process_request(other_request))
+
+        version = redirections_map.table[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            Redirection.objects.filter(domain='WWW.Example.com').delete()  # pylint: disable=no-member
+            Redirection.objects.create(domain='other.example.com', target='example.org')  # pylint: disable=no-member
+
+        self.assertNotEqual(redirections_map.CACHE_VERSION.get(), version)
+        self.assertIsNone(self.middleware_instance.process_request(request))
+        self.assertEqual(self.middleware_instance.process_request(other_request).url, 'http://example.org/')
+
 
 class UserLanguagePreferenceMiddlewareTestCase(TestCase):
     """
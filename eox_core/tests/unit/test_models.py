@@ -2,10 +2,11 @@
 """
 Test module for RedirectionModel
 """
+from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-from eox_core.models import Redirection
+from eox_core.models import Redirection, UserSiteMembership
 
 
 class RedirectionModelTest(TestCase):
@@ -33,3 +34,50 @@ class RedirectionModelTest(TestCase):
         obj.domain = "localhost"
         with self.assertRaises(ValidationError):
             obj.full_clean()
+
+
+class UserSiteMembershipModelTest(TestCase):
+    """
+    Test the site membership index
+    """
+
+    def setUp(self):
+        """ Setup the indexed users """
+        self.user = User.objects.create(username="member")
+        self.other_user = User.objects.create(username="other")
+
+    def test_sync_user(self):
+        """
+        The memberships of the source are replaced by the given domains, in lowercase.
+        """
+        UserSiteMembership.sync_user(self.user.id, UserSiteMembership.SIGNUP_SOURCE, ["old.example.com"])
+        UserSiteMembership.sync_user(self.user.id, UserSiteMembership.CREATED_ON_SITE, ["old.example.com"])
+
+        UserSiteMembership.sync_user(self.user.id, UserSiteMembership.SIGNUP_SOURCE, ["New.example.com", ""])
+
+        self.assertEqual(
+            set(UserSiteMembership.objects.values_list("site_domain", "source")),  # pylint: disable=no-member
+            {
+                ("new.example.com", UserSiteMembership.SIGNUP_SOURCE),
+                ("old.example.com", UserSiteMembership.CREATED_ON_SITE),
+            },
+        )
+
+    def test_get_site_user_ids(self):
+        """
+        Only the users of the site, by the given sources, are returned.
+        """
+        UserSiteMembership.sync_user(self.user.id, UserSiteMembership.SIGNUP_SOURCE, ["site.example.com"])
+        UserSiteMembership.sync_user(self.other_user.id, UserSiteMembership.CREATED_ON_SITE, ["site.example.com"])
+        user_ids = [self.user.id, self.other_user.id]
+
+        self.assertEqual(UserSiteMembership.get_site_user_ids("Site.example.com", user_ids), set(user_ids))
+        self.assertEqual(
+            UserSiteMembership.get_site_user_ids(
+                "site.example.com",
+                user_ids,
+                sources=[UserSiteMembership.CREATED_ON_SITE],
+            ),
+            {self.other_user.id},
+        )
+        self.assertEqual(UserSiteMembership.get_site_user_ids("other.example.com", user_ids), set())
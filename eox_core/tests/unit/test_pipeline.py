@@ -6,6 +6,7 @@ from django.contrib.auth.models import User
 from django.test import TestCase
 from mock import MagicMock, PropertyMock, patch
 
+from eox_core.edxapp_wrapper.registry import clear_backends
 from eox_core.edxapp_wrapper.users import get_user_signup_source
 from eox_core.pipeline import (
     assert_user_information,
@@ -60,10 +61,12 @@ class EnsureUserProfileTest(TestCase):
     Test the custom association backend.
     """
     def setUp(self):
+        clear_backends()
+        self.addCleanup(clear_backends)
         self.backend_mock = MagicMock()
         self.user_mock = MagicMock()
 
-    @patch('eox_core.edxapp_wrapper.users.import_module')
+    @patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_user_with_profile_works(self, import_mock):
         """
         A user that already has a profile will do nothing
@@ -74,7 +77,7 @@ class EnsureUserProfileTest(TestCase):
         ensure_user_has_profile(self.backend_mock, {}, user=self.user_mock)
         backend().get_user_profile().assert_not_called()
 
-    @patch('eox_core.edxapp_wrapper.users.import_module')
+    @patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_user_without_profile_works(self, import_mock):
         """
         A user that has no profile will create one
@@ -0,0 +1,137 @@
+"""
+Test module for the signal receivers of eox-core.
+"""
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase
+from mock import patch
+
+from eox_core import signals
+from eox_core.models import UserSiteMembership
+from eox_core.utils import OrgCourseIdsCache, SiteOrgsCache
+
+
+class StubUserAttribute:
+    """ Stand-in of the UserAttribute model of the platform """
+
+
+class StubUserSignupSource:
+    """ Stand-in of the UserSignupSource model of the platform """
+
+
+class SiteMembershipSignalsTest(TestCase):
+    """
+    Tests for the receivers that keep the site memberships in sync with the source models.
+    """
+
+    def setUp(self):
+        """ Connect the receivers to the stub source models """
+        self.user = User.objects.create(username="john")
+        self.source_memberships = {
+            UserSiteMembership.CREATED_ON_SITE: set(),
+            UserSiteMembership.SIGNUP_SOURCE: set(),
+        }
+        source_models = {
+            UserSiteMembership.CREATED_ON_SITE: StubUserAttribute,
+            UserSiteMembership.SIGNUP_SOURCE: StubUserSignupSource,
+        }
+        patchers = [
+            patch("eox_core.signals.get_source_model", side_effect=source_models.get),
+            patch("eox_core.signals.get_source_memberships", side_effect=self.get_source_memberships),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        signals.connect_site_membership_signals()
+        for source, model in source_models.items():
+            for signal in (post_save, post_delete):
+                self.addCleanup(signal.disconnect, sender=model, dispatch_uid=f"eox_core.site_membership.{source}")
+
+    def get_source_memberships(self, source, first_user_id, last_user_id):
+        """ Return the stub memberships of the source in the range of ids """
+        return {
+            (user_id, domain) for user_id, domain in self.source_memberships[source]
+            if first_user_id <= user_id <= last_user_id
+        }
+
+    def get_memberships(self):
+        """ Return the indexed memberships of the user """
+        return set(
+            UserSiteMembership.objects.filter(user=self.user).values_list("site_domain", "source")  # pylint: disable=no-member
+        )
+
+    def test_signup_sources_update_the_memberships(self):
+        """ Saving and deleting a signup source adds and removes the membership """
+        instance = SimpleNamespace(user_id=self.user.id)
+        self.source_memberships[UserSiteMembership.SIGNUP_SOURCE] = {(self.user.id, "site.example.com")}
+
+        post_save.send(sender=StubUserSignupSource, instance=instance, created=True)
+        self.assertEqual(self.get_memberships(), {("site.example.com", UserSiteMembership.SIGNUP_SOURCE)})
+
+        self.source_memberships[UserSiteMembership.SIGNUP_SOURCE] = set()
+        post_delete.send(sender=StubUserSignupSource, instance=instance)
+        self.assertEqual(self.get_memberships(), set())
+
+    def test_created_on_site_attributes_update_the_memberships(self):
+        """ Only the created_on_site attributes change the memberships """
+        self.source_memberships[UserSiteMembership.CREATED_ON_SITE] = {(self.user.id, "site.example.com")}
+
+        post_save.send(
+            sender=StubUserAttribute,
+            instance=SimpleNamespace(user_id=self.user.id, name="other_attribute"),
+            created=True,
+        )
+        self.assertEqual(self.get_memberships(), set())
+
+        post_save.send(
+            sender=StubUserAttribute,
+            instance=SimpleNamespace(user_id=self.user.id, name="created_on_site"),
+            created=True,
+        )
+        self.assertEqual(self.get_memberships(), {("site.example.com", UserSiteMembership.CREATED_ON_SITE)})
+
+    def test_other_models_are_ignored(self):
+        """ The receivers are only connected to the source models """
+        self.source_memberships[UserSiteMembership.SIGNUP_SOURCE] = {(self.user.id, "site.example.com")}
+
+        post_save.send(sender=User, instance=self.user, created=True)
+
+        self.assertEqual(self.get_memberships(), set())
+
+
+class OrgCourseIdsSignalsTest(TestCase):
+    """
+    Tests for the receiver that invalidates the course lists of the orgs.
+    """
+
+    def test_course_lists_are_invalidated_after_the_commit(self):
+        """ The version is bumped once a course is created or deleted and the change committed """
+        version = OrgCourseIdsCache.CACHE_VERSION.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            signals.update_org_course_ids(sender=None, instance=None, created=False)
+        self.assertEqual(OrgCourseIdsCache.CACHE_VERSION.get(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            signals.update_org_course_ids(sender=None, instance=None, created=True)
+            self.assertEqual(OrgCourseIdsCache.CACHE_VERSION.get(), version)
+        self.assertNotEqual(OrgCourseIdsCache.CACHE_VERSION.get(), version)
+
+
+class SiteOrgsSignalsTest(TestCase):
+    """
+    Tests for the receiver that invalidates the orgs of the sites.
+    """
+
+    def test_site_orgs_are_invalidated_after_the_commit(self):
+        """ The version is bumped once the change of the site configuration is committed """
+        version = SiteOrgsCache.CACHE_VERSION.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            signals.update_site_orgs(sender=None, instance=None)
+            self.assertEqual(SiteOrgsCache.CACHE_VERSION.get(), version)
+
+        self.assertNotEqual(SiteOrgsCache.CACHE_VERSION.get(), version)
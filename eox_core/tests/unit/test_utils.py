@@ -5,8 +5,23 @@ Test module for Utils
 from django.contrib.sites.models import Site
 from django.test import TestCase
 from mock import patch
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
 
-from eox_core.utils import fasthash, get_domain_from_oauth_app_uris, get_or_create_site_from_oauth_app_uris
+from eox_core.utils import (
+    BulkJobProgress,
+    CacheVersion,
+    CourseGradingCache,
+    CourseKeyCache,
+    LocalLRUCache,
+    OrgCourseIdsCache,
+    SiteOrgsCache,
+    StaleWhileRevalidateCache,
+    cache,
+    fasthash,
+    get_domain_from_oauth_app_uris,
+    get_or_create_site_from_oauth_app_uris,
+)
 
 
 class UtilsTest(TestCase):
@@ -115,3 +130,363 @@ class UtilsTest(TestCase):
         self.assertEqual(new_site_domain, site.domain)
         self.assertEqual(1, Site.objects.filter(domain=self.domain_1).count())
         mock_get_domain.assert_called_once()
+
+
+class LocalLRUCacheTest(TestCase):
+    """
+    Test the in-process LRU cache
+    """
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Only `max_size` entries are kept, dropping the least recently used one.
+        """
+        local_cache = LocalLRUCache(max_size=2, timeout=60)
+        local_cache.set("a", 1)
+        local_cache.set("b", 2)
+        local_cache.get("a")
+        local_cache.set("c", 3)
+
+        self.assertEqual(local_cache.get("a"), 1)
+        self.assertIsNone(local_cache.get("b"))
+        self.assertEqual(local_cache.get("c"), 3)
+
+    @patch("eox_core.utils.time.monotonic")
+    def test_entries_expire(self, monotonic_mock):
+        """
+        Entries are not returned once their timeout is over.
+        """
+        monotonic_mock.return_value = 100
+        local_cache = LocalLRUCache(timeout=30)
+        local_cache.set("a", 1)
+
+        monotonic_mock.return_value = 129
+        self.assertEqual(local_cache.get("a"), 1)
+        monotonic_mock.return_value = 131
+        self.assertEqual(local_cache.get("a", "expired"), "expired")
+
+    def test_delete(self):
+        """
+        Deleted entries are not returned anymore.
+        """
+        local_cache = LocalLRUCache()
+        local_cache.set("a", 1)
+        local_cache.delete("a")
+        local_cache.delete("missing")
+
+        self.assertIsNone(local_cache.get("a"))
+
+
+class CourseGradingCacheTest(TestCase):
+    """
+    Tests for the CourseGradingCache.
+    """
+
+    @patch("eox_core.utils.get_course_grade_factory")
+    @patch("eox_core.utils.get_courseware_courses")
+    def test_course_and_factory_are_loaded_once(self, courses_mock, grade_factory_mock):
+        """
+        Each course is loaded once and the grade factory is instantiated once.
+        """
+        grading_cache = CourseGradingCache()
+
+        grading_cache.read("user_a", "course-v1:org+a+run")
+        grading_cache.read("user_b", "course-v1:org+a+run")
+        grading_cache.read("user_a", "course-v1:org+b+run")
+
+        self.assertEqual(courses_mock.return_value.get_course_by_id.call_count, 2)
+        grade_factory_mock.return_value.assert_called_once_with()
+        self.assertEqual(grade_factory_mock.return_value.return_value.read.call_count, 3)
+        self.assertEqual(grading_cache.stats(), {"hits": 1, "misses": 2})
+
+
+class BulkJobProgressTest(TestCase):
+    """
+    Tests for the BulkJobProgress counters.
+    """
+
+    def test_counters(self):
+        """
+        The chunks add their items to the counters started by the job.
+        """
+        progress = BulkJobProgress("job-1")
+        self.assertIsNone(progress.get())
+
+        progress.start(10)
+        progress.add(done=4)
+        progress.add(done=3, failed=1)
+
+        self.assertEqual(progress.get(), {"total": 10, "done": 7, "failed": 1})
+        self.assertIsNone(BulkJobProgress("job-2").get())
+
+
+class StaleWhileRevalidateCacheTest(TestCase):
+    """
+    Tests for the StaleWhileRevalidateCache, with a stub fetch function.
+    """
+
+    def setUp(self):
+        """ Setup a stale-while-revalidate cache over a stub catalog. """
+        self.catalog = {"program": "v1"}
+        self.fetched = []
+
+        def fetch(key):
+            self.fetched.append(key)
+            return self.catalog[key]
+
+        self.swr_cache = StaleWhileRevalidateCache(self.id(), fetch, fresh_ttl=60, stale_ttl=600)
+
+    @patch("eox_core.utils.time.time")
+    def test_fresh_value_is_cached(self, time_mock):
+        """
+        The value is fetched once while it's fresh.
+        """
+        time_mock.return_value = 1000
+        self.assertEqual(self.swr_cache.get("program"), "v1")
+        self.assertEqual(self.swr_cache.get("program"), "v1")
+
+        self.assertEqual(self.fetched, ["program"])
+
+    @patch("eox_core.utils.threading.Thread")
+    @patch("eox_core.utils.time.time")
+    def test_stale_value_is_served_and_refreshed_once(self, time_mock, thread_mock):
+        """
+        A stale value is returned right away and a single background refresh is started.
+        """
+        time_mock.return_value = 1000
+        self.swr_cache.get("program")
+        self.catalog["program"] = "v2"
+        time_mock.return_value = 1061
+
+        self.assertEqual(self.swr_cache.get("program"), "v1")
+        self.assertEqual(self.swr_cache.get("program"), "v1")
+        thread_mock.assert_called_once()
+
+        # Run the refresh as the thread would
+        kwargs = thread_mock.call_args[1]
+        kwargs["target"](*kwargs["args"])
+
+        self.assertEqual(self.swr_cache.get("program"), "v2")
+        self.assertEqual(self.fetched, ["program", "program"])
+
+    @patch("eox_core.utils.threading.Thread")
+    @patch("eox_core.utils.time.time")
+    def test_failed_refresh_keeps_stale_value(self, time_mock, thread_mock):
+        """
+        A failed refresh keeps the stale value and releases the lock.
+        """
+        time_mock.return_value = 1000
+        self.swr_cache.get("program")
+        del self.catalog["program"]
+        time_mock.return_value = 1061
+
+        self.swr_cache.get("program")
+        kwargs = thread_mock.call_args[1]
+        kwargs["target"](*kwargs["args"])
+
+        self.assertEqual(self.swr_cache.get("program"), "v1")
+        self.assertEqual(thread_mock.call_count, 2)
+
+
+class CacheVersionTest(TestCase):
+    """
+    Tests for the CacheVersion.
+    """
+
+    def setUp(self):
+        """ Setup a version without a value in the cache """
+        self.cache_version = CacheVersion("eox_core.tests.version")
+        cache.delete(self.cache_version.key)
+
+    def test_version_is_kept_until_bumped(self):
+        """
+        The version is the same until it's bumped.
+        """
+        version = self.cache_version.get()
+        self.assertEqual(self.cache_version.get(), version)
+
+        self.cache_version.bump()
+        self.assertNotEqual(self.cache_version.get(), version)
+
+    def test_version_is_not_reused_after_eviction(self):
+        """
+        The version doesn't start again from a known value when it's evicted.
+        """
+        version = self.cache_version.get()
+        cache.delete(self.cache_version.key)
+
+        self.assertNotEqual(self.cache_version.get(), version)
+
+    @patch('eox_core.utils.time.monotonic', return_value=100)
+    def test_local_version_is_read_once_per_timeout(self, m_monotonic):
+        """
+        The local version is read again from the shared cache only once the timeout passes,
+        or right away after a bump of the same process.
+        """
+        version = self.cache_version.get_local(30)
+        cache.set(self.cache_version.key, 'other-version', None)
+
+        with patch.object(cache, 'get') as m_cache_get:
+            self.assertEqual(self.cache_version.get_local(30), version)
+        m_cache_get.assert_not_called()
+
+        m_monotonic.return_value = 131
+        self.assertEqual(self.cache_version.get_local(30), 'other-version')
+
+        self.cache_version.bump()
+        self.assertNotIn(self.cache_version.get_local(30), (version, 'other-version'))
+
+    def test_bump_on_commit(self):
+        """
+        The version is only bumped once the transaction is committed.
+        """
+        version = self.cache_version.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cache_version.bump_on_commit()
+            self.assertEqual(self.cache_version.get(), version)
+
+        self.assertNotEqual(self.cache_version.get(), version)
+
+
+class OrgCourseIdsCacheTest(TestCase):
+    """
+    Tests for the OrgCourseIdsCache.
+    """
+
+    @patch.object(OrgCourseIdsCache, "fetch_course_ids")
+    def test_course_ids_are_cached_until_a_course_is_created(self, fetch_mock):
+        """
+        The courses of a set of orgs are read once, until the version is bumped.
+        """
+        OrgCourseIdsCache.CACHE_VERSION.bump()
+        fetch_mock.return_value = ["course-v1:org_a+course+run"]
+
+        self.assertEqual(OrgCourseIdsCache.get_course_ids(["org_a", "org_b"]), ["course-v1:org_a+course+run"])
+        OrgCourseIdsCache.get_course_ids(("org_b", "org_a", "org_a"))
+        fetch_mock.assert_called_once_with(["org_a", "org_b"])
+
+        OrgCourseIdsCache.CACHE_VERSION.bump()
+        OrgCourseIdsCache.get_course_ids(["org_a", "org_b"])
+        self.assertEqual(fetch_mock.call_count, 2)
+
+
+@patch("eox_core.utils.get_configuration_helper")
+class SiteOrgsCacheTest(TestCase):
+    """
+    Tests for the SiteOrgsCache, with a stub configuration helper.
+    """
+
+    def setUp(self):
+        """ Setup the cache and the current request of a site """
+        SiteOrgsCache.CACHE_VERSION.bump()
+        self.site_orgs_cache = SiteOrgsCache()
+        self.site = Site.objects.create(domain="orgs.example.com", name="orgs")
+        patcher = patch("eox_core.utils.get_current_request")
+        self.request_mock = patcher.start()
+        self.request_mock.return_value.site = self.site
+        self.addCleanup(patcher.stop)
+
+    def test_orgs_are_read_once(self, helper_mock):
+        """
+        The orgs are read once, and again after a site configuration changes.
+        """
+        helper_mock.return_value.get_all_orgs.return_value = {"org_a", "org_b"}
+        helper_mock.return_value.get_current_site_orgs.return_value = ["org_a"]
+
+        for _ in range(2):
+            self.assertEqual(self.site_orgs_cache.get_all_orgs(), frozenset({"org_a", "org_b"}))
+            self.assertEqual(self.site_orgs_cache.get_current_site_orgs(), frozenset({"org_a"}))
+        helper_mock.return_value.get_all_orgs.assert_called_once_with()
+        helper_mock.return_value.get_current_site_orgs.assert_called_once_with()
+
+        SiteOrgsCache.CACHE_VERSION.bump()
+        self.site_orgs_cache.get_current_site_orgs()
+        self.assertEqual(helper_mock.return_value.get_all_orgs.call_count, 2)
+        self.assertEqual(helper_mock.return_value.get_current_site_orgs.call_count, 2)
+
+    def test_single_org_site(self, helper_mock):
+        """
+        A site with a single org in its configuration has a set with that org.
+        """
+        helper_mock.return_value.get_all_orgs.return_value = set()
+        helper_mock.return_value.get_current_site_orgs.return_value = "org_abc"
+
+        self.assertEqual(self.site_orgs_cache.get_current_site_orgs(), frozenset({"org_abc"}))
+
+    def test_no_request(self, helper_mock):
+        """
+        The orgs of the current site are not kept outside of a request.
+        """
+        self.request_mock.return_value = None
+        helper_mock.return_value.get_all_orgs.return_value = set()
+        helper_mock.return_value.get_current_site_orgs.return_value = ["org_a"]
+
+        self.site_orgs_cache.get_current_site_orgs()
+        self.site_orgs_cache.get_current_site_orgs()
+
+        self.assertEqual(helper_mock.return_value.get_current_site_orgs.call_count, 2)
+
+    def test_orgs_of_a_previous_version_are_not_kept(self, helper_mock):
+        """
+        The orgs read while another thread replaces the copy don't end up in the new one.
+        """
+        def read_site_orgs_during_a_change():
+            SiteOrgsCache.CACHE_VERSION.bump()
+            self.site_orgs_cache.get_all_orgs()
+            return ["org_a"]
+
+        helper_mock.return_value.get_all_orgs.return_value = {"org_a", "org_b"}
+        helper_mock.return_value.get_current_site_orgs.side_effect = read_site_orgs_during_a_change
+
+        self.assertEqual(self.site_orgs_cache.get_current_site_orgs(), frozenset({"org_a"}))
+        self.assertEqual(self.site_orgs_cache.current.site_orgs, {})
+
+
+class CourseKeyCacheTest(TestCase):
+    """
+    Tests for the CourseKeyCache.
+    """
+
+    @patch("eox_core.utils.CourseKey.from_string", wraps=CourseKey.from_string)
+    def test_course_ids_are_parsed_once(self, from_string_mock):
+        """
+        Each course id is parsed once, the invalid ones included.
+        """
+        course_key_cache = CourseKeyCache()
+
+        for _ in range(3):
+            course_key = course_key_cache.parse("course-v1:org+course+run")
+            with self.assertRaises(InvalidKeyError):
+                course_key_cache.parse("invalid course")
+
+        self.assertEqual(course_key.org, "org")
+        self.assertEqual(from_string_mock.call_count, 2)
+        self.assertEqual(course_key_cache.stats(), {"hits": 4, "misses": 2, "hit_rate": 0.667})
+
+    def test_stats_since_a_previous_call(self):
+        """
+        The stats can count only the course ids parsed after a previous call.
+        """
+        course_key_cache = CourseKeyCache()
+        course_key_cache.parse("course-v1:org+a+run")
+        course_key_cache.parse("course-v1:org+a+run")
+        stats = course_key_cache.stats()
+
+        course_key_cache.parse("course-v1:org+a+run")
+        course_key_cache.parse("course-v1:org+b+run")
+
+        self.assertEqual(course_key_cache.stats(since=stats), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+        self.assertEqual(course_key_cache.stats(), {"hits": 2, "misses": 2, "hit_rate": 0.5})
+
+    def test_least_recently_used_ids_are_evicted(self):
+        """
+        Only `max_size` course ids are kept.
+        """
+        course_key_cache = CourseKeyCache(max_size=1)
+
+        course_key_cache.parse("course-v1:org+a+run")
+        course_key_cache.parse("course-v1:org+b+run")
+        course_key_cache.parse("course-v1:org+a+run")
+
+        self.assertEqual(course_key_cache.stats(), {"hits": 0, "misses": 3, "hit_rate": 0})
@@ -4,17 +4,32 @@ Util function definitions.
 """
 import datetime
 import hashlib
+import logging
 import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
 
+from crum import get_current_request
+from django.apps import apps
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core import cache
+from django.db import connections, transaction
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
 from pytz import UTC
 from rest_framework import serializers
 
+from eox_core.edxapp_wrapper.configuration_helpers import get_configuration_helper
+from eox_core.edxapp_wrapper.courseware import get_courseware_courses
+from eox_core.edxapp_wrapper.grades import get_course_grade_factory
 from eox_core.edxapp_wrapper.users import get_user_profile
 
+LOG = logging.getLogger(__name__)
 UserProfile = get_user_profile()
+SiteOrgs = namedtuple("SiteOrgs", ["version", "all_orgs", "site_orgs"])
 
 try:
     cache = cache.caches['general']  # pylint: disable=invalid-name
@@ -31,6 +46,453 @@ def fasthash(string):
     return md5.hexdigest()
 
 
+class LocalLRUCache:
+    """
+    Bounded, thread-safe, in-process LRU cache whose entries expire after `timeout` seconds.
+
+    It's meant to sit in front of the shared cache for values read on every request,
+    so each process only goes to the network once per `timeout` for the same key.
+    """
+
+    def __init__(self, max_size=1024, timeout=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored under `key`, or `default` if it's missing or expired.
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store `value` under `key`, evicting the least recently used entry if the cache is full.
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove `key` from the cache.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+
+class CacheVersion:
+    """
+    Version of a set of cached values, kept in the shared cache under `key`.
+
+    The values are tagged with the version and discarded once it changes. Every change
+    sets a new random version, so the values tagged before the key was evicted from the
+    shared cache are never taken as current again.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.local = (0, None)
+
+    def get(self):
+        """
+        Return the current version.
+        """
+        version = cache.get(self.key)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(self.key, version, None)
+            version = cache.get(self.key, version)
+        return version
+
+    def get_local(self, timeout):
+        """
+        Return the version kept in the process, read again from the shared cache at most once per `timeout` seconds.
+
+        The changes made by other processes are seen after that timeout, the ones made by
+        this process right away.
+        """
+        expires, version = self.local
+        if version is None or expires < time.monotonic():
+            version = self.get()
+            self.local = (time.monotonic() + timeout, version)
+        return version
+
+    def reset_local(self):
+        """
+        Forget the version kept in the process.
+        """
+        self.local = (0, None)
+
+    def bump(self):
+        """
+        Invalidate the values tagged with the current version, in every process.
+        """
+        cache.set(self.key, uuid.uuid4().hex, None)
+        self.reset_local()
+
+    def bump_on_commit(self):
+        """
+        Invalidate the values once the current transaction is committed.
+
+        Otherwise another process could read the previous data from the database and
+        tag it with the new version.
+        """
+        transaction.on_commit(self.bump)
+
+
+class CourseKeyCache:
+    """
+    Bounded, thread-safe memo of the course ids parsed into CourseKeys.
+
+    The invalid course ids are remembered too and raise InvalidKeyError again. The
+    keys never change, so the entries don't expire, only the least recently used
+    ones are evicted. `stats()` returns the hit rate of the parsed ids.
+    """
+    INVALID = object()
+
+    def __init__(self, max_size=1024):
+        self._keys = LocalLRUCache(max_size=max_size, timeout=float("inf"))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, course_id):
+        """
+        Return the CourseKey of the course id, or raise InvalidKeyError if it's not valid.
+        """
+        if not isinstance(course_id, str):
+            return CourseKey.from_string(course_id)
+
+        course_key = self._keys.get(course_id)
+        with self._lock:
+            if course_key is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if course_key is None:
+            try:
+                course_key = CourseKey.from_string(course_id)
+            except InvalidKeyError:
+                course_key = self.INVALID
+            self._keys.set(course_id, course_key)
+
+        if course_key is self.INVALID:
+            raise InvalidKeyError(CourseKey, course_id)
+        return course_key
+
+    def stats(self, since=None):
+        """
+        Return the counters and the hit rate of the parsed course ids.
+
+        The counters cover the whole life of the process, `since` takes the stats of a
+        previous call to count only the course ids parsed after it.
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        if since is not None:
+            hits -= since["hits"]
+            misses -= since["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0,
+        }
+
+
+course_key_cache = CourseKeyCache(getattr(settings, "EOX_CORE_COURSE_KEY_CACHE_SIZE", 1024))  # pylint: disable=invalid-name
+
+
+class StaleWhileRevalidateCache:
+    """
+    Shared cache of values that are served stale while they are refreshed in the background.
+
+    A value is fresh for `fresh_ttl` seconds. After that it's still returned for up to
+    `stale_ttl` more seconds, and the first process that finds it stale refreshes it
+    with `fetch` in a background thread. A lock in the shared cache makes sure only
+    one refresh per key runs at a time across processes. Only missing values, and
+    the calls with `ignore_cache`, wait for `fetch`.
+    """
+
+    def __init__(self, key_prefix, fetch, fresh_ttl=60, stale_ttl=3600, lock_timeout=30):  # pylint: disable=too-many-arguments
+        self.key_prefix = key_prefix
+        self.fetch = fetch
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+
+    def get_key(self, key):
+        """
+        Return the shared cache key of `key`.
+        """
+        return f"{self.key_prefix}.{key}"
+
+    def get(self, key, ignore_cache=False):
+        """
+        Return the value of `key`, refreshing it in the background if it's stale.
+        """
+        entry = None if ignore_cache else cache.get(self.get_key(key))
+        if entry is None:
+            return self.refresh(key)
+
+        value, fresh_until = entry
+        if fresh_until <= time.time():
+            self.refresh_in_background(key)
+        return value
+
+    def refresh(self, key):
+        """
+        Fetch the value of `key` and store it.
+        """
+        value = self.fetch(key)
+        cache.set(self.get_key(key), (value, time.time() + self.fresh_ttl), self.fresh_ttl + self.stale_ttl)
+        return value
+
+    def refresh_in_background(self, key):
+        """
+        Start a thread that refreshes `key`, unless another refresh of it is already running.
+        """
+        lock_key = self.get_key(key) + ".lock"
+        if not cache.add(lock_key, 1, self.lock_timeout):
+            return False
+
+        thread = threading.Thread(target=self._refresh_and_unlock, args=(key, lock_key), daemon=True)
+        thread.start()
+        return True
+
+    def _refresh_and_unlock(self, key, lock_key):
+        """
+        Refresh `key` and release its lock, the stale value is kept if the refresh fails.
+        """
+        try:
+            self.refresh(key)
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception("Error refreshing the cached value of %s", self.get_key(key))
+        finally:
+            cache.delete(lock_key)
+            connections.close_all()
+
+
+class CourseGradingCache:
+    """
+    Courses and grade factory used while grading in a single request or task.
+
+    Each course is loaded from the modulestore once, keyed by its course key, and
+    the grade factory is instantiated once. `hits` and `misses` count the course
+    lookups served from the cache and from the modulestore.
+    """
+
+    def __init__(self):
+        self.courses = {}
+        self.grade_factory = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_course(self, course_key):
+        """
+        Return the course of `course_key`.
+        """
+        key = str(course_key)
+        try:
+            course = self.courses[key]
+        except KeyError:
+            self.misses += 1
+            course = self.courses[key] = get_courseware_courses().get_course_by_id(course_key)
+        else:
+            self.hits += 1
+        return course
+
+    def get_grade_factory(self):
+        """
+        Return the CourseGradeFactory instance.
+        """
+        if self.grade_factory is None:
+            self.grade_factory = get_course_grade_factory()()
+        return self.grade_factory
+
+    def read(self, user, course_key):
+        """
+        Return the CourseGrade of `user` in the course of `course_key`.
+        """
+        return self.get_grade_factory().read(user, self.get_course(course_key))
+
+    def stats(self):
+        """
+        Return the counters of the course lookups.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class BulkJobProgress:
+    """
+    Progress counters of an asynchronous bulk job.
+
+    The items of a job are processed in chunks by several workers, so the counters
+    live in the shared cache where each chunk adds its `done` and `failed` items
+    and the status views read them while the job runs.
+    """
+    KEY_PREFIX = "eox_core.bulk_job"
+    JOB_ID_PREFIX = "bulk_job-"
+    COUNTERS = ("total", "done", "failed")
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def get_key(self, counter):
+        """
+        Return the cache key of one of the counters of the job.
+        """
+        return f"{self.KEY_PREFIX}.{self.job_id}.{counter}"
+
+    def start(self, total, site_id=None):
+        """
+        Initialize the counters of a job with `total` items, started on the site `site_id`.
+        """
+        timeout = getattr(settings, "EOX_CORE_BULK_JOB_TIMEOUT", 86400)
+        cache.set_many({
+            self.get_key("total"): total,
+            self.get_key("done"): 0,
+            self.get_key("failed"): 0,
+            self.get_key("site"): site_id,
+        }, timeout)
+
+    def get_site_id(self):
+        """
+        Return the id of the site the job was started on.
+        """
+        return cache.get(self.get_key("site"))
+
+    def add(self, done=0, failed=0):
+        """
+        Add the items processed by a chunk of the job.
+        """
+        for counter, value in (("done", done), ("failed", failed)):
+            if not value:
+                continue
+            try:
+                cache.incr(self.get_key(counter), value)
+            except ValueError:
+                # The counters expired, the job results are still stored by celery.
+                pass
+
+    def get(self):
+        """
+        Return the counters of the job, or None if it isn't a bulk job or they expired.
+        """
+        keys = {self.get_key(counter): counter for counter in self.COUNTERS}
+        values = cache.get_many(list(keys))
+        if self.get_key("total") not in values:
+            return None
+        return {counter: values.get(key, 0) for key, counter in keys.items()}
+
+
+class OrgCourseIdsCache:
+    """
+    Cache of the ids of the courses of a set of orgs, like the `course_org_filter` of a site.
+
+    The lists are tagged with a CacheVersion, which is bumped every time a
+    CourseOverview is created or deleted, so they are compiled again from the
+    course overviews after that.
+    """
+    KEY_PREFIX = "eox_core.org_course_ids"
+    CACHE_VERSION = CacheVersion("eox_core.org_course_ids.version")
+
+    @classmethod
+    def get_course_ids(cls, orgs):
+        """
+        Return the ids of the courses of the orgs.
+        """
+        orgs = sorted(set(orgs))
+        key = f"{cls.KEY_PREFIX}.{cls.CACHE_VERSION.get()}.{fasthash(','.join(orgs))}"
+        course_ids = cache.get(key)
+        if course_ids is None:
+            course_ids = cls.fetch_course_ids(orgs)
+            cache.set(key, course_ids, getattr(settings, "EOX_CORE_ORG_COURSE_IDS_CACHE_TTL", 3600))
+        return course_ids
+
+    @staticmethod
+    def fetch_course_ids(orgs):
+        """
+        Read the ids of the courses of the orgs from the course overviews.
+        """
+        course_overview = apps.get_model("course_overviews", "CourseOverview")
+        return [str(course_id) for course_id in course_overview.objects.filter(org__in=orgs).values_list("id", flat=True)]
+
+
+class SiteOrgsCache:
+    """
+    In-process copy of the orgs claimed by the sites in their `course_org_filter`.
+
+    The copy is tagged with a CacheVersion, which is bumped every time a
+    SiteConfiguration is saved or deleted. Each lookup only compares the version,
+    the orgs of all the sites are read again when it changes and the orgs of each
+    site the first time they're needed after that.
+
+    The version and the orgs are kept together in one SiteOrgs tuple, which is
+    replaced when the version changes. Each lookup works on the tuple it read at
+    the start, so a thread that replaces it doesn't change the orgs another thread
+    is reading or filling.
+    """
+    CACHE_VERSION = CacheVersion("eox_core.site_orgs.version")
+
+    def __init__(self):
+        self.current = SiteOrgs(None, frozenset(), {})
+
+    def refresh(self):
+        """
+        Return the SiteOrgs of the current version, reading the orgs of all the sites again if they have changed.
+        """
+        version = self.CACHE_VERSION.get()
+        current = self.current
+        if current.version != version:
+            current = SiteOrgs(version, frozenset(get_configuration_helper().get_all_orgs()), {})
+            self.current = current
+        return current
+
+    def get_all_orgs(self):
+        """
+        Return the orgs claimed by any site.
+        """
+        return self.refresh().all_orgs
+
+    def get_current_site_orgs(self):
+        """
+        Return the orgs of the site of the current request.
+        """
+        current = self.refresh()
+        site = getattr(get_current_request(), "site", None)
+        site_orgs = current.site_orgs.get(site.id) if site else None
+        if site_orgs is None:
+            orgs = get_configuration_helper().get_current_site_orgs() or []
+            site_orgs = frozenset([orgs] if isinstance(orgs, str) else orgs)
+            if site:
+                current.site_orgs[site.id] = site_orgs
+        return site_orgs
+
+
+site_orgs_cache = SiteOrgsCache()  # pylint: disable=invalid-name
+
+
 def get_valid_years():
     """
     Return valid list of year range, for the YEAR_OF_BIRTH_CHOICES
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of the backend resolution done by the edxapp_wrapper functions.
+
+Compares the previous dispatch (read the setting and call import_module on every
+call) with the backend registry, for the wrapper calls made by a single enrollment
+request: user lookup, course key validation and enrollment creation.
+
+Only the dispatch overhead is measured, so the backends configured for the
+benchmark are test backends that can be imported outside edx-platform.
+
+Usage:
+    python scripts/benchmark_backend_registry.py [iterations]
+"""
+import os
+import sys
+import timeit
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eox_core.settings.test")
+
+import django  # pylint: disable=wrong-import-position
+
+django.setup()
+
+from django.conf import settings  # pylint: disable=wrong-import-position
+from django.test import override_settings  # pylint: disable=wrong-import-position
+
+from eox_core.edxapp_wrapper.registry import get_backend  # pylint: disable=wrong-import-position
+
+BENCHMARK_BACKENDS = {
+    "EOX_CORE_USERS_BACKEND": "eox_core.edxapp_wrapper.backends.users_m_v1_test",
+    "EOX_CORE_ENROLLMENT_BACKEND": "eox_core.edxapp_wrapper.backends.certificates_h_v1_test",
+    "EOX_CORE_COURSEKEY_BACKEND": "eox_core.edxapp_wrapper.backends.configuration_helpers_h_v1_test",
+}
+
+# Wrapper calls of a POST /eox-core/api/v1/enrollment/ request, in order.
+REQUEST_DISPATCHES = (
+    "EOX_CORE_COURSEKEY_BACKEND",  # validate_org
+    "EOX_CORE_COURSEKEY_BACKEND",  # get_valid_course_key
+    "EOX_CORE_ENROLLMENT_BACKEND",  # check_edxapp_enrollment_is_valid
+    "EOX_CORE_USERS_BACKEND",  # check_edxapp_account_conflicts
+    "EOX_CORE_USERS_BACKEND",  # get_edxapp_user
+    "EOX_CORE_ENROLLMENT_BACKEND",  # create_enrollment
+)
+
+
+def legacy_request():
+    """ Resolve the backends the way the wrappers used to. """
+    for setting_name in REQUEST_DISPATCHES:
+        import_module(getattr(settings, setting_name))
+
+
+def registry_request():
+    """ Resolve the backends through the registry. """
+    for setting_name in REQUEST_DISPATCHES:
+        get_backend(setting_name)
+
+
+def main():
+    """ Run both variants and print the per request and per call overhead. """
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    calls = len(REQUEST_DISPATCHES)
+
+    with override_settings(**BENCHMARK_BACKENDS):
+        for name, function in (("import_module", legacy_request), ("registry", registry_request)):
+            function()
+            elapsed = min(timeit.repeat(function, number=iterations, repeat=5))
+            per_request = elapsed / iterations * 1e6
+            print(f"{name:>14}: {per_request:8.3f} us/request {per_request / calls:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()